@@ -1,20 +1,23 @@
 import argparse
+import json
 import sys
+import http_client.const
 import http_client.errors
 import logging
 from http_client.client import Client
 from http_client.models import OutputMode
+from http_client.pool import ConnectionPool
+from http_client.resolver import default_resolver
+from http_client.tls import get_tls_context
 
 logger = logging.getLogger(__name__)
-logging.basicConfig(
-    format="[%(levelname)s]: %(asctime)s | in %(name)s | %(message)s",
-    level=logging.DEBUG,
-)
 
 
 def set_up_arguments(arg_parser):
     data_type = arg_parser.add_mutually_exclusive_group()
-    arg_parser.add_argument("url", type=str, help="Ссылка на ресурс.")
+    arg_parser.add_argument(
+        "url", type=str, nargs="?", help="Ссылка на ресурс."
+    )
     arg_parser.add_argument(
         "-a",
         "--agent",
@@ -67,6 +70,11 @@ def set_up_arguments(arg_parser):
         action="store_true",
         help="Выводит отправляемые заголовки на консоль.",
     )
+    arg_parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="Выводить отладочный журнал работы клиента в stderr.",
+    )
     arg_parser.add_argument(
         "-i",
         "--include",
@@ -79,6 +87,32 @@ def set_up_arguments(arg_parser):
         action="store_true",
         help="Вкл/выкл перенаправление на сайты, указанные в 'Location:'",
     )
+    arg_parser.add_argument(
+        "--max-redirs",
+        type=int,
+        metavar="N",
+        default=http_client.const.MAX_REDIRECTS,
+        help="Наибольшее число переходов при --redirect.",
+    )
+    arg_parser.add_argument(
+        "--retry",
+        type=int,
+        metavar="N",
+        help="Повторять запрос до N раз при ошибках соединения, тайм-ауте "
+        "и ответах 429, 502, 503, 504 с экспоненциальной паузой.",
+    )
+    arg_parser.add_argument(
+        "--retry-max-time",
+        type=float,
+        metavar="SECONDS",
+        help="Не начинать повтор позже, чем через SECONDS секунд после "
+        "первой попытки.",
+    )
+    arg_parser.add_argument(
+        "--retry-all-methods",
+        action="store_true",
+        help="Повторять и неидемпотентные запросы (POST и т. п.).",
+    )
     arg_parser.add_argument(
         "-T",
         "--timeout",
@@ -94,6 +128,158 @@ def set_up_arguments(arg_parser):
         metavar="FILENAME",
         help="Отправить cookies из файла на web-сервер.",
     )
+    arg_parser.add_argument(
+        "--cookie-jar",
+        type=str,
+        metavar="FILENAME",
+        help="Хранить cookies из ответов в базе sqlite и отправлять их в "
+        "следующих запросах, в том числе между запусками.",
+    )
+    arg_parser.add_argument(
+        "--resolve",
+        type=str,
+        action="append",
+        default=[],
+        metavar="HOST:PORT:ADDR",
+        help="Подключаться к HOST:PORT по адресу ADDR (несколько адресов - "
+        "через запятую) без обращения к DNS.",
+    )
+    arg_parser.add_argument(
+        "--raw",
+        action="store_true",
+        help="Не раскодировать сжатое (gzip, deflate) тело ответа.",
+    )
+    arg_parser.add_argument(
+        "-k",
+        "--insecure",
+        action="store_true",
+        help="Не проверять сертификат сервера и его имя при HTTPS.",
+    )
+    arg_parser.add_argument(
+        "--cacert",
+        type=str,
+        metavar="FILENAME",
+        help="Проверять сертификат сервера по сертификатам из файла вместо "
+        "системного хранилища.",
+    )
+    arg_parser.add_argument(
+        "--segments",
+        type=int,
+        metavar="N",
+        help="Сохранить файл -o, загружая N диапазонов параллельно, если "
+        "сервер поддерживает Accept-Ranges.",
+    )
+    arg_parser.add_argument(
+        "--continue",
+        dest="resume",
+        action="store_true",
+        help="Загружать файл -o через FILENAME.part с журналом прогресса и "
+        "продолжить прерванную загрузку с места остановки.",
+    )
+    arg_parser.add_argument(
+        "--cache-dir",
+        type=str,
+        metavar="DIR",
+        help="Кэшировать ответы на GET-запросы в каталоге DIR с учётом "
+        "Cache-Control, ETag и Last-Modified; статистика попаданий "
+        "выводится в stderr.",
+    )
+    arg_parser.add_argument(
+        "--timing",
+        action="store_true",
+        help="Вывести в stderr длительность фаз запроса (DNS, подключение, "
+        "TLS, ожидание ответа, передача тела) в стиле curl -w.",
+    )
+    arg_parser.add_argument(
+        "--batch",
+        type=str,
+        metavar="FILENAME",
+        help="Выполнить запросы из файла ('-' - stdin): по строке на запрос "
+        "в формате '[METHOD] URL' или JSON с полями url, method, headers, "
+        "data. Результаты выводятся построчно в формате JSON.",
+    )
+    arg_parser.add_argument(
+        "--concurrency",
+        type=int,
+        metavar="N",
+        default=http_client.const.BATCH_CONCURRENCY,
+        help="Число одновременных запросов в режимах --batch и --bench.",
+    )
+    arg_parser.add_argument(
+        "--processes",
+        type=int,
+        metavar="N",
+        help="Выполнять --batch в N процессах, распределяя адреса по "
+        "хостам; каждый процесс выполняет до --concurrency запросов. "
+        "Сводка по процессам выводится в stderr.",
+    )
+    arg_parser.add_argument(
+        "--host-rate",
+        type=float,
+        metavar="RPS",
+        help="Не больше RPS запросов --batch в секунду к одному хосту; "
+        "ответы 429 и 503 приостанавливают запросы к хосту по "
+        "Retry-After.",
+    )
+    arg_parser.add_argument(
+        "--host-burst",
+        type=int,
+        metavar="N",
+        default=1,
+        help="Сколько запросов к хосту можно отправить подряд сверх "
+        "--host-rate.",
+    )
+    arg_parser.add_argument(
+        "--max-per-host",
+        type=int,
+        metavar="N",
+        help="Не больше N одновременных запросов --batch к одному хосту.",
+    )
+    arg_parser.add_argument(
+        "--bodies",
+        type=str,
+        metavar="DIR",
+        help="Сохранять тела ответов --batch в каталог DIR (файлы "
+        "<index>.body, путь - в поле body_file результата).",
+    )
+    arg_parser.add_argument(
+        "--unordered",
+        action="store_true",
+        help="Выводить результаты --batch по мере готовности, а не в "
+        "порядке входного файла.",
+    )
+    arg_parser.add_argument(
+        "--bench",
+        action="store_true",
+        help="Нагрузочный режим: многократно отправлять запрос и вывести "
+        "перцентили задержки, пропускную способность и коды ответов.",
+    )
+    arg_parser.add_argument(
+        "-n",
+        "--requests",
+        type=int,
+        metavar="N",
+        help="Число запросов в режиме --bench (по умолчанию "
+        f"{http_client.const.BENCH_REQUESTS}, если не задан --duration).",
+    )
+    arg_parser.add_argument(
+        "--duration",
+        type=float,
+        metavar="SECONDS",
+        help="Длительность нагрузки в режиме --bench.",
+    )
+    arg_parser.add_argument(
+        "--rate",
+        type=float,
+        metavar="RPS",
+        help="Целевая частота запросов в секунду в режиме --bench.",
+    )
+    arg_parser.add_argument(
+        "--local-server",
+        action="store_true",
+        help="Запустить встроенный HTTP сервер и отправлять запросы --bench "
+        "на него.",
+    )
 
 
 def extract_arguments() -> tuple:
@@ -116,6 +302,198 @@ def extract_arguments() -> tuple:
     )
 
 
+def run_request(output, cmd_args: tuple):
+    logger.info("Initializing client")
+    cache = get_cache()
+    cookie_jar = get_cookie_jar()
+    client = Client(
+        *cmd_args,
+        tls=get_tls(),
+        decode=not args.raw,
+        cache=cache,
+        max_redirects=args.max_redirs,
+        retry=get_retry(),
+        cookie_jar=cookie_jar,
+    )
+    server_response = client.send_request(stream=True)
+
+    mode = get_output_mode()
+    output.write(client.request.get_results(mode))
+    for chunk in server_response.iter_results(mode):
+        output.write(chunk)
+    client.close()
+    if cookie_jar is not None:
+        cookie_jar.save()
+    if args.timing:
+        sys.stderr.write(f"{server_response.timings.format()}\n")
+    if server_response.retries:
+        sys.stderr.write(
+            f"retries: {server_response.retries}, "
+            f"{server_response.retry_time:.3f} s\n"
+        )
+    if cache is not None:
+        sys.stderr.write(f"{cache.stats}\n")
+
+
+def run_download():
+    from http_client.download import SegmentedDownload
+
+    download = SegmentedDownload(
+        args.url,
+        args.output,
+        args.segments or 1,
+        args.timeout,
+        args.agent,
+        args.header,
+        args.cookies,
+        args.redirect,
+        get_tls(),
+        resume=args.resume,
+    )
+    size = download.run()
+    logger.info(f"Saved {size} bytes to {args.output}")
+
+
+def run_batch(output):
+    from http_client.batch import read_specs
+
+    runner = get_batch_runner()
+
+    def write(record: dict):
+        output.write(json.dumps(record, ensure_ascii=False).encode() + b"\n")
+        output.flush()
+
+    source = sys.stdin if args.batch == "-" else open(args.batch, "r")
+    with source:
+        summary = runner.run(read_specs(source), write)
+    sys.stderr.write(f"{summary}\n")
+    if args.processes:
+        sys.stderr.write(f"{runner.report()}\n")
+        return
+    runner.close()
+    if runner.cookie_jar is not None:
+        runner.cookie_jar.save()
+    if runner.cache is not None:
+        sys.stderr.write(f"{runner.cache.stats}\n")
+    if runner.scheduler is not None:
+        sys.stderr.write(f"{runner.scheduler.stats}\n")
+
+
+def get_batch_runner():
+    from http_client.batch import BatchRunner, ProcessBatchRunner
+
+    if args.processes:
+        return ProcessBatchRunner(
+            args.processes,
+            args.concurrency,
+            not args.unordered,
+            args.timeout,
+            args.redirect,
+            args.agent,
+            args.header,
+            args.cookies,
+            not args.insecure,
+            args.cacert,
+            args.cache_dir,
+            args.bodies,
+            args.host_rate,
+            args.host_burst,
+            args.max_per_host,
+            get_retry(),
+            args.cookie_jar,
+        )
+    return BatchRunner(
+        args.concurrency,
+        not args.unordered,
+        args.timeout,
+        args.redirect,
+        args.agent,
+        args.header,
+        args.cookies,
+        ConnectionPool(max_idle_per_host=args.concurrency, tls=get_tls()),
+        get_cache(),
+        args.bodies,
+        get_scheduler(),
+        get_retry(),
+        get_cookie_jar(),
+    )
+
+
+def get_retry():
+    if not args.retry:
+        return None
+    from http_client.retry import RetryPolicy
+
+    methods = http_client.const.RETRY_METHODS
+    if args.retry_all_methods:
+        methods = (*methods, "POST", "PUT", "PATCH", "DELETE")
+    return RetryPolicy(
+        args.retry, deadline=args.retry_max_time, methods=methods
+    )
+
+
+def get_cookie_jar():
+    if not args.cookie_jar:
+        return None
+    from http_client.cookies import CookieJar
+
+    return CookieJar(args.cookie_jar)
+
+
+def get_scheduler():
+    if not args.host_rate and not args.max_per_host:
+        return None
+    from http_client.scheduler import HostScheduler
+
+    return HostScheduler(args.host_rate, args.host_burst, args.max_per_host)
+
+
+def run_bench(output):
+    from http_client.bench import Benchmark
+
+    server = None
+    if args.local_server:
+        from http_client.server import LocalServer
+
+        server = LocalServer(default=lambda h: h.send_body(200, b"OK"))
+        server.__enter__()
+        args.url = server.url + "/"
+    try:
+        benchmark = Benchmark(
+            extract_arguments(),
+            args.requests,
+            args.duration,
+            args.concurrency,
+            args.rate,
+            get_tls(),
+        )
+        report = benchmark.run()
+    finally:
+        if server:
+            server.__exit__(None, None, None)
+    output.write(f"{report}\n".encode())
+
+
+def get_tls():
+    return get_tls_context(not args.insecure, args.cacert)
+
+
+def is_download() -> bool:
+    return bool(
+        (args.segments or args.resume)
+        and args.output
+        and args.method == "GET"
+    )
+
+
+def get_cache():
+    if not args.cache_dir:
+        return None
+    from http_client.cache import ResponseCache
+
+    return ResponseCache(args.cache_dir)
+
+
 def get_output_mode() -> OutputMode:
     if args.verbose:
         return OutputMode.FULL
@@ -130,18 +508,29 @@ if __name__ == "__main__":
     )
     set_up_arguments(parser)
     args = parser.parse_args()
+    logging.basicConfig(
+        format=http_client.const.LOG_FORMAT,
+        level=logging.DEBUG if args.debug else logging.WARNING,
+    )
+    if args.local_server and not args.bench:
+        parser.error("--local-server используется только с --bench")
+    if not args.url and not args.batch and not args.local_server:
+        parser.error("требуется url, --batch или --local-server")
     cmd_args = extract_arguments()
     try:
+        for spec in args.resolve:
+            default_resolver.add_override(spec)
         output = sys.stdout.buffer
-        if args.output:
+        if args.output and not is_download():
             output = open(args.output, "bw")
-        logger.info("Initializing client")
-        client = Client(*cmd_args)
-        server_response = client.send_request()
-
-        mode = get_output_mode()
-        output.write(client.request.get_results(mode))
-        output.write(server_response.get_results(mode))
+        if args.batch:
+            run_batch(output)
+        elif args.bench:
+            run_bench(output)
+        elif is_download():
+            run_download()
+        else:
+            run_request(output, cmd_args)
         output.close()
     except http_client.errors.APIError as e:
         logger.error(f"Client error occurred: {e}")
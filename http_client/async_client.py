@@ -0,0 +1,314 @@
+import asyncio
+import logging
+import http_client.const
+import http_client.errors
+import http_client.urls
+from http_client.headers import Headers
+from http_client.models import Request, Response
+from http_client.reader import (
+    HEAD_END,
+    content_length,
+    has_body,
+    is_chunked,
+    parse_chunk_size,
+    parse_head,
+)
+from http_client.redirects import (
+    is_redirect,
+    resolve_location,
+    retarget,
+    rewrite_request,
+)
+from http_client.resolver import Resolver, default_resolver
+from http_client.timings import Timings
+from http_client.tls import TLSContext, get_tls_context
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncConnection:
+    def __init__(
+        self,
+        key: tuple,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ):
+        self.key = key
+        self.reader = reader
+        self.writer = writer
+        self.reused = False
+        self.close_delimited = False
+
+    @classmethod
+    async def open(
+        cls,
+        key: tuple,
+        timings: Timings,
+        resolver: Resolver,
+        tls: TLSContext,
+    ):
+        """asyncio не позволяет передать TLS-сессию, поэтому здесь общим
+        остаётся только SSLContext."""
+        scheme, host, port = key
+        context = tls.context if scheme == "https" else None
+        logger.info(f"Attempting to connect to: {host}")
+        sock, resolved = await resolver.connect_async(host, port)
+        timings.mark("dns_done", resolved)
+        timings.mark("connect_done")
+        try:
+            reader, writer = await asyncio.open_connection(
+                sock=sock,
+                ssl=context,
+                server_hostname=host if context else None,
+                limit=http_client.const.MAX_HEAD_SIZE,
+            )
+        except BaseException:
+            sock.close()
+            raise
+        timings.mark("tls_done")
+        return cls(key, reader, writer)
+
+    def is_dropped(self) -> bool:
+        return self.reader.at_eof() or self.writer.is_closing()
+
+    def close(self):
+        self.writer.close()
+
+    async def send(self, request: Request):
+        if isinstance(request.body, bytes):
+            self.writer.writelines(request.prepared.buffers(request.body))
+            await self.writer.drain()
+            return
+        self.writer.write(request.head)
+        for chunk in request.iter_body():
+            self.writer.write(chunk)
+            await self.writer.drain()
+        await self.writer.drain()
+
+    async def read_line(self) -> bytes:
+        try:
+            return await self.reader.readline()
+        except ValueError:
+            raise http_client.errors.IncompleteResponseError(
+                "слишком длинная строка"
+            )
+
+    async def read_exactly(self, length: int) -> bytes:
+        try:
+            return await self.reader.readexactly(length)
+        except asyncio.IncompleteReadError as e:
+            raise http_client.errors.IncompleteResponseError(
+                f"не хватает {length - len(e.partial)} байт тела"
+            )
+
+    async def read_head(self) -> tuple:
+        try:
+            block = await self.reader.readuntil(HEAD_END)
+        except asyncio.IncompleteReadError as e:
+            block = e.partial
+        except asyncio.LimitOverrunError:
+            raise http_client.errors.IncompleteResponseError(
+                "слишком длинный заголовок"
+            )
+        if not block:
+            raise http_client.errors.ConnectionDroppedError(self.key[1])
+        if block.endswith(HEAD_END):
+            block = block[:-len(HEAD_END)]
+        return parse_head(block)
+
+    async def read_body(self, headers: Headers) -> bytes:
+        if is_chunked(headers):
+            body = bytearray()
+            size = parse_chunk_size(await self.read_line())
+            while size:
+                body += await self.read_exactly(size)
+                await self.read_line()
+                size = parse_chunk_size(await self.read_line())
+            while (await self.read_line()).rstrip(b"\r\n"):
+                pass
+            return bytes(body)
+        length = content_length(headers)
+        if length is not None:
+            return await self.read_exactly(length)
+        self.close_delimited = True
+        return await self.reader.read()
+
+    async def read_response(self, method: str, timings: Timings) -> Response:
+        """Асинхронный аналог Response.from_reader."""
+        head = await self.read_head()
+        while 100 <= head[1] < 200 and head[1] != 101:
+            head = await self.read_head()
+        timings.mark("first_byte")
+        message_body = b""
+        if has_body(method, head[1]):
+            message_body = await self.read_body(head[3])
+        timings.mark("done")
+        response = Response.from_head(head, message_body)
+        response.timings = timings
+        return response
+
+
+class AsyncClient:
+    """Асинхронный клиент на asyncio с общими для всех запросов
+    соединениями и ограничением числа одновременных соединений с хостом.
+
+    Пример:
+        async with AsyncClient(timeout=5) as client:
+            responses = await asyncio.gather(
+                *(client.request("GET", url) for url in urls)
+            )
+    """
+
+    def __init__(
+        self,
+        timeout: float = None,
+        redirect: bool = False,
+        limit_per_host: int = http_client.const.ASYNC_LIMIT_PER_HOST,
+        user_agent: str = "Mozilla/5.0",
+        on_timings=None,
+        resolver: Resolver = None,
+        tls: TLSContext = None,
+        decode: bool = True,
+        max_redirects: int = http_client.const.MAX_REDIRECTS,
+    ):
+        self._timeout = timeout
+        self._max_redirects = max_redirects
+        self._decode = decode
+        self._resolver = resolver or default_resolver
+        self._tls = tls or get_tls_context()
+        self._on_timings = on_timings
+        self._redirect = redirect
+        self._limit_per_host = limit_per_host
+        self._user_agent = user_agent
+        self._idle = {}
+        self._semaphores = {}
+
+    @staticmethod
+    def parse_url(url: str):
+        result = http_client.urls.parse_url(url)
+        if not result.host:
+            raise http_client.errors.UrlParsingError(url)
+        return result
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        headers: list = (),
+        data=b"",
+        cookies: str = "",
+    ) -> Response:
+        request = Request(
+            method,
+            self.parse_url(url),
+            list(headers),
+            data,
+            cookies,
+            self._user_agent,
+        )
+        return await asyncio.wait_for(
+            self.send_request(request), self._timeout
+        )
+
+    async def send_request(self, request: Request) -> Response:
+        response = await self.exchange(request)
+        hops, visited = [], {(request.method, str(request.url))}
+        while self._redirect and is_redirect(response):
+            hops.append(response.timings)
+            if len(hops) > self._max_redirects:
+                raise http_client.errors.RedirectError(
+                    f"больше {self._max_redirects} переходов"
+                )
+            code = response.status_code
+            url = resolve_location(request.url, response.headers["location"])
+            logger.info(f"Redirecting ({code}) to: {url}")
+            rewrite_request(request, code)
+            if (request.method, str(url)) in visited:
+                raise http_client.errors.RedirectError(
+                    f"зацикливание на {url}"
+                )
+            visited.add((request.method, str(url)))
+            retarget(request, url)
+            response = await self.exchange(request)
+        response.timings.redirects = hops
+        response.decode_content = self._decode
+        if self._on_timings is not None:
+            self._on_timings(response)
+        return response
+
+    async def exchange(self, request: Request) -> Response:
+        key = (request.url.scheme, request.url.host, request.url.port)
+        semaphore = self._semaphores.setdefault(
+            key, asyncio.Semaphore(self._limit_per_host)
+        )
+        async with semaphore:
+            timings = Timings()
+            conn = self.acquire_idle(key)
+            if conn is None:
+                conn = await AsyncConnection.open(
+                    key, timings, self._resolver, self._tls
+                )
+            else:
+                timings.reused = True
+            try:
+                try:
+                    await conn.send(request)
+                    timings.mark("request_sent")
+                    response = await conn.read_response(
+                        request.method, timings
+                    )
+                except (
+                    ConnectionError,
+                    http_client.errors.ConnectionDroppedError,
+                ):
+                    if not conn.reused or not request.can_replay:
+                        raise
+                    logger.info(f"Pooled connection to {key[1]} was dropped")
+                    conn.close()
+                    timings = Timings()
+                    conn = await AsyncConnection.open(
+                        key, timings, self._resolver, self._tls
+                    )
+                    await conn.send(request)
+                    timings.mark("request_sent")
+                    response = await conn.read_response(
+                        request.method, timings
+                    )
+            except BaseException:
+                conn.close()
+                raise
+            logger.info(f"Received response with code: {response.status_code}")
+            self.release(conn, response)
+        return response
+
+    def acquire_idle(self, key: tuple):
+        idle = self._idle.get(key)
+        while idle:
+            conn = idle.pop()
+            if not conn.is_dropped():
+                return conn
+            conn.close()
+        return None
+
+    def release(self, conn: AsyncConnection, response: Response):
+        if conn.close_delimited or response.will_close:
+            conn.close()
+            return
+        conn.reused = True
+        idle = self._idle.setdefault(conn.key, [])
+        if len(idle) >= self._limit_per_host:
+            conn.close()
+        else:
+            idle.append(conn)
+
+    async def close(self):
+        for idle in self._idle.values():
+            for conn in idle:
+                conn.close()
+        self._idle.clear()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
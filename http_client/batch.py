@@ -0,0 +1,492 @@
+import collections
+import concurrent.futures
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import time
+import urllib.parse
+import zlib
+import http_client.const
+import http_client.errors
+from http_client.client import Client
+from http_client.pool import ConnectionPool
+from http_client.resolver import default_resolver
+from http_client.scheduler import FairDispatcher, HostScheduler
+from http_client.tls import get_tls_context
+from http_client.urls import parse_url
+
+logger = logging.getLogger(__name__)
+
+
+def parse_spec(line: str) -> dict:
+    """Строка batch-файла: JSON-объект с полями url, method, headers, data
+    или просто "[METHOD] URL". Некорректная строка - ValueError."""
+    line = line.strip()
+    if line.startswith("{"):
+        spec = json.loads(line)
+    else:
+        parts = line.split()
+        if len(parts) > 2:
+            raise ValueError("строка не в формате [METHOD] URL")
+        spec = {"url": parts[-1]}
+        if len(parts) > 1:
+            spec["method"] = parts[0].upper()
+    if not isinstance(spec, dict) or not isinstance(spec.get("url"), str):
+        raise ValueError("в строке нет адреса url")
+    spec.setdefault("method", "POST" if spec.get("data") else "GET")
+    spec.setdefault("headers", [])
+    spec.setdefault("data", "")
+    headers = spec["headers"]
+    if not isinstance(headers, list) or not all(
+        isinstance(header, list) and len(header) == 2 for header in headers
+    ):
+        raise ValueError("headers - не список пар [имя, значение]")
+    if not isinstance(spec["method"], str) or not isinstance(
+        spec["data"], str
+    ):
+        raise ValueError("method и data должны быть строками")
+    return spec
+
+
+def read_specs(lines) -> iter:
+    """Непустые строки batch-файла, кроме комментариев."""
+    for line in lines:
+        if line.strip() and not line.lstrip().startswith("#"):
+            yield line.strip()
+
+
+class BatchSummary:
+    def __init__(self):
+        self.total = 0
+        self.errors = 0
+        self.statuses = collections.Counter()
+        self.started = time.monotonic()
+        self.elapsed = 0.0
+
+    def add(self, record: dict):
+        self.total += 1
+        if record["error"]:
+            self.errors += 1
+        else:
+            self.statuses[record["status"]] += 1
+
+    def merge(self, other):
+        self.total += other.total
+        self.errors += other.errors
+        self.statuses.update(other.statuses)
+
+    def finish(self):
+        self.elapsed = time.monotonic() - self.started
+
+    @property
+    def requests_per_second(self) -> float:
+        return self.total / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self):
+        statuses = ", ".join(
+            f"{code}: {count}" for code, count in sorted(self.statuses.items())
+        )
+        return (
+            f"{self.total} requests in {self.elapsed:.3f} s "
+            f"({self.requests_per_second:.1f} req/s), "
+            f"errors: {self.errors}, statuses: {{{statuses}}}"
+        )
+
+
+class BatchRunner:
+    """Выполняет набор запросов пулом потоков с общим пулом соединений.
+    Результаты записываются по одной JSON-строке на запрос. Если задан
+    body_dir, тело каждого ответа сохраняется в файл <index>.body в этом
+    каталоге, а путь к нему - в поле body_file записи.
+
+    С планировщиком (scheduler) запросы ждут своей очереди по хостам в
+    FairDispatcher и учитывают его ограничения, а в очереди может быть
+    до SCHEDULER_QUEUE_SIZE запросов, чтобы ограниченный хост не
+    задерживал чтение запросов к остальным.
+
+    cookie_jar - общий для всех запросов CookieJar: cookie, полученные в
+    одном ответе, уходят в следующих запросах к тому же домену."""
+
+    def __init__(
+        self,
+        concurrency: int = http_client.const.BATCH_CONCURRENCY,
+        ordered: bool = True,
+        timeout: float = None,
+        redirect: bool = False,
+        user_agent: str = "Mozilla/5.0",
+        headers: list = (),
+        cookie_file: str = None,
+        pool: ConnectionPool = None,
+        cache=None,
+        body_dir: str = None,
+        scheduler: HostScheduler = None,
+        retry=None,
+        cookie_jar=None,
+    ):
+        self.concurrency = concurrency
+        self.ordered = ordered
+        self.timeout = timeout
+        self.redirect = redirect
+        self.user_agent = user_agent
+        self.headers = list(headers)
+        self.cookie_file = cookie_file
+        self.pool = pool or ConnectionPool(max_idle_per_host=concurrency)
+        self.cache = cache
+        self.body_dir = body_dir
+        self.scheduler = scheduler
+        self.retry = retry
+        self.cookie_jar = cookie_jar
+
+    def fetch(self, index: int, spec) -> dict:
+        """spec - словарь или строка в формате parse_spec."""
+        record = {
+            "index": index,
+            "url": spec.get("url") if isinstance(spec, dict) else spec,
+            "method": None,
+            "status": None,
+            "reason": None,
+            "length": 0,
+            "elapsed": 0.0,
+            "error": None,
+        }
+        if self.body_dir is not None:
+            record["body_file"] = None
+        if self.retry is not None:
+            record["retries"] = 0
+        started = time.monotonic()
+        try:
+            if isinstance(spec, str):
+                spec = parse_spec(spec)
+            record["url"], record["method"] = spec["url"], spec["method"]
+            client = Client(
+                spec["url"],
+                spec["method"],
+                spec["data"],
+                None,
+                True,
+                self.headers + [list(h) for h in spec["headers"]],
+                False,
+                self.user_agent,
+                self.timeout,
+                self.redirect,
+                self.cookie_file,
+                pool=self.pool,
+                cache=self.cache,
+                scheduler=self.scheduler,
+                retry=self.retry,
+                cookie_jar=self.cookie_jar,
+            )
+            response = client.send_request(stream=True)
+            if self.body_dir is None:
+                for chunk in response.iter_body():
+                    record["length"] += len(chunk)
+            else:
+                record["length"] = self.save_body(index, response)
+                record["body_file"] = self.body_path(index)
+            record["status"] = response.status_code
+            record["reason"] = response.reason_phrase
+            if self.retry is not None:
+                record["retries"] = response.retries
+        except (http_client.errors.APIError, OSError, ValueError) as e:
+            record["error"] = f"{type(e).__name__}: {e}"
+        record["elapsed"] = round(time.monotonic() - started, 6)
+        return record
+
+    def body_path(self, index: int) -> str:
+        return os.path.join(self.body_dir, f"{index}.body")
+
+    def save_body(self, index: int, response) -> int:
+        """Записывает тело в файл по мере чтения; недочитанный файл
+        удаляется."""
+        length = 0
+        try:
+            with open(self.body_path(index), "wb") as file:
+                for chunk in response.iter_body():
+                    file.write(chunk)
+                    length += len(chunk)
+        except BaseException:
+            os.unlink(self.body_path(index))
+            raise
+        return length
+
+    def host_key(self, spec) -> tuple:
+        """Ключ хоста для очереди планировщика; для некорректного запроса
+        - пустой (ошибку запишет fetch)."""
+        try:
+            if isinstance(spec, str):
+                spec = parse_spec(spec)
+            return self.scheduler.key(parse_url(spec["url"]))
+        except (http_client.errors.APIError, ValueError, KeyError, TypeError):
+            return "", None
+
+    def run(self, specs, write) -> BatchSummary:
+        """Не более concurrency запросов выполняются одновременно, ещё
+        столько же ждут в очереди. write вызывается для каждой записи
+        в порядке входа (ordered) или по мере готовности."""
+        return self.run_indexed(enumerate(specs), write)
+
+    def run_indexed(self, items, write) -> BatchSummary:
+        """То же, что run, для пар (index, spec) с заранее заданными
+        номерами."""
+        summary = BatchSummary()
+        pending = collections.deque()
+
+        def flush(block: bool):
+            if self.ordered:
+                while pending and (block or pending[0].done()):
+                    emit([pending.popleft()])
+                    block = False
+                return
+            if not pending:
+                return
+            done, _ = concurrent.futures.wait(
+                pending,
+                timeout=None if block else 0,
+                return_when=concurrent.futures.FIRST_COMPLETED,
+            )
+            for future in done:
+                pending.remove(future)
+            emit(done)
+
+        def emit(futures):
+            for future in futures:
+                record = future.result()
+                summary.add(record)
+                write(record)
+
+        window = 2 * self.concurrency
+        if self.scheduler is not None:
+            window = max(window, http_client.const.SCHEDULER_QUEUE_SIZE)
+        with concurrent.futures.ThreadPoolExecutor(
+            self.concurrency
+        ) as executor:
+            dispatcher = None
+            if self.scheduler is not None:
+                dispatcher = FairDispatcher(
+                    self.scheduler, executor, self.concurrency
+                )
+            for index, spec in items:
+                if dispatcher is None:
+                    future = executor.submit(self.fetch, index, spec)
+                else:
+                    future = dispatcher.submit(
+                        self.host_key(spec), self.fetch, index, spec
+                    )
+                pending.append(future)
+                flush(block=len(pending) >= window)
+            while pending:
+                flush(block=True)
+            if dispatcher is not None:
+                dispatcher.close()
+        summary.finish()
+        logger.info(f"Batch finished: {summary}")
+        return summary
+
+    def close(self):
+        self.pool.close()
+
+
+def shard_of(spec, shards: int) -> tuple:
+    """Разобранный spec (или исходная строка, если её не разобрать - тогда
+    ошибку запишет процесс), хост и номер процесса для запроса. Запросы
+    к одному хосту и порту попадают в один процесс и делят его пул
+    соединений."""
+    try:
+        if isinstance(spec, str):
+            spec = parse_spec(spec)
+        host = urllib.parse.urlsplit(spec["url"]).netloc.lower()
+    except (ValueError, KeyError, TypeError, AttributeError):
+        host = ""
+    return spec, host, zlib.crc32(host.encode()) % shards
+
+
+def run_worker(worker: int, options: dict, inbox, outbox):
+    """Процесс ProcessBatchRunner: свой пул потоков, пул соединений и
+    TLS-контекст. Записи уходят в outbox по мере готовности, в конце -
+    сводка процесса. Подмены адресов (--resolve) и уровень журнала
+    приходят из родителя: при spawn процесс их не наследует."""
+    logging.basicConfig(
+        format=http_client.const.LOG_FORMAT, level=options.pop("log_level")
+    )
+    default_resolver.overrides.update(options.pop("overrides"))
+    verify, cafile = options.pop("verify"), options.pop("cafile")
+    cache_dir = options.pop("cache_dir")
+    rate, burst, max_in_flight = options.pop("limits")
+    cookie_jar = None
+    if options["cookie_jar"]:
+        from http_client.cookies import CookieJar
+
+        cookie_jar = CookieJar(options["cookie_jar"])
+    options["cookie_jar"] = cookie_jar
+    scheduler = None
+    if rate or max_in_flight:
+        scheduler = HostScheduler(rate, burst, max_in_flight)
+    cache = None
+    if cache_dir:
+        from http_client.cache import ResponseCache
+
+        cache = ResponseCache(cache_dir)
+    pool = ConnectionPool(
+        max_idle_per_host=options["concurrency"],
+        tls=get_tls_context(verify, cafile),
+    )
+    runner = BatchRunner(
+        ordered=False, pool=pool, cache=cache, scheduler=scheduler, **options
+    )
+    try:
+        summary = runner.run_indexed(
+            iter(inbox.get, None), lambda record: outbox.put(record)
+        )
+    finally:
+        runner.close()
+        if cookie_jar is not None:
+            cookie_jar.save()
+    outbox.put((worker, os.getpid(), summary))
+
+
+class ProcessBatchRunner:
+    """Выполняет набор запросов в processes процессах, распределяя адреса
+    по хостам, - для обходов, где разбор и раскодирование ответов
+    упираются в одно ядро. Каждый процесс - отдельный BatchRunner со
+    своими пулами потоков и соединений. В родитель возвращаются только
+    записи: тела ответов (при body_dir) процессы пишут в файлы сами, не
+    передавая их байты через pickle.
+
+    Процессы запускаются методом spawn: родитель может быть
+    многопоточным, а fork такого процесса небезопасен. Ограничения на хост
+    (rate, burst, max_in_flight, как в HostScheduler) соблюдаются точно:
+    каждый хост обслуживает один процесс.
+
+    cookie_jar - путь к базе CookieJar: процесс загружает её при запуске
+    и записывает в неё свои изменения по завершении."""
+
+    def __init__(
+        self,
+        processes: int,
+        concurrency: int = http_client.const.BATCH_CONCURRENCY,
+        ordered: bool = True,
+        timeout: float = None,
+        redirect: bool = False,
+        user_agent: str = "Mozilla/5.0",
+        headers: list = (),
+        cookie_file: str = None,
+        verify: bool = True,
+        cafile: str = None,
+        cache_dir: str = None,
+        body_dir: str = None,
+        rate: float = None,
+        burst: int = 1,
+        max_in_flight: int = None,
+        retry=None,
+        cookie_jar: str = None,
+    ):
+        self.processes = processes
+        self.ordered = ordered
+        self.options = {
+            "concurrency": concurrency,
+            "timeout": timeout,
+            "redirect": redirect,
+            "user_agent": user_agent,
+            "headers": list(headers),
+            "cookie_file": cookie_file,
+            "body_dir": body_dir,
+            "retry": retry,
+            "cookie_jar": cookie_jar,
+            "verify": verify,
+            "cafile": cafile,
+            "cache_dir": cache_dir,
+            "limits": (rate, burst, max_in_flight),
+        }
+        self.workers = {}
+        self.hosts = [set() for _ in range(processes)]
+
+    def run(self, specs, write) -> BatchSummary:
+        """Как BatchRunner.run; сводки процессов после завершения - в
+        workers (номер -> (pid, BatchSummary))."""
+        context = multiprocessing.get_context("spawn")
+        options = dict(
+            self.options,
+            overrides=dict(default_resolver.overrides),
+            log_level=logging.getLogger().getEffectiveLevel(),
+        )
+        outbox = context.Queue()
+        inboxes = [
+            context.Queue(2 * self.options["concurrency"])
+            for _ in range(self.processes)
+        ]
+        processes = [
+            context.Process(
+                target=run_worker,
+                args=(worker, options, inboxes[worker], outbox),
+                daemon=True,
+            )
+            for worker in range(self.processes)
+        ]
+        for process in processes:
+            process.start()
+        summary = BatchSummary()
+        waiting, expected = {}, 0
+
+        def emit(record: dict):
+            nonlocal expected
+            if not self.ordered:
+                summary.add(record)
+                write(record)
+                return
+            waiting[record["index"]] = record
+            while expected in waiting:
+                record = waiting.pop(expected)
+                summary.add(record)
+                write(record)
+                expected += 1
+
+        def receive(timeout: float):
+            try:
+                message = outbox.get(timeout=timeout)
+            except queue.Empty:
+                for worker, process in enumerate(processes):
+                    if worker not in self.workers and process.exitcode:
+                        raise http_client.errors.BatchWorkerError(
+                            worker, process.exitcode
+                        )
+                return
+            if isinstance(message, dict):
+                emit(message)
+            else:
+                worker, pid, worker_summary = message
+                self.workers[worker] = (pid, worker_summary)
+
+        try:
+            for index, spec in enumerate(specs):
+                spec, host, worker = shard_of(spec, self.processes)
+                self.hosts[worker].add(host)
+                while True:
+                    try:
+                        inboxes[worker].put((index, spec), timeout=0.05)
+                        break
+                    except queue.Full:
+                        receive(0)
+                while not outbox.empty():
+                    receive(0)
+            for inbox in inboxes:
+                inbox.put(None)
+            while len(self.workers) < self.processes:
+                receive(0.5)
+        finally:
+            for process in processes:
+                process.join(timeout=1)
+                if process.is_alive():
+                    process.terminate()
+        summary.finish()
+        logger.info(f"Batch finished in {self.processes} processes: {summary}")
+        return summary
+
+    def report(self) -> str:
+        """Сводки процессов, по строке на процесс."""
+        return "\n".join(
+            f"worker {worker} (pid {pid}, {len(self.hosts[worker])} hosts): "
+            f"{summary}"
+            for worker, (pid, summary) in sorted(self.workers.items())
+        )
@@ -0,0 +1,152 @@
+import collections
+import logging
+import threading
+import time
+import http_client.const
+import http_client.errors
+from http_client.client import Client
+from http_client.histogram import Histogram
+from http_client.pool import ConnectionPool
+from http_client.tls import TLSContext
+
+logger = logging.getLogger(__name__)
+
+
+class BenchReport:
+    def __init__(self):
+        self.latency = Histogram()
+        self.statuses = collections.Counter()
+        self.errors = collections.Counter()
+        self.received = 0
+        self.elapsed = 0.0
+
+    @property
+    def requests(self) -> int:
+        return self.latency.total + sum(self.errors.values())
+
+    @property
+    def requests_per_second(self) -> float:
+        return self.requests / self.elapsed if self.elapsed else 0.0
+
+    def merge(self, other: "BenchReport"):
+        self.latency.merge(other.latency)
+        self.statuses.update(other.statuses)
+        self.errors.update(other.errors)
+        self.received += other.received
+
+    def __str__(self):
+        def ms(value: int) -> str:
+            return f"{value / 1000:.3f}"
+
+        lines = [
+            f"Requests: {self.requests} in {self.elapsed:.3f} s, "
+            f"errors: {sum(self.errors.values())}",
+            f"Throughput: {self.requests_per_second:.1f} req/s, "
+            f"{self.received / max(self.elapsed, 1e-9) / 2 ** 20:.2f} MiB/s",
+            "Latency (ms): "
+            + "  ".join(
+                f"p{p} {ms(self.latency.percentile(p))}" for p in (50, 90, 99)
+            )
+            + f"  max {ms(self.latency.max)}"
+            + f"  mean {ms(self.latency.mean)}",
+            "Status codes: "
+            + ", ".join(
+                f"{code}: {count}"
+                for code, count in sorted(self.statuses.items())
+            ),
+        ]
+        for error, count in sorted(self.errors.items()):
+            lines.append(f"Error {error}: {count}")
+        return "\n".join(lines)
+
+
+class Benchmark:
+    """Нагрузочный режим: concurrency потоков повторяют один и тот же
+    запрос, пока не отправлено requests запросов или не истекло duration
+    секунд. При заданном rate запросы запускаются равномерно с общей
+    частотой rate в секунду. Задержки (в микросекундах) копятся в
+    гистограммах потоков и объединяются в конце."""
+
+    def __init__(
+        self,
+        cmd_args: tuple,
+        requests: int = None,
+        duration: float = None,
+        concurrency: int = 1,
+        rate: float = None,
+        tls: TLSContext = None,
+    ):
+        if requests is None and duration is None:
+            requests = http_client.const.BENCH_REQUESTS
+        self.cmd_args = cmd_args
+        self.requests = requests
+        self.duration = duration
+        self.concurrency = concurrency
+        self.rate = rate
+        self.tls = tls
+        self._issued = 0
+        self._lock = threading.Lock()
+
+    def next_slot(self, started: float, deadline: float):
+        """Время запуска следующего запроса или None, если пора
+        остановиться."""
+        with self._lock:
+            if self.requests is not None and self._issued >= self.requests:
+                return None
+            slot = time.monotonic()
+            if self.rate:
+                slot = max(slot, started + self._issued / self.rate)
+            if slot >= deadline:
+                return None
+            self._issued += 1
+            return slot
+
+    def worker(self, client, started: float, deadline: float, report):
+        while True:
+            slot = self.next_slot(started, deadline)
+            if slot is None:
+                break
+            delay = slot - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            begin = time.perf_counter()
+            try:
+                response = client.send_request(stream=True)
+                for chunk in response.iter_body():
+                    report.received += len(chunk)
+            except (http_client.errors.APIError, OSError) as e:
+                report.errors[type(e).__name__] += 1
+                continue
+            report.latency.record((time.perf_counter() - begin) * 10 ** 6)
+            report.statuses[response.status_code] += 1
+
+    def run(self) -> BenchReport:
+        report = BenchReport()
+        reports = [BenchReport() for _ in range(self.concurrency)]
+        with ConnectionPool(
+            max_idle_per_host=self.concurrency, tls=self.tls
+        ) as pool:
+            clients = [
+                Client(*self.cmd_args, pool=pool)
+                for _ in range(self.concurrency)
+            ]
+            started = time.monotonic()
+            deadline = started + (self.duration or float("inf"))
+            threads = [
+                threading.Thread(
+                    target=self.worker,
+                    args=(client, started, deadline, worker_report),
+                )
+                for client, worker_report in zip(clients, reports)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            for client in clients:
+                client.close()
+        report.elapsed = time.monotonic() - started
+        for worker_report in reports:
+            report.merge(worker_report)
+        logger.info(f"Benchmark finished: {report.requests} requests")
+        return report
@@ -0,0 +1,374 @@
+import collections
+import email.utils
+import hashlib
+import json
+import logging
+import mmap
+import os
+import tempfile
+import threading
+import time
+import http_client.const
+from http_client.headers import Headers
+from http_client.models import Request, Response
+from http_client.reader import content_length
+
+logger = logging.getLogger(__name__)
+
+
+def parse_cache_control(value: str) -> dict:
+    """Директивы Cache-Control: имя в нижнем регистре -> значение или
+    None."""
+    result = {}
+    for part in value.split(","):
+        name, _, argument = part.partition("=")
+        name = name.strip().lower()
+        if name:
+            result[name] = argument.strip().strip('"') or None
+    return result
+
+
+def parse_date(value: str):
+    """Время HTTP-даты в секундах эпохи или None."""
+    try:
+        return email.utils.parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def to_seconds(value) -> int:
+    try:
+        return max(int(value), 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def freshness_lifetime(headers: Headers) -> float:
+    """Время свежести ответа: max-age, иначе Expires относительно Date.
+    no-cache и отсутствие сведений дают 0 - ответ нужно перепроверять."""
+    directives = parse_cache_control(headers.get("cache-control", ""))
+    if "no-cache" in directives:
+        return 0
+    if "max-age" in directives:
+        return to_seconds(directives["max-age"])
+    expires = parse_date(headers.get("expires", ""))
+    if expires is None:
+        return 0
+    date = parse_date(headers.get("date", "")) or time.time()
+    return max(expires - date, 0)
+
+
+def map_file(path: str):
+    """Содержимое файла через mmap без чтения в память процесса."""
+    with open(path, "rb") as file:
+        if not os.fstat(file.fileno()).st_size:
+            return b""
+        return memoryview(
+            mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        )
+
+
+class CacheEntry:
+    """Сохранённый ответ. Тело - сырые байты в том виде, в каком их
+    прислал сервер (до снятия Content-Encoding): bytes или отображённый
+    в память файл дискового хранилища."""
+
+    def __init__(
+        self,
+        url: str,
+        head: tuple,
+        fields: list,
+        stored_at: float,
+        lifetime: float,
+        vary: dict,
+        body=b"",
+    ):
+        self.url = url
+        self.proto, self.status_code, self.reason_phrase = head
+        self.fields = fields
+        self.stored_at = stored_at
+        self.lifetime = lifetime
+        self.vary = vary
+        self.body = body
+
+    @property
+    def headers(self) -> Headers:
+        return Headers.from_fields(list(self.fields))
+
+    def is_fresh(self, now: float = None) -> bool:
+        return (now or time.time()) - self.stored_at < self.lifetime
+
+    def matches(self, request: Request) -> bool:
+        """Заголовки запроса из Vary совпадают с сохранёнными."""
+        return all(
+            request.headers.get(name) == value
+            for name, value in self.vary.items()
+        )
+
+    def validators(self) -> dict:
+        headers, result = self.headers, {}
+        if "etag" in headers:
+            result["If-None-Match"] = headers["etag"]
+        if "last-modified" in headers:
+            result["If-Modified-Since"] = headers["last-modified"]
+        return result
+
+    def to_response(self) -> Response:
+        response = Response.from_head(
+            (self.proto, self.status_code, self.reason_phrase, self.headers),
+            self.body,
+        )
+        response.from_cache = True
+        return response
+
+    def to_json(self) -> dict:
+        return {
+            "url": self.url,
+            "head": [self.proto, self.status_code, self.reason_phrase],
+            "headers": [
+                [str(name, "ISO-8859-1"), str(value, "ISO-8859-1")]
+                for name, value in self.fields
+            ],
+            "stored_at": self.stored_at,
+            "lifetime": self.lifetime,
+            "vary": self.vary,
+        }
+
+    @classmethod
+    def from_json(cls, data: dict, body) -> "CacheEntry":
+        return cls(
+            data["url"],
+            tuple(data["head"]),
+            [
+                (name.encode("ISO-8859-1"), value.encode("ISO-8859-1"))
+                for name, value in data["headers"]
+            ],
+            data["stored_at"],
+            data["lifetime"],
+            data["vary"],
+            body,
+        )
+
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.stored = 0
+
+    def __str__(self):
+        return (
+            f"Cache: {self.hits} hits, {self.revalidated} revalidated, "
+            f"{self.misses} misses, {self.stored} stored"
+        )
+
+
+class CacheWriter:
+    """Приёмник сырых частей тела ответа (см. Response.tee). Тело пишется
+    во временный файл хранилища или в память; запись сохраняется в кэш
+    только после того, как тело прочитано до конца, и отменяется, если
+    оно превысило max_body_size."""
+
+    def __init__(self, cache: "ResponseCache", entry: CacheEntry):
+        self.cache = cache
+        self.entry = entry
+        self.size = 0
+        self._file = None
+        self._buffer = bytearray()
+        self._failed = False
+
+    def write(self, chunk):
+        if self._failed:
+            return
+        self.size += len(chunk)
+        if self.size > self.cache.max_body_size:
+            self.abort()
+            self._failed = True
+            return
+        if self.cache.directory is None:
+            self._buffer += chunk
+            return
+        if self._file is None:
+            self._file = tempfile.NamedTemporaryFile(
+                dir=self.cache.directory, suffix=".tmp", delete=False
+            )
+        self._file.write(chunk)
+
+    def close(self):
+        if self._failed:
+            return
+        if self._file is not None:
+            self._file.close()
+            self.cache.commit(self.entry, self._file.name)
+        else:
+            self.entry.body = bytes(self._buffer)
+            self.cache.commit(self.entry)
+
+    def abort(self):
+        self._buffer = bytearray()
+        if self._file is not None:
+            self._file.close()
+            os.unlink(self._file.name)
+            self._file = None
+
+
+class ResponseCache:
+    """Кэш ответов на GET-запросы: LRU на max_entries записей в памяти и,
+    если задан directory, дисковое хранилище (метаданные в JSON, тело
+    отдельным файлом, который отдаётся через mmap). Свежесть
+    определяется по Cache-Control: max-age и Expires; ответы с no-store
+    не сохраняются, а устаревшие перепроверяются условным запросом с
+    If-None-Match/If-Modified-Since."""
+
+    def __init__(
+        self,
+        directory: str = None,
+        max_entries: int = http_client.const.CACHE_MAX_ENTRIES,
+        max_body_size: int = http_client.const.CACHE_MAX_BODY_SIZE,
+    ):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_body_size = max_body_size
+        self.stats = CacheStats()
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(request: Request) -> str:
+        return str(request.url.with_fragment(None))
+
+    def path(self, key: str, suffix: str) -> str:
+        name = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(self.directory, name + suffix)
+
+    def count(self, name: str):
+        with self._lock:
+            setattr(self.stats, name, getattr(self.stats, name) + 1)
+
+    def lookup(self, request: Request):
+        """Сохранённый ответ на запрос или None."""
+        key = self.key(request)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None and self.directory is not None:
+            entry = self.load(key)
+        if entry is None or not entry.matches(request):
+            return None
+        return entry
+
+    def load(self, key: str):
+        try:
+            with open(self.path(key, ".json"), "r") as file:
+                data = json.load(file)
+            entry = CacheEntry.from_json(
+                data, map_file(self.path(key, ".body"))
+            )
+        except (OSError, ValueError, KeyError):
+            return None
+        self.remember(key, entry)
+        return entry
+
+    def remember(self, key: str, entry: CacheEntry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def can_store(self, request: Request, response: Response) -> bool:
+        headers = response.headers
+        directives = parse_cache_control(headers.get("cache-control", ""))
+        requested = parse_cache_control(
+            request.headers.get("Cache-Control", "")
+        )
+        length = content_length(headers)
+        return (
+            request.method == "GET"
+            and response.status_code in http_client.const.CACHEABLE_CODES
+            and "no-store" not in directives
+            and "no-store" not in requested
+            and headers.get("vary", "").strip() != "*"
+            and to_seconds(length) <= self.max_body_size
+            and (
+                freshness_lifetime(headers) > 0
+                or "etag" in headers
+                or "last-modified" in headers
+            )
+        )
+
+    def new_entry(self, request: Request, response: Response) -> CacheEntry:
+        headers = response.headers
+        vary = {}
+        for name in headers.get("vary", "").split(","):
+            if name.strip():
+                vary[name.strip()] = request.headers.get(name.strip())
+        age = to_seconds(headers.get("age"))
+        return CacheEntry(
+            self.key(request),
+            (response.proto, response.status_code, response.reason_phrase),
+            headers.fields,
+            time.time() - age,
+            freshness_lifetime(headers),
+            vary,
+        )
+
+    def store(self, request: Request, response: Response):
+        """Сохраняет ответ, копируя его тело по мере чтения. Ответ нужно
+        передать до того, как начато чтение тела."""
+        if not self.can_store(request, response):
+            return
+        response.tee(CacheWriter(self, self.new_entry(request, response)))
+
+    def commit(self, entry: CacheEntry, body_file: str = None):
+        if body_file is not None:
+            os.replace(body_file, self.path(entry.url, ".body"))
+            entry.body = map_file(self.path(entry.url, ".body"))
+            self.save(entry)
+        self.remember(entry.url, entry)
+        self.count("stored")
+        logger.debug(f"Stored response for: {entry.url}")
+
+    def save(self, entry: CacheEntry):
+        meta = self.path(entry.url, ".json")
+        with tempfile.NamedTemporaryFile(
+            "w", dir=self.directory, suffix=".tmp", delete=False
+        ) as file:
+            json.dump(entry.to_json(), file)
+        os.replace(file.name, meta)
+
+    def refresh(self, entry: CacheEntry, response: Response) -> CacheEntry:
+        """Обновляет запись по ответу 304: заголовки ответа заменяют
+        сохранённые (кроме Content-Length), отсчёт свежести начинается
+        заново."""
+        headers = entry.headers
+        for name, value in response.headers.items():
+            if name.lower() != "content-length":
+                headers[name] = value
+        entry.fields = headers.fields
+        entry.lifetime = freshness_lifetime(headers)
+        entry.stored_at = time.time() - to_seconds(headers.get("age"))
+        if self.directory is not None:
+            self.save(entry)
+        self.remember(entry.url, entry)
+        return entry
+
+    def invalidate(self, request: Request):
+        """Удаляет запись: небезопасный запрос мог изменить ресурс."""
+        key = self.key(request)
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.directory is not None:
+            for suffix in (".json", ".body"):
+                try:
+                    os.unlink(self.path(key, suffix))
+                except OSError:
+                    pass
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
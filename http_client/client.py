@@ -1,11 +1,22 @@
+import functools
 import io
-import socket
-import ssl
 import logging
+import time
 import http_client.const
 import http_client.errors
-from yarl import URL
 from http_client.models import Request, Response
+from http_client.pool import ConnectionPool
+from http_client.redirects import (
+    RedirectMemo,
+    default_redirects,
+    is_redirect,
+    resolve_location,
+    retarget,
+    rewrite_request,
+)
+from http_client.timings import Timings
+from http_client.tls import TLSContext
+from http_client.urls import origin, parse_url
 
 logger = logging.getLogger(__name__)
 
@@ -24,16 +35,41 @@ class Client:
         timeout: float,
         redirect: bool,
         cookie_file: str,
+        pool: ConnectionPool = None,
+        on_timings=None,
+        tls: TLSContext = None,
+        decode: bool = True,
+        cache=None,
+        max_redirects: int = http_client.const.MAX_REDIRECTS,
+        redirects: RedirectMemo = None,
+        scheduler=None,
+        retry=None,
+        cookie_jar=None,
     ):
+        """pool - общий ConnectionPool, tls - настройки TLS своего пула,
+        on_timings(response) - вызов по получении ответа целиком, decode -
+        раскодировать сжатое тело, cache - ResponseCache, max_redirects и
+        redirects - предел переходов и RedirectMemo, scheduler -
+        HostScheduler, retry - RetryPolicy, cookie_jar - CookieJar."""
         self._redirect = redirect
+        self._max_redirects = max_redirects
+        self._redirects = redirects or default_redirects
         self._include = include
         self._timeout = timeout
+        self._on_timings = on_timings
+        self._decode = decode
+        self._cache = cache
+        self._scheduler = scheduler
+        self._retry = retry
+        self._cookie_jar = cookie_jar
         self._user_data = self.extract_input_data(upload_file, cmd_data)
         self._cookies = self.extract_cookies(cookie_file)
-        self._url = URL(url)
+        self._url = parse_url(url)
         if not self._url.host:
             raise http_client.errors.UrlParsingError(url)
-        self._sock = self.initialize_socket(self._url.scheme, timeout)
+        self._own_pool = pool is None
+        self._pool = ConnectionPool(tls=tls) if pool is None else pool
+        self._conn = None
         self.request = Request(
             method,
             self._url,
@@ -55,18 +91,9 @@ class Client:
                 if cookie.rstrip("\n"):
                     result.append(cookie.rstrip("\n"))
 
-            return URL(";".join(result)).raw_path
+            from yarl import URL
 
-    @staticmethod
-    def initialize_socket(scheme: str, timeout: float) -> socket.socket:
-        result_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        result_socket.settimeout(timeout)
-        if scheme == "https":
-            context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
-            context.check_hostname = False
-            context.verify_mode = ssl.CERT_NONE
-            return context.wrap_socket(result_socket)
-        return result_socket
+            return URL(";".join(result)).raw_path
 
     @staticmethod
     def extract_input_data(filename: str, cmd_data: str):
@@ -76,40 +103,355 @@ class Client:
             return open(filename, "br")
         return io.BytesIO(cmd_data.encode("ISO-8859-1"))
 
-    def send_request(self) -> Response:
+    def send_request(self, stream=False) -> Response:
+        """Отправляет запрос. При stream=True тело ответа не читается
+        сразу: его нужно получить через Response.iter_body/raw, после
+        чего соединение вернётся в пул.
+
+        При redirect=True перенаправления выполняются циклом, не более
+        max_redirects переходов; повторный переход по уже пройденному
+        адресу считается зацикливанием. Тело ответа-перенаправления
+        дочитывается, чтобы соединение вернулось в пул и переход на тот
+        же хост выполнился по нему же."""
+        if not self._redirect:
+            return self.send_hop(stream)
+        request, hops = self.request, []
+        visited = {(request.method, str(request.url))}
+        self.apply_known_redirects(visited)
+        response = self.send_hop(stream=True)
+        while is_redirect(response):
+            response.read()
+            hops.append(response.timings)
+            if len(hops) > self._max_redirects:
+                raise http_client.errors.RedirectError(
+                    f"больше {self._max_redirects} переходов"
+                )
+            self.follow(response, visited)
+            self.apply_known_redirects(visited)
+            response = self.send_hop(stream=True)
+        response.timings.redirects = hops + response.timings.redirects
+        if not stream:
+            response.read()
+        return response
+
+    def follow(self, response: Response, visited: set):
+        request = self.request
+        url = resolve_location(request.url, response.headers["location"])
+        code = response.status_code
+        logger.info(f"Redirecting ({code}) to: {url}")
+        rewrite_request(request, code)
+        if code in (301, 308):
+            self._redirects.remember(request.url, code, url)
+        self.move_to(url, visited)
+
+    def apply_known_redirects(self, visited: set):
+        """Переходит по запомненным постоянным перенаправлениям без
+        обращения к серверу."""
+        while True:
+            url = self._redirects.lookup(self.request.method, self.request.url)
+            if url is None:
+                return
+            logger.info(f"Known permanent redirect to: {url}")
+            self.move_to(url, visited)
+
+    def move_to(self, url, visited: set):
+        key = (self.request.method, str(url))
+        if key in visited:
+            raise http_client.errors.RedirectError(f"зацикливание на {url}")
+        visited.add(key)
+        self.reconnect_socket(url)
+
+    def send_hop(self, stream=False) -> Response:
+        """Один обмен запрос-ответ без перехода по перенаправлениям (с
+        учётом кэша и повторов)."""
+        if self._retry is None:
+            return self.send_once(stream)
+        return self._retry.run(
+            self.request, functools.partial(self.send_once, stream)
+        )
+
+    def send_once(self, stream=False) -> Response:
+        if self._cache is None:
+            return self.send_uncached(stream)
+        if self.request.method not in http_client.const.SAFE_METHODS:
+            self._cache.invalidate(self.request)
+            return self.send_uncached(stream)
+        if self.request.method != "GET":
+            return self.send_uncached(stream)
+        return self.send_cached(stream)
+
+    def send_cached(self, stream=False) -> Response:
+        """Свежий ответ из кэша отдаётся без обращения к сети, устаревший
+        перепроверяется условным запросом, а новый сохраняется по мере
+        чтения тела."""
+        cache, request = self._cache, self.request
+        requested = request.headers.get("Cache-Control", "").lower()
+        entry = None if "no-store" in requested else cache.lookup(request)
+        if entry is not None and "no-cache" not in requested:
+            if entry.is_fresh():
+                cache.count("hits")
+                logger.info(f"Cache hit: {request.url}")
+                return self.cached_response(entry)
+        validators = {}
+        if entry is not None:
+            validators = {
+                name: value
+                for name, value in entry.validators().items()
+                if name not in request.headers
+            }
+        for name, value in validators.items():
+            request.headers[name] = value
         try:
-            logger.info(f"Attempting to connect to: {self.request.url.host}")
-            self._sock.connect((self.request.url.host, self.request.url.port))
-            self._sock.sendall(bytes(self.request))
-        except socket.gaierror:
-            raise http_client.errors.ConnectingError(
-                self.request.url.host, self.request.url.port
+            response = self.send_uncached(stream=True)
+        finally:
+            for name in validators:
+                if name in request.headers:
+                    del request.headers[name]
+        if entry is not None and response.status_code == 304:
+            response.read()
+            cache.count("revalidated")
+            logger.info(f"Cache revalidated: {request.url}")
+            return self.cached_response(
+                cache.refresh(entry, response), response.timings
             )
-        return self.receive_response()
+        cache.count("misses")
+        cache.store(request, response)
+        if not stream:
+            response.read()
+        return response
 
-    def receive_response(self) -> Response:
-        raw_response = io.BytesIO()
-        while True:
-            data = self._sock.recv(http_client.const.BUFFER_SIZE)
-            if not data:
-                break
-            raw_response.write(data)
-        raw_response.seek(0)
-        response = Response.from_bytes(raw_response)
-        logger.info(f"Received response with code: {response.status_code}")
-        if self._redirect and 301 <= response.status_code < 400:
+    def cached_response(self, entry, timings=None) -> Response:
+        response = entry.to_response()
+        response.decode_content = self._decode
+        response.timings = timings or Timings()
+        response.timings.mark("done")
+        return response
+
+    def send_uncached(self, stream=False) -> Response:
+        if self._scheduler is None:
+            return self.exchange(stream)
+        key = self._scheduler.acquire(self.request.url)
+        try:
+            response = self.exchange(stream)
+        except BaseException:
+            self._scheduler.release(key)
+            raise
+        self._scheduler.observe(key, response)
+        self.hold_slot(key, response)
+        return response
+
+    def hold_slot(self, key: tuple, response: Response):
+        """Слот планировщика освобождается вместе с соединением, то есть
+        после чтения тела."""
+        on_release = response.on_release
+        if on_release is None:
+            self._scheduler.release(key)
+            return
+
+        def release(response: Response, drained: bool):
+            try:
+                on_release(response, drained)
+            finally:
+                self._scheduler.release(key)
+
+        response.on_release = release
+
+    def apply_cookies(self):
+        """Заголовок Cookie для текущего адреса запроса: cookie из файла
+        и подходящие cookie из хранилища. Заданный пользователем
+        заголовок Cookie не меняется."""
+        request = self.request
+        if self._cookie_jar is None or any(
+            name.lower() == "cookie" for name in request.user_headers
+        ):
+            return
+        value = "; ".join(
+            part
+            for part in (self._cookies, self._cookie_jar.header(request.url))
+            if part
+        )
+        if value:
+            request.headers["Cookie"] = value
+        elif "Cookie" in request.headers:
+            del request.headers["Cookie"]
+
+    def exchange(self, stream=False) -> Response:
+        self.apply_cookies()
+        url = self.request.url
+        timings = Timings()
+        self._conn = self._pool.acquire(
+            url.scheme, url.host, url.port, self._timeout, timings
+        )
+        try:
+            return self.transmit(stream, timings)
+        except (ConnectionError, http_client.errors.ConnectionDroppedError):
+            if not self._conn.reused or not self.request.can_replay:
+                raise
+            logger.info(f"Pooled connection to {url.host} was dropped")
+        timings = Timings()
+        self._conn = self._pool.acquire(
+            url.scheme, url.host, url.port, self._timeout, timings
+        )
+        return self.transmit(stream, timings)
+
+    def transmit(self, stream, timings: Timings) -> Response:
+        """Обмен по взятому соединению. При любой ошибке оно закрывается:
+        чтение могло остановиться посреди ответа."""
+        try:
+            self.request.send(self._conn.sock)
+            timings.mark("request_sent")
+            return self.receive_response(stream, timings)
+        except BaseException:
+            self._conn.close()
+            raise
+
+    def send_pipelined(
+        self, paths: list, depth: int = http_client.const.PIPELINE_DEPTH
+    ) -> list:
+        """Отправляет запросы к тому же хосту по адресам paths (пути или
+        ссылки относительно адреса клиента) конвейером: до depth
+        запросов уходят в одно соединение, не дожидаясь ответов, а ответы
+        читаются по порядку с разбивкой по длине тела. Если сервер
+        закрывает соединение посреди конвейера, запросы без ответа
+        повторяются в новом соединении. Возвращает ответы в порядке
+        paths. Cookie из хранилища берутся на момент отправки, а Set-Cookie
+        ответов сохраняются по мере их чтения."""
+        method = self.request.method
+        if method not in http_client.const.PIPELINE_METHODS:
+            raise http_client.errors.PipeliningError(method)
+        messages, urls = [], []
+        try:
+            for path in paths:
+                url = resolve_location(self._url, path)
+                if origin(url) != origin(self._url):
+                    raise http_client.errors.UrlParsingError(str(url))
+                self.request.url = url
+                self.apply_cookies()
+                messages.append(self.request.head + self.request.message_body)
+                urls.append(url)
+        finally:
+            self.request.url = self._url
+        responses = []
+        while len(responses) < len(messages):
+            done = len(responses)
+            responses += self.run_pipeline(
+                messages[done:], urls[done:], depth
+            )
+        return responses
+
+    def run_pipeline(self, messages: list, urls: list, depth: int) -> list:
+        """Один проход конвейера по одному соединению. Возвращает ответы,
+        полученные до закрытия соединения сервером; хотя бы один ответ
+        должен прийти, иначе ошибка пробрасывается. В замерах первого
+        ответа - установка соединения, у остальных соединение считается
+        переиспользованным; все замеры отсчитываются от начала прохода."""
+        url = self._url
+        started = Timings()
+        conn = self._pool.acquire(
+            url.scheme, url.host, url.port, self._timeout, started
+        )
+        conn.reader.close_delimited = False
+        responses, sent_at, keep = [], [], False
+        try:
+            while len(responses) < len(messages):
+                sent = len(sent_at)
+                if sent - len(responses) < depth:
+                    end = min(len(responses) + depth, len(messages))
+                    conn.sock.sendall(b"".join(messages[sent:end]))
+                    sent_at += [time.monotonic()] * (end - sent)
+                timings = started
+                if responses:
+                    timings = Timings()
+                    timings.mark("start", started.marks["start"])
+                    timings.reused = True
+                timings.mark("request_sent", sent_at[len(responses)])
+                response = Response.from_reader(
+                    conn.reader, self.request.method, stream=True
+                )
+                timings.mark("first_byte")
+                response.timings = timings
+                # Тело дочитывается сырым, чтобы освободить соединение для
+                # следующего ответа; раскодируется оно при обращении.
+                response.decode_content = False
+                response.read()
+                response.decode_content = self._decode
+                timings.mark("done")
+                if self._cookie_jar is not None:
+                    self._cookie_jar.extract(response, urls[len(responses)])
+                if self._on_timings is not None:
+                    self._on_timings(response)
+                responses.append(response)
+                if conn.reader.close_delimited or response.will_close:
+                    break
+            else:
+                keep = True
+        except (
+            ConnectionError,
+            http_client.errors.ConnectionDroppedError,
+            http_client.errors.IncompleteResponseError,
+        ):
+            if not responses:
+                conn.close()
+                if conn.reused:
+                    return self.run_pipeline(messages, urls, depth)
+                raise
+        except BaseException:
+            conn.close()
+            raise
+        if keep:
+            self._pool.release(conn)
+        else:
             logger.info(
-                f"Redirecting to host: {response.headers['location']}"
+                f"Pipeline to {url.host} closed after "
+                f"{len(responses)} of {len(messages)} responses"
             )
-            self.reconnect_socket(response.headers["location"].lstrip())
-            response = self.send_request()
+            conn.close()
+        return responses
+
+    def receive_response(self, stream=False, timings=None) -> Response:
+        conn = self._conn
+        conn.reader.close_delimited = False
+        response = Response.from_reader(
+            conn.reader, self.request.method, stream=True
+        )
+        response.timings = timings or Timings()
+        response.decode_content = self._decode
+        response.timings.mark("first_byte")
+        logger.info(f"Received response with code: {response.status_code}")
+        if self._cookie_jar is not None:
+            self._cookie_jar.extract(response, self.request.url)
+        redirecting = self._redirect and is_redirect(response)
+        response.on_release = functools.partial(
+            self.release_connection, conn, notify=not redirecting
+        )
+        if not response.is_streaming:
+            response.release(drained=True)
+        elif not stream:
+            response.read()
         return response
 
-    def reconnect_socket(self, url: str):
-        new_url = URL(url)
+    def release_connection(
+        self, conn, response: Response, drained: bool, notify=True
+    ):
+        response.timings.mark("done")
+        if notify and self._on_timings is not None:
+            self._on_timings(response)
+        if drained and not conn.reader.close_delimited:
+            if not response.will_close:
+                self._pool.release(conn)
+                return
+        conn.close()
+
+    def reconnect_socket(self, url):
+        """Перенаправляет запрос по новому адресу. Соединение будет взято из
+        пула, если хост не изменился. Authorization на другой хост не
+        передаётся."""
+        new_url = parse_url(url)
         if not new_url.host:
-            raise http_client.errors.UrlParsingError(url)
-        self.request.url = new_url
-        self.request.headers["Host"] = new_url.host
-        self._sock.close()
-        self._sock = self.initialize_socket(new_url.scheme, self._timeout)
+            raise http_client.errors.UrlParsingError(str(url))
+        retarget(self.request, new_url)
+
+    def close(self):
+        self.request.close()
+        if self._own_pool:
+            self._pool.close()
@@ -1,5 +1,40 @@
 HEADER_EXPR = r"[a-zA-z\-]+"
-STARTING_LINE = (
-    r"(?P<proto>HTTP/1\.[01]) (?P<code>\d{3})(?P<phrase>[ \w]*)"
-)
-BUFFER_SIZE = 1024
+POOL_MAX_IDLE_PER_HOST = 4
+POOL_IDLE_TIMEOUT = 60.0
+BODY_CHUNK_SIZE = 64 * 1024
+MAX_LINE_SIZE = 64 * 1024
+MAX_HEAD_SIZE = 64 * 1024
+RECV_BUFFER_SIZE = 128 * 1024
+MIN_READ_SIZE = 4 * 1024
+ASYNC_LIMIT_PER_HOST = 100
+BATCH_CONCURRENCY = 10
+BENCH_REQUESTS = 1000
+PIPELINE_DEPTH = 8
+PIPELINE_METHODS = ("GET", "HEAD", "OPTIONS")
+DNS_TTL = 60.0
+HAPPY_EYEBALLS_DELAY = 0.25
+DECODE_MAX_SIZE = None
+DECODE_MAX_RATIO = 200
+DECODE_RATIO_THRESHOLD = 16 * 1024 * 1024
+BROTLI_INPUT_SLICE = 1024
+CACHE_MAX_ENTRIES = 256
+CACHE_MAX_BODY_SIZE = 64 * 1024 * 1024
+CACHEABLE_CODES = (200, 203, 300, 301, 308, 404, 410)
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS", "TRACE")
+DOWNLOAD_SEGMENTS = 4
+DOWNLOAD_MIN_SEGMENT = 1024 * 1024
+DOWNLOAD_JOURNAL_INTERVAL = 4 * 1024 * 1024
+MAX_REDIRECTS = 10
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+REDIRECT_MEMO_SIZE = 1024
+THROTTLE_CODES = (429, 503)
+SCHEDULER_BACKOFF = 1.0
+SCHEDULER_MAX_BACKOFF = 60.0
+SCHEDULER_POLL_INTERVAL = 0.5
+SCHEDULER_QUEUE_SIZE = 1000
+RETRY_TOTAL = 3
+RETRY_BACKOFF = 0.5
+RETRY_MAX_BACKOFF = 30.0
+RETRY_STATUSES = (429, 502, 503, 504)
+RETRY_METHODS = ("GET", "HEAD", "OPTIONS")
+LOG_FORMAT = "[%(levelname)s]: %(asctime)s | in %(name)s | %(message)s"
@@ -0,0 +1,341 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cookies (
+    domain TEXT NOT NULL,
+    path TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value TEXT NOT NULL,
+    expires REAL,
+    secure INTEGER NOT NULL,
+    host_only INTEGER NOT NULL,
+    PRIMARY KEY (domain, path, name)
+)
+"""
+
+
+def parse_cookie_date(value: str):
+    """Expires в секундах эпохи или None. Допускается и формат с дефисами
+    (Wed, 21-Oct-2026 07:28:00 GMT)."""
+    import email.utils
+
+    try:
+        return email.utils.parsedate_to_datetime(
+            value.replace("-", " ")
+        ).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def default_path(request_path: str) -> str:
+    """Путь cookie по умолчанию - "каталог" пути запроса (RFC 6265,
+    5.1.4)."""
+    if not request_path.startswith("/") or request_path.count("/") == 1:
+        return "/"
+    return request_path[:request_path.rindex("/")]
+
+
+def domain_match(host: str, domain: str) -> bool:
+    return host == domain or (
+        host.endswith("." + domain) and not host.replace(".", "").isdigit()
+    )
+
+
+def path_match(request_path: str, path: str) -> bool:
+    if request_path == path:
+        return True
+    return request_path.startswith(path) and (
+        path.endswith("/") or request_path[len(path)] == "/"
+    )
+
+
+class Cookie:
+    __slots__ = (
+        "name",
+        "value",
+        "domain",
+        "path",
+        "expires",
+        "secure",
+        "host_only",
+        "created",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        value: str,
+        domain: str,
+        path: str = "/",
+        expires: float = None,
+        secure: bool = False,
+        host_only: bool = True,
+        created: float = None,
+    ):
+        self.name = name
+        self.value = value
+        self.domain = domain
+        self.path = path
+        self.expires = expires
+        self.secure = secure
+        self.host_only = host_only
+        self.created = time.time() if created is None else created
+
+    @property
+    def key(self) -> tuple:
+        return self.domain, self.path, self.name
+
+    def is_expired(self, now: float) -> bool:
+        return self.expires is not None and self.expires <= now
+
+    def matches(self, scheme: str, host: str, path: str) -> bool:
+        if self.host_only and host != self.domain:
+            return False
+        if self.secure and scheme != "https":
+            return False
+        return path_match(path, self.path)
+
+    def __repr__(self) -> str:
+        return f"Cookie({self.name}={self.value}; {self.domain}{self.path})"
+
+
+def parse_set_cookie(value: str, url, now: float = None):
+    """Cookie из заголовка Set-Cookie ответа на запрос по url или None,
+    если заголовок некорректен или cookie задана для чужого домена.
+    Список публичных суффиксов не проверяется."""
+    now = time.time() if now is None else now
+    pair, *attributes = value.split(";")
+    name, sep, cookie_value = pair.partition("=")
+    name = name.strip()
+    if not sep or not name:
+        return None
+    host = (url.host or "").lower()
+    cookie = Cookie(
+        name, cookie_value.strip(), host, default_path(url.raw_path)
+    )
+    max_age = None
+    for attribute in attributes:
+        key, _, argument = attribute.partition("=")
+        key, argument = key.strip().lower(), argument.strip()
+        if key == "expires" and max_age is None:
+            cookie.expires = parse_cookie_date(argument)
+        elif key == "max-age":
+            try:
+                max_age = int(argument)
+            except ValueError:
+                continue
+            cookie.expires = now + max_age
+        elif key == "domain" and argument:
+            domain = argument.lstrip(".").lower()
+            if not domain_match(host, domain):
+                logger.debug(f"Rejected cookie {name} for domain {domain}")
+                return None
+            cookie.domain, cookie.host_only = domain, domain == host
+        elif key == "path" and argument.startswith("/"):
+            cookie.path = argument
+        elif key == "secure":
+            cookie.secure = True
+    return cookie
+
+
+class CookieJar:
+    """Хранилище cookie с индексом домен -> путь -> имя: для запроса
+    просматриваются только записи его хоста и родительских доменов.
+    Истёкшие cookie удаляются при поиске.
+
+    С path хранилище загружается из базы sqlite при создании, а save
+    записывает только изменения с прошлого сохранения; cookie сеанса
+    (без Expires) тоже сохраняются, как в cookie-jar curl. Один
+    CookieJar можно использовать из нескольких потоков."""
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self._domains = {}
+        self._changed = {}
+        self._lock = threading.Lock()
+        if path is not None:
+            self.load()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(
+                len(names)
+                for paths in self._domains.values()
+                for names in paths.values()
+            )
+
+    def _put(self, cookie: Cookie):
+        paths = self._domains.setdefault(cookie.domain, {})
+        paths.setdefault(cookie.path, {})[cookie.name] = cookie
+
+    def _remove(self, cookie: Cookie):
+        paths = self._domains.get(cookie.domain, {})
+        names = paths.get(cookie.path, {})
+        if names.pop(cookie.name, None) is None:
+            return
+        self._changed[cookie.key] = None
+        if not names:
+            del paths[cookie.path]
+        if not paths:
+            del self._domains[cookie.domain]
+
+    def set(self, cookie: Cookie, now: float = None):
+        """Сохраняет cookie; уже истёкшая удаляет одноимённую."""
+        now = time.time() if now is None else now
+        with self._lock:
+            if cookie.is_expired(now):
+                names = self._domains.get(cookie.domain, {})
+                existing = names.get(cookie.path, {}).get(cookie.name)
+                if existing is not None:
+                    self._remove(existing)
+                return
+            existing = (
+                self._domains.get(cookie.domain, {})
+                .get(cookie.path, {})
+                .get(cookie.name)
+            )
+            if existing is not None:
+                cookie.created = existing.created
+            self._put(cookie)
+            self._changed[cookie.key] = cookie
+
+    def extract(self, response, url) -> int:
+        """Запоминает cookie из всех заголовков Set-Cookie ответа."""
+        count = 0
+        for value in response.headers.get_all("set-cookie"):
+            cookie = parse_set_cookie(value, url)
+            if cookie is not None:
+                self.set(cookie)
+                count += 1
+        return count
+
+    def cookies_for(self, url, now: float = None) -> list:
+        """Cookie для запроса по url: более длинные пути первыми, при
+        равных - более старые (RFC 6265, 5.4)."""
+        now = time.time() if now is None else now
+        host = (url.host or "").lower()
+        path = url.raw_path
+        labels = host.split(".")
+        result, expired = [], []
+        with self._lock:
+            for index in range(len(labels)):
+                paths = self._domains.get(".".join(labels[index:]))
+                if not paths:
+                    continue
+                for names in paths.values():
+                    for cookie in names.values():
+                        if cookie.is_expired(now):
+                            expired.append(cookie)
+                        elif cookie.matches(url.scheme, host, path):
+                            result.append(cookie)
+            for cookie in expired:
+                self._remove(cookie)
+        result.sort(key=lambda cookie: (-len(cookie.path), cookie.created))
+        return result
+
+    def header(self, url) -> str:
+        """Значение заголовка Cookie для url (пустое, если cookie нет)."""
+        return "; ".join(
+            f"{cookie.name}={cookie.value}" for cookie in self.cookies_for(url)
+        )
+
+    def evict_expired(self, now: float = None):
+        now = time.time() if now is None else now
+        with self._lock:
+            expired = [
+                cookie
+                for paths in self._domains.values()
+                for names in paths.values()
+                for cookie in names.values()
+                if cookie.is_expired(now)
+            ]
+            for cookie in expired:
+                self._remove(cookie)
+
+    def clear(self):
+        with self._lock:
+            for paths in self._domains.values():
+                for names in paths.values():
+                    for cookie in names.values():
+                        self._changed[cookie.key] = None
+            self._domains.clear()
+
+    def connect(self):
+        import sqlite3
+
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute(SCHEMA)
+        return connection
+
+    def load(self):
+        now = time.time()
+        connection = self.connect()
+        try:
+            rows = connection.execute(
+                "SELECT name, value, domain, path, expires, secure, "
+                "host_only FROM cookies WHERE expires IS NULL OR expires > ? "
+                "ORDER BY rowid",
+                (now,),
+            ).fetchall()
+        finally:
+            connection.close()
+        with self._lock:
+            for name, value, domain, path, expires, secure, host_only in rows:
+                self._put(
+                    Cookie(
+                        name,
+                        value,
+                        domain,
+                        path,
+                        expires,
+                        bool(secure),
+                        bool(host_only),
+                    )
+                )
+        logger.debug(f"Loaded {len(rows)} cookies from {self.path}")
+
+    def save(self):
+        """Записывает изменения с прошлого сохранения и удаляет из базы
+        истёкшие cookie."""
+        if self.path is None:
+            return
+        with self._lock:
+            changed, self._changed = self._changed, {}
+        connection = self.connect()
+        try:
+            with connection:
+                connection.executemany(
+                    "DELETE FROM cookies WHERE domain = ? AND path = ? "
+                    "AND name = ?",
+                    [key for key, cookie in changed.items() if cookie is None],
+                )
+                connection.executemany(
+                    "INSERT OR REPLACE INTO cookies VALUES "
+                    "(?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            cookie.domain,
+                            cookie.path,
+                            cookie.name,
+                            cookie.value,
+                            cookie.expires,
+                            int(cookie.secure),
+                            int(cookie.host_only),
+                        )
+                        for cookie in changed.values()
+                        if cookie is not None
+                    ],
+                )
+                connection.execute(
+                    "DELETE FROM cookies WHERE expires <= ?", (time.time(),)
+                )
+        except BaseException:
+            with self._lock:
+                self._changed = {**changed, **self._changed}
+            raise
+        finally:
+            connection.close()
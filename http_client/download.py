@@ -0,0 +1,332 @@
+import concurrent.futures
+import json
+import logging
+import os
+import threading
+import http_client.const
+import http_client.errors
+from http_client.client import Client
+from http_client.pool import ConnectionPool
+from http_client.reader import content_length
+from http_client.tls import TLSContext
+
+logger = logging.getLogger(__name__)
+
+
+def split_ranges(size: int, segments: int, min_segment: int) -> list:
+    """Делит size байт на не более чем segments диапазонов (first, last)
+    размером не меньше min_segment (кроме случая, когда весь файл
+    меньше)."""
+    segments = max(1, min(segments, size // max(min_segment, 1)))
+    step, rest = divmod(size, segments)
+    ranges, first = [], 0
+    for index in range(segments):
+        length = step + (1 if index < rest else 0)
+        ranges.append((first, first + length - 1))
+        first += length
+    return ranges
+
+
+def write_at(fd: int, data, offset: int, lock: threading.Lock):
+    """Запись по смещению: os.pwrite, а где его нет - seek и write под
+    общей блокировкой."""
+    if hasattr(os, "pwrite"):
+        view = memoryview(data)
+        while view:
+            written = os.pwrite(fd, view, offset)
+            view, offset = view[written:], offset + written
+        return
+    with lock:
+        os.lseek(fd, offset, os.SEEK_SET)
+        os.write(fd, data)
+
+
+class RangesIgnoredError(http_client.errors.DownloadError):
+    """Сервер ответил на запрос диапазона всем ресурсом (200): диапазоны
+    не поддерживаются или ресурс изменился после If-Range."""
+
+
+class DownloadJournal:
+    """Журнал загрузки рядом с .part-файлом: адрес, размер, валидатор
+    (ETag или Last-Modified) и для каждого диапазона [first, last, next],
+    где next - первый ещё не записанный байт. Сохраняется атомарно через
+    временный файл."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def load(self):
+        try:
+            with open(self.path, "r") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, state: dict):
+        with self._lock:
+            temporary = self.path + ".tmp"
+            with open(temporary, "w") as file:
+                json.dump(state, file)
+            os.replace(temporary, self.path)
+
+    def remove(self):
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+class SegmentedDownload:
+    """Загрузка ресурса в файл по частям. Сначала HEAD-запрос узнаёт размер
+    и поддержку Accept-Ranges, затем segments диапазонов запрашиваются
+    параллельно по отдельным соединениям, и каждый записывается по своему
+    смещению в заранее выделенный файл. Если сервер не поддерживает
+    диапазоны или размер неизвестен, файл загружается одним потоком без
+    накопления в памяти.
+
+    При resume=True данные пишутся в path.part, а прогресс диапазонов -
+    в журнал path.part.json. Повторный запуск после сбоя продолжает
+    незаконченные диапазоны запросами Range с If-Range; если ресурс
+    изменился или сервер игнорирует диапазоны, файл загружается заново
+    целиком. По окончании .part переименовывается в path."""
+
+    def __init__(
+        self,
+        url: str,
+        path: str,
+        segments: int = http_client.const.DOWNLOAD_SEGMENTS,
+        timeout: float = None,
+        user_agent: str = "Mozilla/5.0",
+        headers: list = (),
+        cookie_file: str = None,
+        redirect: bool = True,
+        tls: TLSContext = None,
+        min_segment: int = http_client.const.DOWNLOAD_MIN_SEGMENT,
+        resume: bool = False,
+    ):
+        self.url = url
+        self.path = path
+        self.segments = segments
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self.headers = [list(h) for h in headers] + [
+            ["Accept-Encoding", "identity"]
+        ]
+        self.cookie_file = cookie_file
+        self.redirect = redirect
+        self.min_segment = min_segment
+        self.resume = resume
+        self.journal = DownloadJournal(path + ".part.json") if resume else None
+        self.pool = ConnectionPool(max_idle_per_host=segments, tls=tls)
+        self.size = None
+        self.ranged = False
+        self.validator = None
+        self.resumed_bytes = 0
+        self._state = None
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+
+    @property
+    def target(self) -> str:
+        return self.path + ".part" if self.resume else self.path
+
+    def client(self, url: str, method: str, headers: list = ()) -> Client:
+        return Client(
+            url,
+            method,
+            "",
+            None,
+            False,
+            self.headers + list(headers),
+            False,
+            self.user_agent,
+            self.timeout,
+            self.redirect,
+            self.cookie_file,
+            pool=self.pool,
+            decode=False,
+        )
+
+    def probe(self) -> str:
+        """HEAD-запрос: размер, поддержка диапазонов, валидатор для If-Range
+        и итоговый адрес после перенаправлений. Неудачный HEAD не ошибка:
+        тогда файл загружается одним запросом."""
+        client = self.client(self.url, "HEAD")
+        response = client.send_request()
+        client.close()
+        if response.status_code != 200:
+            logger.info(f"Probe returned {response.status_code}")
+            return str(client.request.url)
+        headers = response.headers
+        if not response.content_encodings:
+            self.size = content_length(headers)
+        accept = headers.get("accept-ranges", "").lower()
+        self.ranged = self.size is not None and "bytes" in accept
+        etag = headers.get("etag", "")
+        if etag and not etag.startswith("W/"):
+            self.validator = etag
+        else:
+            self.validator = headers.get("last-modified")
+        return str(client.request.url)
+
+    def plan(self, url: str) -> list:
+        """Диапазоны [first, last, next] для загрузки: из журнала, если он
+        относится к той же версии ресурса, иначе новые."""
+        if not self.ranged:
+            return []
+        if self.resume and os.path.exists(self.target):
+            state = self.journal.load()
+            if (
+                state is not None
+                and self.validator is not None
+                and state.get("url") == url
+                and state.get("size") == self.size
+                and state.get("validator") == self.validator
+            ):
+                ranges = state["ranges"]
+                self.resumed_bytes = sum(
+                    done - first for first, _, done in ranges
+                )
+                logger.info(f"Resuming after {self.resumed_bytes} bytes")
+                return ranges
+        ranges = split_ranges(self.size, self.segments, self.min_segment)
+        if len(ranges) == 1 and not self.resume:
+            return []
+        return [[first, last, first] for first, last in ranges]
+
+    def run(self) -> int:
+        """Загружает файл и возвращает его размер."""
+        try:
+            url = self.probe()
+            ranges = self.plan(url)
+            mode = "r+b" if self.resumed_bytes else "wb"
+            with open(self.target, mode) as file:
+                written = self.fetch(url, file, ranges)
+        finally:
+            self.pool.close()
+        if os.path.getsize(self.target) != written:
+            raise http_client.errors.DownloadError(
+                f"размер файла {os.path.getsize(self.target)} вместо "
+                f"{written}"
+            )
+        if self.resume:
+            os.replace(self.target, self.path)
+            self.journal.remove()
+        return written
+
+    def fetch(self, url: str, file, ranges: list) -> int:
+        if ranges:
+            os.ftruncate(file.fileno(), self.size)
+            self._state = {
+                "url": url,
+                "size": self.size,
+                "validator": self.validator,
+                "ranges": ranges,
+            }
+            try:
+                self.fetch_ranges(url, file.fileno(), ranges)
+                return self.size
+            except RangesIgnoredError as e:
+                logger.info(f"Falling back to full download: {e}")
+            finally:
+                self.save_progress(file.fileno())
+            self._state = None
+            self._cancelled.clear()
+            if self.resume:
+                self.journal.remove()
+            file.truncate(0)
+        return self.fetch_whole(url, file.fileno())
+
+    def save_progress(self, fd: int):
+        """Сначала данные сбрасываются на диск, затем журнал: журнал не
+        должен опережать содержимое .part-файла."""
+        if self.journal is None or self._state is None:
+            return
+        os.fsync(fd)
+        self.journal.save(self._state)
+
+    def fetch_ranges(self, url: str, fd: int, ranges: list):
+        logger.info(f"Downloading {self.size} bytes in {len(ranges)} parts")
+        with concurrent.futures.ThreadPoolExecutor(len(ranges)) as executor:
+            futures = [
+                executor.submit(self.fetch_range, url, fd, progress)
+                for progress in ranges
+                if progress[2] <= progress[1]
+            ]
+            try:
+                for future in concurrent.futures.as_completed(futures):
+                    future.result()
+            except BaseException:
+                self._cancelled.set()
+                raise
+
+    def fetch_range(self, url: str, fd: int, progress: list):
+        """progress - [first, last, next]; next сдвигается по мере записи."""
+        _, last, start = progress
+        headers = [["Range", f"bytes={start}-{last}"]]
+        if self.validator is not None:
+            headers.append(["If-Range", self.validator])
+        client = self.client(url, "GET", headers)
+        unsaved = 0
+        try:
+            response = client.send_request(stream=True)
+            if response.status_code == 200:
+                response.close()
+                raise RangesIgnoredError(
+                    f"на запрос диапазона {start}-{last} получен весь файл"
+                )
+            if not response.is_partial:
+                response.close()
+                raise http_client.errors.DownloadError(
+                    f"на запрос диапазона {start}-{last} получен код "
+                    f"{response.status_code}"
+                )
+            if response.content_range != (start, last, self.size):
+                response.close()
+                raise http_client.errors.DownloadError(
+                    f"ожидался диапазон {start}-{last}/{self.size}, "
+                    f"получен {response.headers['content-range']}"
+                )
+            for chunk in response.iter_body():
+                if self._cancelled.is_set():
+                    response.close()
+                    return
+                if progress[2] + len(chunk) > last + 1:
+                    raise http_client.errors.DownloadError(
+                        f"диапазон {start}-{last} длиннее ожидаемого"
+                    )
+                write_at(fd, chunk, progress[2], self._lock)
+                progress[2] += len(chunk)
+                unsaved += len(chunk)
+                if unsaved >= http_client.const.DOWNLOAD_JOURNAL_INTERVAL:
+                    self.save_progress(fd)
+                    unsaved = 0
+        finally:
+            client.close()
+        if progress[2] != last + 1:
+            raise http_client.errors.DownloadError(
+                f"диапазон {start}-{last} оборван на байте {progress[2]}"
+            )
+
+    def fetch_whole(self, url: str, fd: int) -> int:
+        logger.info("Server does not support ranges, downloading in one part")
+        client = self.client(url, "GET")
+        written = 0
+        try:
+            response = client.send_request(stream=True)
+            if response.status_code != 200:
+                response.close()
+                raise http_client.errors.DownloadError(
+                    f"сервер вернул код {response.status_code}"
+                )
+            for chunk in response.iter_body():
+                write_at(fd, chunk, written, self._lock)
+                written += len(chunk)
+        finally:
+            client.close()
+        if self.size is not None and written != self.size:
+            raise http_client.errors.DownloadError(
+                f"получено {written} байт из {self.size}"
+            )
+        return written
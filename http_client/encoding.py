@@ -0,0 +1,163 @@
+import zlib
+import http_client.const
+import http_client.errors
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DECODE_ERRORS = (zlib.error,) if brotli is None else (zlib.error, brotli.error)
+
+
+class ZlibDecoder:
+    """Потоковый декодер gzip и deflate. Выдаёт результат частями не
+    длиннее max_length, чтобы маленький сжатый блок не раздувался в
+    памяти целиком."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        # 0 - размер окна берётся из заголовка zlib.
+        self._wbits = 16 + zlib.MAX_WBITS if encoding != "deflate" else 0
+        self._obj = zlib.decompressobj(self._wbits)
+        self._started = False
+
+    def feed(self, data: bytes, max_length: int):
+        if not data:
+            return
+        if not self._started:
+            self._started = True
+            try:
+                yield self._obj.decompress(data, max_length)
+            except zlib.error:
+                if self._wbits:
+                    raise
+                # Часть серверов отдаёт deflate без обёртки zlib.
+                self._obj = zlib.decompressobj(-zlib.MAX_WBITS)
+                yield self._obj.decompress(data, max_length)
+            data = self.remaining()
+        while data:
+            yield self._obj.decompress(data, max_length)
+            data = self.remaining()
+
+    def remaining(self) -> bytes:
+        if not self._obj.eof:
+            return self._obj.unconsumed_tail
+        if self._wbits and self._obj.unused_data:
+            # Следующий член многочленного gzip-потока.
+            data = self._obj.unused_data
+            self._obj = zlib.decompressobj(self._wbits)
+            return data
+        return b""
+
+    def flush(self):
+        yield self._obj.flush()
+        if self._started and not self._obj.eof:
+            raise zlib.error("поток оборван")
+
+
+class BrotliDecoder:
+    """Потоковый декодер br. Выход ограничивается max_length через
+    output_buffer_limit (brotli >= 1.1); в старых версиях пакета вход
+    подаётся частями по BROTLI_INPUT_SLICE байт, и проверка размера в
+    decode_chunks срабатывает после каждой из них."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        self._obj = brotli.Decompressor()
+        self._limited = hasattr(self._obj, "can_accept_more_data")
+
+    def feed(self, data: bytes, max_length: int):
+        if not data:
+            return
+        if self._limited:
+            yield self._obj.process(data, output_buffer_limit=max_length)
+            while not self._obj.can_accept_more_data():
+                yield self._obj.process(b"", output_buffer_limit=max_length)
+            return
+        step = http_client.const.BROTLI_INPUT_SLICE
+        for start in range(0, len(data), step):
+            yield self._obj.process(data[start:start + step])
+
+    def flush(self):
+        return iter(())
+
+
+DECODERS = {
+    "gzip": ZlibDecoder,
+    "x-gzip": ZlibDecoder,
+    "deflate": ZlibDecoder,
+}
+if brotli is not None:
+    DECODERS["br"] = BrotliDecoder
+
+
+def accept_encoding() -> str:
+    """Значение Accept-Encoding: gzip и deflate, а также br, если
+    установлен пакет brotli."""
+    return ", ".join(
+        name for name in ("gzip", "deflate", "br") if name in DECODERS
+    )
+
+
+def parse_content_encoding(value: str) -> list:
+    """Кодировки в порядке применения сервером, без identity."""
+    return [
+        name
+        for name in (part.strip().lower() for part in value.split(","))
+        if name and name != "identity"
+    ]
+
+
+def can_decode(encodings: list) -> bool:
+    return bool(encodings) and all(name in DECODERS for name in encodings)
+
+
+def decode_stage(chunks, decoder, chunk_size: int):
+    try:
+        for chunk in chunks:
+            yield from decoder.feed(chunk, chunk_size)
+        yield from decoder.flush()
+    except DECODE_ERRORS as e:
+        raise http_client.errors.ContentDecodingError(decoder.encoding, e)
+
+
+def decode_chunks(
+    chunks,
+    encodings: list,
+    chunk_size: int = http_client.const.BODY_CHUNK_SIZE,
+    max_size: int = http_client.const.DECODE_MAX_SIZE,
+    max_ratio: float = http_client.const.DECODE_MAX_RATIO,
+):
+    """Снимает с потока частей тела кодировки encodings (в порядке, в
+    котором их применил сервер). Защита от "бомб": раскодированное тело
+    не может превышать max_size байт, а после DECODE_RATIO_THRESHOLD байт -
+    и быть больше полученного в max_ratio раз."""
+    received = decoded = 0
+
+    def counted():
+        nonlocal received
+        for chunk in chunks:
+            received += len(chunk)
+            yield chunk
+
+    pipeline = counted()
+    for name in reversed(encodings):
+        pipeline = decode_stage(pipeline, DECODERS[name](name), chunk_size)
+    for piece in pipeline:
+        if not piece:
+            continue
+        decoded += len(piece)
+        if max_size is not None and decoded > max_size:
+            raise http_client.errors.DecompressionBombError(
+                f"больше {max_size} байт"
+            )
+        if (
+            max_ratio
+            and decoded > http_client.const.DECODE_RATIO_THRESHOLD
+            and decoded > received * max_ratio
+        ):
+            raise http_client.errors.DecompressionBombError(
+                f"степень сжатия больше {max_ratio}"
+            )
+        yield piece
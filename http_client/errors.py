@@ -35,3 +35,78 @@ class IncorrectStartingLineError(APIError):
 
     def __str__(self):
         return f"Некорректная стартовая строка ответа от сервера: {self.arg}"
+
+
+class ConnectionDroppedError(APIError):
+    def __init__(self, host: str = ""):
+        self.arg = host
+
+    def __str__(self):
+        return f"Сервер закрыл соединение без ответа: {self.arg}"
+
+
+class IncompleteResponseError(APIError):
+    def __init__(self, reason: str):
+        self.arg = reason
+
+    def __str__(self):
+        return f"Ответ от сервера оборван или повреждён: {self.arg}"
+
+
+class RedirectError(APIError):
+    def __init__(self, reason: str):
+        self.arg = reason
+
+    def __str__(self):
+        return f"Не удалось выполнить перенаправление: {self.arg}"
+
+
+class DownloadError(APIError):
+    def __init__(self, reason: str):
+        self.arg = reason
+
+    def __str__(self):
+        return f"Не удалось загрузить файл по частям: {self.arg}"
+
+
+class PipeliningError(APIError):
+    def __init__(self, method: str):
+        self.arg = method
+
+    def __str__(self):
+        return (
+            "Конвейерная отправка доступна только для GET, HEAD и OPTIONS: "
+            f"{self.arg}"
+        )
+
+
+class ResolveSpecError(APIError):
+    def __init__(self, spec: str):
+        self.arg = spec
+
+    def __str__(self):
+        return f"Некорректный формат --resolve (host:port:addr): {self.arg}"
+
+
+class ContentDecodingError(APIError):
+    def __init__(self, encoding: str, reason=""):
+        self.arg = f"{encoding} ({reason})" if reason else encoding
+
+    def __str__(self):
+        return f"Не удалось раскодировать тело ответа: {self.arg}"
+
+
+class DecompressionBombError(APIError):
+    def __init__(self, reason: str):
+        self.arg = reason
+
+    def __str__(self):
+        return f"Раскодированное тело ответа слишком велико: {self.arg}"
+
+
+class BatchWorkerError(APIError):
+    def __init__(self, worker: int, exitcode: int):
+        self.arg = f"процесс {worker}, код {exitcode}"
+
+    def __str__(self):
+        return f"Процесс пакетной обработки завершился аварийно: {self.arg}"
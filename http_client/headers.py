@@ -0,0 +1,152 @@
+def to_bytes(value) -> bytes:
+    if isinstance(value, bytes):
+        return value
+    return str(value).encode("ISO-8859-1")
+
+
+class Headers:
+    """Заголовки сообщения. Порядок и регистр имён сохраняются, поиск
+    идёт без учёта регистра, а одно имя может встречаться несколько раз
+    (Set-Cookie). headers[name] склеивает повторы через запятую, все
+    значения по отдельности возвращает get_all.
+
+    Пары хранятся байтами в том виде, в каком уходят в сеть или пришли
+    из неё: строки получаются только при чтении. Индекс по именам в
+    нижнем регистре строится при первом поиске, а представление для
+    отправки (wire) - при первой сериализации; оба сбрасываются при
+    изменении."""
+
+    __slots__ = ("_fields", "_index", "_wire")
+
+    def __init__(self, items=()):
+        if hasattr(items, "items"):
+            items = items.items()
+        self._fields = [
+            (to_bytes(name), to_bytes(value)) for name, value in items
+        ]
+        self._index = None
+        self._wire = None
+
+    @classmethod
+    def from_fields(cls, fields: list) -> "Headers":
+        """Без копирования: fields - список пар bytes, который переходит
+        во владение объекта."""
+        headers = cls.__new__(cls)
+        headers._fields = fields
+        headers._index = None
+        headers._wire = None
+        return headers
+
+    def _lookup(self) -> dict:
+        if self._index is None:
+            index = {}
+            for name, value in self._fields:
+                key = name.lower()
+                if key in index:
+                    value = index[key] + b", " + value
+                index[key] = value
+            self._index = index
+        return self._index
+
+    def _changed(self):
+        self._index = None
+        self._wire = None
+
+    @property
+    def fields(self) -> list:
+        """Пары (имя, значение) байтами."""
+        return list(self._fields)
+
+    @property
+    def wire(self) -> bytes:
+        """Строки "Имя: значение\\r\\n" в формате HTTP/1.1."""
+        if self._wire is None:
+            self._wire = b"".join(
+                [b"%s: %s\r\n" % field for field in self._fields]
+            )
+        return self._wire
+
+    def add(self, name: str, value):
+        self._fields.append((to_bytes(name), to_bytes(value)))
+        self._changed()
+
+    def get_all(self, name: str) -> list:
+        key = to_bytes(name).lower()
+        return [
+            str(value, "ISO-8859-1")
+            for item, value in self._fields
+            if item.lower() == key
+        ]
+
+    def get(self, name: str, default=None):
+        value = self._lookup().get(to_bytes(name).lower())
+        return default if value is None else str(value, "ISO-8859-1")
+
+    def items(self) -> list:
+        """Все пары (имя, значение), включая повторы, в исходном
+        порядке."""
+        return [
+            (str(name, "ISO-8859-1"), str(value, "ISO-8859-1"))
+            for name, value in self._fields
+        ]
+
+    def keys(self) -> list:
+        seen, result = set(), []
+        for name, _ in self._fields:
+            if name.lower() not in seen:
+                seen.add(name.lower())
+                result.append(str(name, "ISO-8859-1"))
+        return result
+
+    def __getitem__(self, name: str) -> str:
+        return str(self._lookup()[to_bytes(name).lower()], "ISO-8859-1")
+
+    def __setitem__(self, name: str, value):
+        """Заменяет все значения заголовка одним, оставляя его на месте
+        первого вхождения."""
+        field = (to_bytes(name), to_bytes(value))
+        key = field[0].lower()
+        fields, replaced = [], False
+        for item in self._fields:
+            if item[0].lower() != key:
+                fields.append(item)
+            elif not replaced:
+                fields.append(field)
+                replaced = True
+        if not replaced:
+            fields.append(field)
+        self._fields = fields
+        self._changed()
+
+    def __delitem__(self, name: str):
+        key = to_bytes(name).lower()
+        if key not in self._lookup():
+            raise KeyError(name)
+        self._fields = [
+            field for field in self._fields if field[0].lower() != key
+        ]
+        self._changed()
+
+    def __contains__(self, name) -> bool:
+        if not isinstance(name, (str, bytes)):
+            return False
+        return to_bytes(name).lower() in self._lookup()
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def __bytes__(self):
+        return self.wire
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, dict):
+            other = Headers(other)
+        if not isinstance(other, Headers):
+            return NotImplemented
+        return self._lookup() == other._lookup()
+
+    def __repr__(self):
+        return f"Headers({self.items()!r})"
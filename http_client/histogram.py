@@ -0,0 +1,72 @@
+import math
+
+
+class Histogram:
+    """Гистограмма в духе HdrHistogram: логарифмические корзины, каждая
+    из которых делится на равные части так, что относительная погрешность
+    значения не превышает 10 ** -significant_digits. Память не зависит от
+    числа записанных значений. Значения - целые неотрицательные числа
+    (например, микросекунды); больше highest_value учитываются как
+    highest_value."""
+
+    def __init__(
+        self, highest_value: int = 3600 * 10**6, significant_digits=2
+    ):
+        self.highest_value = highest_value
+        self.sub_bucket_bits = math.ceil(math.log2(2 * 10**significant_digits))
+        self.sub_bucket_count = 1 << self.sub_bucket_bits
+        self.sub_bucket_half = self.sub_bucket_count // 2
+        self.counts = [0] * (self.index_of(highest_value) + 1)
+        self.total = 0
+        self.min = None
+        self.max = 0
+        self.sum = 0
+
+    def index_of(self, value: int) -> int:
+        bucket = max(0, value.bit_length() - self.sub_bucket_bits)
+        return bucket * self.sub_bucket_half + (value >> bucket)
+
+    def value_range(self, index: int) -> tuple:
+        """Наименьшее и наибольшее значения, попадающие в корзину."""
+        if index < self.sub_bucket_count:
+            return index, index
+        bucket = (index - self.sub_bucket_count) // self.sub_bucket_half + 1
+        lowest = (index - bucket * self.sub_bucket_half) << bucket
+        return lowest, lowest + (1 << bucket) - 1
+
+    def record(self, value: int, count: int = 1):
+        value = min(max(int(value), 0), self.highest_value)
+        self.counts[self.index_of(value)] += count
+        self.total += count
+        self.sum += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "Histogram"):
+        if len(other.counts) != len(self.counts):
+            raise ValueError("Гистограммы с разными параметрами")
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.total += other.total
+        self.sum += other.sum
+        if other.min is not None:
+            self.min = (
+                other.min if self.min is None else min(self.min, other.min)
+            )
+        self.max = max(self.max, other.max)
+
+    def percentile(self, percent: float) -> int:
+        """Значение, не меньше которого percent процентов записей."""
+        if not self.total:
+            return 0
+        target = max(1, math.ceil(percent / 100 * self.total))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(self.value_range(index)[1], self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.total if self.total else 0.0
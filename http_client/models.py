@@ -1,9 +1,27 @@
+import functools
 import io
+import os
 import re
+import socket
 import http_client.const
 import http_client.errors
 import enum
-from yarl import URL
+from http_client.encoding import (
+    accept_encoding,
+    can_decode,
+    decode_chunks,
+    parse_content_encoding,
+)
+from http_client.headers import Headers
+from http_client.reader import (
+    BodyStream,
+    ResponseReader,
+    content_length,
+    has_body,
+    parse_content_range,
+    parse_starting_line,
+)
+from http_client.tls import is_tls_socket
 
 
 class OutputMode(enum.Enum):
@@ -12,42 +30,260 @@ class OutputMode(enum.Enum):
     FULL = 2
 
 
+def send_buffers(sock: socket.socket, buffers: list):
+    """Отправляет буферы одним вызовом sendmsg (scatter/gather) без их
+    склейки, досылая остаток при частичной записи. На TLS-сокетах и
+    платформах без sendmsg буферы пишутся по очереди через sendall."""
+    if is_tls_socket(sock) or not hasattr(sock, "sendmsg"):
+        for buffer in buffers:
+            sock.sendall(buffer)
+        return
+    views = [memoryview(buffer) for buffer in buffers if buffer]
+    while views:
+        sent = sock.sendmsg(views)
+        while views and sent >= len(views[0]):
+            sent -= len(views.pop(0))
+        if sent:
+            views[0] = views[0][sent:]
+
+
+class PreparedRequest:
+    """Заготовка запроса для многократной отправки. Голова запроса
+    (стартовая строка и заголовки) кодируется один раз и хранится, пока
+    не изменятся метод, адрес или заголовки; при смене пути
+    перекодируется только стартовая строка, а блок заголовков берётся
+    из кеша Headers."""
+
+    __slots__ = ("_method", "_url", "headers", "_line", "_wire", "_head")
+
+    def __init__(self, method: str, url, headers: Headers = None):
+        self._method = method
+        self._url = url
+        self.headers = Headers() if headers is None else headers
+        self._line = None
+        self._wire = None
+        self._head = None
+
+    @property
+    def method(self) -> str:
+        return self._method
+
+    @method.setter
+    def method(self, value: str):
+        self._method = value
+        self._line = None
+
+    @property
+    def url(self):
+        return self._url
+
+    @url.setter
+    def url(self, value):
+        self._url = value
+        self._line = None
+
+    @property
+    def starting_line(self) -> bytes:
+        if self._line is None:
+            self._line = (
+                f"{self._method} {self._url.raw_path_qs} HTTP/1.1\r\n"
+            ).encode("ISO-8859-1")
+            self._head = None
+        return self._line
+
+    @property
+    def head(self) -> bytes:
+        line, wire = self.starting_line, self.headers.wire
+        if self._head is None or wire is not self._wire:
+            self._wire = wire
+            self._head = b"".join([line, wire, b"\r\n"])
+        return self._head
+
+    def buffers(self, body: bytes = b"") -> list:
+        """Голова и тело отдельными буферами для send_buffers."""
+        return [self.head, body] if body else [self.head]
+
+    def send(self, sock: socket.socket, body: bytes = b""):
+        send_buffers(sock, self.buffers(body))
+
+
 class Request:
     def __init__(
         self,
         method: str,
-        uri: URL,
+        uri,
         headers: list,
         input_data,
         cookies: str,
         user_agent="Mozilla/5.0",
         verbose=False,
     ):
-        self.message_body = input_data.read()
-        input_data.close()
-        self.method = method
+        self.prepared = PreparedRequest(method, uri)
+        self.body = self.prepare_body(input_data)
         self.cookies = cookies
         self.verbose = verbose
-        self.url = uri
         self.user_agent = user_agent
         self.user_headers = self.parse_user_headers(headers)
         self.content_type = "text/plain"
-        self.content_length = len(self.message_body)
+        self.content_length = self.get_content_length()
         self.headers = self.get_request_headers()
 
-    def get_request_headers(self) -> dict:
-        headers = {
-            "Host": self.url.host,
-            "User-Agent": self.user_agent,
-            "Accept": "*/*",
-            "Connection": "close",
-        }
-        if self.method == "POST":
-            headers["Content-Length"] = self.content_length
-            headers["Content-Type"] = self.content_type
+    @property
+    def method(self) -> str:
+        return self.prepared.method
+
+    @method.setter
+    def method(self, value: str):
+        self.prepared.method = value
+
+    @property
+    def url(self):
+        return self.prepared.url
+
+    @url.setter
+    def url(self, value):
+        self.prepared.url = value
+
+    @property
+    def headers(self) -> Headers:
+        return self.prepared.headers
+
+    @headers.setter
+    def headers(self, value: Headers):
+        self.prepared.headers = value
+
+    def prepare_body(self, input_data):
+        """Файлы с дескриптором отправляются потоково с текущей позиции,
+        итераторы - chunked-кодированием, остальное читается в память."""
+        self._body_offset = 0
+        if isinstance(input_data, (bytes, bytearray)):
+            return bytes(input_data)
+        if hasattr(input_data, "read"):
+            try:
+                input_data.fileno()
+            except (AttributeError, OSError):
+                data = input_data.read()
+                input_data.close()
+                return data
+            self._body_offset = input_data.tell()
+            return input_data
+        return iter(input_data)
+
+    @property
+    def is_chunked(self) -> bool:
+        return self.content_length is None
+
+    def get_content_length(self):
+        if isinstance(self.body, bytes):
+            return len(self.body)
+        if hasattr(self.body, "fileno"):
+            size = os.fstat(self.body.fileno()).st_size
+            return max(size - self._body_offset, 0)
+        return None
+
+    @property
+    def message_body(self) -> bytes:
+        """Тело запроса целиком. Файл читается без сдвига позиции, а
+        итератор поглощается и заменяется прочитанными байтами."""
+        if isinstance(self.body, bytes):
+            return self.body
+        if hasattr(self.body, "fileno"):
+            position = self.body.tell()
+            self.body.seek(self._body_offset)
+            data = self.body.read(self.content_length)
+            self.body.seek(position)
+            return data
+        self.body = b"".join(self.body)
+        return self.body
+
+    def iter_body(self, chunk_size: int = http_client.const.BODY_CHUNK_SIZE):
+        """Тело в том виде, в каком оно уходит в сокет."""
+        if self.is_chunked:
+            chunks = [self.body] if isinstance(self.body, bytes) else self.body
+            for chunk in chunks:
+                if chunk:
+                    yield b"%x\r\n%s\r\n" % (len(chunk), chunk)
+            yield b"0\r\n\r\n"
+        elif isinstance(self.body, bytes):
+            yield self.body
+        else:
+            self.body.seek(self._body_offset)
+            left = self.content_length
+            while left > 0:
+                chunk = self.body.read(min(chunk_size, left))
+                if not chunk:
+                    break
+                left -= len(chunk)
+                yield chunk
+
+    @property
+    def can_replay(self) -> bool:
+        """Тело можно отправить повторно: это байты или файл."""
+        return not self.is_chunked or isinstance(self.body, bytes)
+
+    def send(self, sock: socket.socket):
+        """Отправляет запрос. Файл на обычном сокете передаётся через
+        sendfile без копирования в память процесса, на TLS-сокете -
+        циклом записи блоками. Тело-байты уходит вместе с головой одним
+        sendmsg."""
+        if isinstance(self.body, bytes):
+            self.prepared.send(sock, self.body)
+            return
+        sock.sendall(self.head)
+        if hasattr(self.body, "fileno") and not is_tls_socket(sock):
+            if self.content_length:
+                sock.sendfile(
+                    self.body, self._body_offset, self.content_length
+                )
+            return
+        for chunk in self.iter_body():
+            sock.sendall(chunk)
+
+    def close(self):
+        if hasattr(self.body, "close"):
+            self.body.close()
+
+    def reopen_body(self):
+        """Перед повторной отправкой тело-файл, открытый по имени (-U),
+        открывается заново, а не держится в памяти: прежний дескриптор
+        мог быть закрыт или сдвинут. Отправка снова начнётся с исходного
+        смещения."""
+        name = getattr(self.body, "name", None)
+        if not hasattr(self.body, "fileno") or not isinstance(name, str):
+            return
+        self.body.close()
+        self.body = open(name, "rb")
+
+    def drop_body(self):
+        """Убирает тело и описывающие его заголовки: запрос после
+        перенаправления 303 (и POST после 301/302) уходит без тела."""
+        self.close()
+        self.body, self._body_offset = b"", 0
+        self.content_length = 0
+        for name in ("Content-Length", "Content-Type", "Transfer-Encoding"):
+            if name in self.headers:
+                del self.headers[name]
+
+    def get_request_headers(self) -> Headers:
+        headers = Headers(
+            {
+                "Host": self.url.host,
+                "User-Agent": self.user_agent,
+                "Accept": "*/*",
+                "Accept-Encoding": accept_encoding(),
+                "Connection": "keep-alive",
+            }
+        )
+        if self.method == "POST" or self.is_chunked:
+            if self.is_chunked:
+                headers.add("Transfer-Encoding", "chunked")
+            else:
+                headers.add("Content-Length", self.content_length)
+            headers.add("Content-Type", self.content_type)
         if self.cookies:
-            headers["Cookie"] = self.cookies
-        headers.update(self.user_headers)
+            headers.add("Cookie", self.cookies)
+        for header, value in self.user_headers.items():
+            headers[header] = value
         return headers
 
     @staticmethod
@@ -67,14 +303,12 @@ class Request:
                 result += f"-> {header}: {value}\r\n".encode()
         return result
 
+    @property
+    def head(self) -> bytes:
+        return self.prepared.head
+
     def __bytes__(self):
-        result = bytearray(
-            f"{self.method} {self.url.raw_path_qs} HTTP/1.1\r\n", "ISO-8859-1"
-        )
-        for header, value in self.headers.items():
-            result += bytes(f"{header}: {value}\r\n", "ISO-8859-1")
-        result += b"\r\n" + self.message_body + b"\r\n\r\n"
-        return bytes(result)
+        return self.head + b"".join(self.iter_body())
 
 
 class Response:
@@ -83,24 +317,168 @@ class Response:
         proto: str,
         code: int,
         phrase: str,
-        headers: dict,
+        headers: Headers,
         message_body: bytes,
         content_length: int,
         content_type: str,
+        body_source=None,
     ):
         self.proto = proto
         self.reason_phrase = phrase
         self.status_code = code
         self.headers = headers
-        self.message_body = message_body
+        self._message_body = message_body
+        self._body_source = body_source
+        self._encoded = True
+        self.on_release = None
+        self.timings = None
+        self.from_cache = False
+        self.retries = 0
+        self.retry_time = 0.0
         self.content_length = content_length
         self.content_type = content_type
+        self.decode_content = True
+        self.max_decoded_size = http_client.const.DECODE_MAX_SIZE
+        self.max_decode_ratio = http_client.const.DECODE_MAX_RATIO
+
+    @property
+    def message_body(self) -> bytes:
+        """Тело ответа целиком. Для потокового ответа, тело которого ещё не
+        прочитано, дочитывает его из соединения."""
+        if self._body_source is not None or self.needs_decoding:
+            self._message_body = b"".join(self.iter_body())
+            self._encoded = False
+        return self._message_body
+
+    @message_body.setter
+    def message_body(self, value: bytes):
+        self._message_body = value
+        self._encoded = False
+
+    @property
+    def content_encodings(self) -> list:
+        return parse_content_encoding(
+            self.headers.get("content-encoding", "")
+        )
+
+    @property
+    def needs_decoding(self) -> bool:
+        """Тело сжато известными кодировками и ещё не раскодировано. При
+        decode_content=False тело выдаётся в том виде, в каком пришло;
+        менять флаг нужно до чтения тела."""
+        return (
+            self._encoded
+            and self.decode_content
+            and can_decode(self.content_encodings)
+        )
+
+    def read(self) -> bytes:
+        return self.message_body
+
+    @property
+    def is_streaming(self) -> bool:
+        return self._body_source is not None
+
+    def iter_body(self, chunk_size: int = http_client.const.BODY_CHUNK_SIZE):
+        """Выдаёт тело ответа частями. Непрочитанное тело потокового ответа
+        читается прямо из сокета и не сохраняется в памяти. Сжатое тело
+        раскодируется по мере чтения."""
+        if self._body_source is None:
+            body = self._message_body
+            if self.needs_decoding:
+                yield from self.decode([body], chunk_size)
+                return
+            for start in range(0, len(body), chunk_size):
+                yield body[start:start + chunk_size]
+            return
+        source, self._body_source = self._body_source, None
+        chunks = source(chunk_size)
+        if self.needs_decoding:
+            chunks = self.decode(chunks, chunk_size)
+            self._encoded = False
+        drained = False
+        try:
+            yield from chunks
+            drained = True
+        finally:
+            self.release(drained)
+
+    def tee(self, sink):
+        """Передаёт сырые (не раскодированные) части тела в sink.write по
+        мере их чтения. Когда тело прочитано до конца, вызывается
+        sink.close(), а если чтение прервано - sink.abort(). Вызывать до
+        начала чтения тела."""
+        if self._body_source is None:
+            sink.write(self._message_body)
+            sink.close()
+            return
+        source = self._body_source
+
+        def copying(chunk_size: int):
+            drained = False
+            try:
+                for chunk in source(chunk_size):
+                    sink.write(chunk)
+                    yield chunk
+                drained = True
+            finally:
+                if drained:
+                    sink.close()
+                else:
+                    sink.abort()
+
+        self._body_source = copying
+
+    def decode(self, chunks, chunk_size: int):
+        return decode_chunks(
+            chunks,
+            self.content_encodings,
+            chunk_size,
+            self.max_decoded_size,
+            self.max_decode_ratio,
+        )
+
+    @property
+    def raw(self) -> io.BufferedReader:
+        """Файлоподобный объект для чтения тела ответа."""
+        return io.BufferedReader(
+            BodyStream(self.iter_body()), http_client.const.BODY_CHUNK_SIZE
+        )
+
+    def release(self, drained: bool):
+        if self.on_release is not None:
+            on_release, self.on_release = self.on_release, None
+            on_release(self, drained)
+
+    def close(self):
+        """Прекращает чтение тела. Если оно прочитано не до конца,
+        соединение не вернётся в пул."""
+        self._body_source = None
+        self.release(drained=False)
+
+    @property
+    def is_partial(self) -> bool:
+        return self.status_code == 206
+
+    @property
+    def content_range(self):
+        """(первый байт, последний байт, полный размер) из Content-Range
+        или None, если заголовка нет. Полный размер может быть None."""
+        if "content-range" not in self.headers:
+            return None
+        return parse_content_range(self.headers["content-range"])
+
+    @property
+    def will_close(self) -> bool:
+        """Сервер не оставит соединение открытым после этого ответа."""
+        connection = self.headers.get("connection", "").lower()
+        if self.proto == "HTTP/1.0":
+            return connection != "keep-alive"
+        return connection == "close"
 
     @property
     def raw_headers(self):
-        return "\r\n".join(
-            [f"{header}:{value}" for header, value in self.headers.items()]
-        ).encode()
+        return self.headers.wire[:-2]
 
     @property
     def raw_starting_line(self):
@@ -110,35 +488,50 @@ class Response:
 
     @classmethod
     def from_bytes(cls, raw_response: io.BytesIO):
-        parsed_headers = {}
-        proto, code, phrase = cls.parse_starting_line(raw_response.readline())
-        line = raw_response.readline().rstrip(b"\r\n")
-        while line:
-            name, value = line.decode().split(":", 1)
-            parsed_headers[name.lower()] = value
-            line = raw_response.readline().rstrip(b"\r\n")
-        content_length = int(parsed_headers.get("content-length", 0))
-        content_type = parsed_headers.get("content-type", "text/plain")
-        message_body = raw_response.read(content_length)
+        return cls.from_reader(ResponseReader(raw_response))
+
+    @classmethod
+    def from_reader(
+        cls, reader: ResponseReader, method: str = None, stream=False
+    ):
+        """Читает из потока одно сообщение. Если известен метод запроса,
+        промежуточные ответы 1xx пропускаются, а тело читается только
+        там, где оно допустимо. При stream=True тело не читается, а
+        выдаётся по требованию через iter_body."""
+        proto, code, phrase, headers = reader.read_head()
+        while method and 100 <= code < 200 and code != 101:
+            proto, code, phrase, headers = reader.read_head()
+        message_body, body_source = b"", None
+        if method is None or has_body(method, code):
+            if stream:
+                body_source = functools.partial(reader.iter_body, headers)
+            else:
+                message_body = reader.read_body(headers)
+        return cls.from_head(
+            (proto, code, phrase, headers), message_body, body_source
+        )
+
+    @classmethod
+    def from_head(cls, head: tuple, message_body: bytes, body_source=None):
+        proto, code, phrase, headers = head
+        length = content_length(headers)
+        if length is None:
+            length = len(message_body)
+        content_type = headers.get("content-type", "text/plain")
         return Response(
             proto,
             code,
             phrase,
-            parsed_headers,
+            headers,
             message_body,
-            content_length,
+            length,
             content_type,
+            body_source,
         )
 
     @classmethod
     def parse_starting_line(cls, line: bytes):
-        result = re.search(
-            http_client.const.STARTING_LINE, line.rstrip(b"\r\n").decode()
-        )
-        if not result:
-            raise http_client.errors.IncorrectStartingLineError(line.decode())
-        groups = result.groupdict()
-        return groups["proto"], int(groups["code"]), groups["phrase"].lstrip()
+        return parse_starting_line(line)
 
     def __bytes__(self):
         return b"\r\n".join(
@@ -149,3 +542,9 @@ class Response:
         if preview == OutputMode.BODY:
             return self.message_body
         return bytes(self)
+
+    def iter_results(self, preview: OutputMode):
+        """Потоковый аналог get_results."""
+        if preview != OutputMode.BODY:
+            yield self.raw_starting_line + b"\r\n" + self.raw_headers + b"\r\n"
+        yield from self.iter_body()
@@ -0,0 +1,150 @@
+import collections
+import logging
+import select
+import socket
+import threading
+import time
+import http_client.const
+import http_client.errors
+from http_client.reader import ResponseReader
+from http_client.resolver import Resolver, default_resolver
+from http_client.timings import Timings
+from http_client.tls import TLSContext, get_tls_context
+
+logger = logging.getLogger(__name__)
+
+
+class Connection:
+    def __init__(
+        self, key: tuple, sock: socket.socket, tls: TLSContext = None
+    ):
+        self.key = key
+        self.sock = sock
+        self.tls = tls
+        self.reader = ResponseReader(sock)
+        self.reused = False
+        self.closed = False
+        self.last_used = time.monotonic()
+
+    @classmethod
+    def open(
+        cls,
+        key: tuple,
+        timeout: float,
+        timings: Timings = None,
+        resolver: Resolver = None,
+        tls: TLSContext = None,
+    ):
+        """Открывает соединение, раздельно выполняя разрешение имени,
+        TCP-подключение и TLS-рукопожатие, чтобы замерить каждую фазу."""
+        scheme, host, port = key
+        timings = timings or Timings()
+        resolver = resolver or default_resolver
+        tls = tls or get_tls_context()
+        logger.info(f"Attempting to connect to: {host}")
+        sock, resolved = resolver.connect(host, port, timeout)
+        timings.mark("dns_done", resolved)
+        timings.mark("connect_done")
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            if scheme == "https":
+                sock = tls.wrap_socket(sock, host, port)
+            timings.mark("tls_done")
+        except OSError:
+            sock.close()
+            raise
+        return cls(key, sock, tls if scheme == "https" else None)
+
+    def is_dropped(self) -> bool:
+        """Простаивающее соединение не должно быть доступно для чтения:
+        это означает либо закрытие сокета сервером, либо лишние данные."""
+        if self.closed:
+            return True
+        try:
+            readable, _, _ = select.select([self.sock], [], [], 0)
+        except (OSError, ValueError):
+            return True
+        return bool(readable)
+
+    def is_expired(self, idle_timeout: float) -> bool:
+        return time.monotonic() - self.last_used > idle_timeout
+
+    def save_session(self):
+        if self.tls is not None and not self.closed:
+            self.tls.save_session(self.sock, self.key[1], self.key[2])
+
+    def close(self):
+        self.save_session()
+        self.closed = True
+        self.sock.close()
+
+
+class ConnectionPool:
+    def __init__(
+        self,
+        max_idle_per_host: int = http_client.const.POOL_MAX_IDLE_PER_HOST,
+        idle_timeout: float = http_client.const.POOL_IDLE_TIMEOUT,
+        resolver: Resolver = None,
+        tls: TLSContext = None,
+    ):
+        self.max_idle_per_host = max_idle_per_host
+        self.idle_timeout = idle_timeout
+        self.resolver = resolver or default_resolver
+        self.tls = tls or get_tls_context()
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def acquire(
+        self,
+        scheme: str,
+        host: str,
+        port: int,
+        timeout: float,
+        timings: Timings = None,
+    ) -> Connection:
+        """Выдаёт живое соединение из пула или открывает новое."""
+        key = (scheme, host, port)
+        with self._lock:
+            idle = self._idle.get(key)
+            while idle:
+                conn = idle.pop()
+                if conn.is_expired(self.idle_timeout) or conn.is_dropped():
+                    logger.debug(f"Evicting stale connection to: {host}")
+                    conn.close()
+                    continue
+                conn.sock.settimeout(timeout)
+                logger.debug(f"Reusing connection to: {host}")
+                if timings:
+                    timings.reused = True
+                return conn
+        return Connection.open(key, timeout, timings, self.resolver, self.tls)
+
+    def release(self, conn: Connection):
+        """Возвращает соединение в пул для повторного использования."""
+        if conn.closed:
+            return
+        conn.reused = True
+        conn.last_used = time.monotonic()
+        conn.save_session()
+        with self._lock:
+            idle = self._idle.setdefault(conn.key, collections.deque())
+            idle.append(conn)
+            while len(idle) > self.max_idle_per_host:
+                idle.popleft().close()
+
+    def idle_count(self, scheme: str, host: str, port: int) -> int:
+        with self._lock:
+            return len(self._idle.get((scheme, host, port), ()))
+
+    def close(self):
+        with self._lock:
+            for idle in self._idle.values():
+                for conn in idle:
+                    conn.close()
+            self._idle.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,317 @@
+import io
+import http_client.const
+import http_client.errors
+from http_client.headers import Headers
+
+PROTOCOLS = ("HTTP/1.1", "HTTP/1.0")
+HEAD_END = b"\r\n\r\n"
+
+
+def parse_starting_line(line) -> tuple:
+    if isinstance(line, (bytes, bytearray, memoryview)):
+        line = str(line, "ISO-8859-1")
+    proto, _, rest = line.rstrip("\r\n").partition(" ")
+    code, _, phrase = rest.partition(" ")
+    if proto not in PROTOCOLS or len(code) != 3 or not code.isdigit():
+        raise http_client.errors.IncorrectStartingLineError(line.rstrip())
+    return proto, int(code), phrase.strip()
+
+
+def parse_headers(lines: list) -> Headers:
+    """Строки заголовков (bytes) без переводов строк; значения очищаются
+    от пробелов по краям. Обычный случай обрабатывается двумя
+    генераторами списков, а пустые строки, строки-продолжения (obs-fold)
+    без двоеточия и ошибки - отдельным циклом."""
+    parts = [line.partition(b":") for line in lines]
+    fields = [
+        (name.rstrip(), value.strip()) for name, colon, value in parts if colon
+    ]
+    if len(fields) == len(parts):
+        return Headers.from_fields(fields)
+    fields = []
+    for line in lines:
+        if not line:
+            continue
+        if line[:1] in (b" ", b"\t") and fields:
+            name, value = fields[-1]
+            fields[-1] = (name, value + b" " + line.strip())
+            continue
+        name, colon, value = line.partition(b":")
+        if not colon:
+            raise http_client.errors.IncompleteResponseError(
+                f"некорректный заголовок: {line!r}"
+            )
+        fields.append((name.rstrip(), value.strip()))
+    return Headers.from_fields(fields)
+
+
+def parse_head(block) -> tuple:
+    """Стартовая строка и заголовки из блока, найденного целиком: блок
+    делится на строки за один проход, заголовки остаются байтами."""
+    lines = bytes(block).split(b"\r\n")
+    proto, code, phrase = parse_starting_line(lines[0])
+    return proto, code, phrase, parse_headers(lines[1:])
+
+
+def parse_chunk_size(line: bytes) -> int:
+    try:
+        return int(line.split(b";", 1)[0].strip(), 16)
+    except ValueError:
+        raise http_client.errors.IncompleteResponseError(
+            f"некорректный размер блока: {line!r}"
+        )
+
+
+def parse_content_range(value: str) -> tuple:
+    """Content-Range: bytes first-last/total -> (first, last, total);
+    total равен None при "*". Ответ 416 ("bytes */total") даёт
+    (None, None, total)."""
+    unit, _, spec = value.strip().partition(" ")
+    span, _, total = spec.partition("/")
+    try:
+        if unit.lower() != "bytes" or not total:
+            raise ValueError(value)
+        total = None if total == "*" else int(total)
+        if span == "*":
+            return None, None, total
+        first, last = (int(part) for part in span.split("-"))
+        if first > last or (total is not None and last >= total):
+            raise ValueError(value)
+    except ValueError:
+        raise http_client.errors.IncompleteResponseError(
+            f"некорректный Content-Range: {value}"
+        )
+    return first, last, total
+
+
+def content_length(headers: Headers):
+    """Длина тела из Content-Length или None, если заголовка нет.
+    Повторы допустимы только с одинаковым значением (RFC 9112, 6.3)."""
+    values = {
+        value.strip()
+        for field in headers.get_all("content-length")
+        for value in field.split(",")
+    }
+    if not values:
+        return None
+    value = values.pop()
+    if values or not (value.isascii() and value.isdigit()):
+        raise http_client.errors.IncompleteResponseError(
+            "некорректный Content-Length"
+        )
+    return int(value)
+
+
+def is_chunked(headers: Headers) -> bool:
+    encoding = headers.get("transfer-encoding", "").lower()
+    return encoding.endswith("chunked")
+
+
+def has_body(method: str, code: int) -> bool:
+    if method == "HEAD":
+        return False
+    return code >= 200 and code not in (204, 304)
+
+
+class ReceiveBuffer:
+    """Приёмный буфер поверх recv_into (сокет) или readinto (файл).
+
+    Строки читаются в заранее выделенный bytearray и выдаются срезами
+    memoryview, действительными до следующего чтения. Крупные блоки тела
+    читаются сразу в память получателя, минуя буфер. Размер одного
+    чтения в буфер подстраивается под скорость поступления данных."""
+
+    def __init__(self, source, size: int = http_client.const.RECV_BUFFER_SIZE):
+        self._recv_into = getattr(source, "recv_into", None)
+        if self._recv_into is None:
+            self._recv_into = source.readinto
+        self._buffer = bytearray(size)
+        self._view = memoryview(self._buffer)
+        self._start = 0
+        self._end = 0
+        self.read_size = http_client.const.MIN_READ_SIZE
+
+    @property
+    def buffered(self) -> int:
+        return self._end - self._start
+
+    def _fill(self) -> int:
+        if self._start == self._end:
+            self._start = self._end = 0
+        elif len(self._buffer) - self._end < self.read_size:
+            size = self.buffered
+            self._view[:size] = self._view[self._start:self._end]
+            self._start, self._end = 0, size
+        requested = min(self.read_size, len(self._buffer) - self._end)
+        received = self._recv_into(
+            self._view[self._end:self._end + requested]
+        )
+        self._end += received
+        if received == requested:
+            self.read_size = min(self.read_size * 2, len(self._buffer))
+        elif received < requested // 4:
+            self.read_size = max(
+                self.read_size // 2, http_client.const.MIN_READ_SIZE
+            )
+        return received
+
+    def _take(self, size: int) -> memoryview:
+        chunk = self._view[self._start:self._start + size]
+        self._start += size
+        return chunk
+
+    def readline(self, limit: int) -> memoryview:
+        """Строка вместе с переводом строки или остаток данных до EOF.
+        Если перевод строки не найден в пределах limit, возвращает
+        limit + 1 байт."""
+        return self.readuntil(b"\n", limit)
+
+    def readuntil(self, separator: bytes, limit: int) -> memoryview:
+        """Данные до separator включительно; при EOF и превышении limit -
+        как readline."""
+        offset = 0
+        while True:
+            end = self._buffer.find(separator, self._start + offset, self._end)
+            if end >= 0:
+                return self._take(end + len(separator) - self._start)
+            if self.buffered > limit:
+                return self._take(limit + 1)
+            offset = max(self.buffered - len(separator) + 1, 0)
+            if not self._fill():
+                return self._take(self.buffered)
+
+    def readinto(self, destination) -> int:
+        """Одно чтение: из буфера, если там есть данные, иначе напрямую из
+        источника в destination."""
+        if not self.buffered and len(destination) < self.read_size:
+            self._fill()
+        if self.buffered:
+            size = min(len(destination), self.buffered)
+            destination[:size] = self._take(size)
+            return size
+        return self._recv_into(destination)
+
+    def read(self, size: int) -> bytearray:
+        """Ровно size байт (меньше - только при EOF) без промежуточных
+        копий."""
+        result = bytearray(size)
+        with memoryview(result) as view:
+            filled = 0
+            while filled < size:
+                received = self.readinto(view[filled:])
+                if not received:
+                    break
+                filled += received
+        del result[filled:]
+        return result
+
+
+class ResponseReader:
+    """Потоковый разбор ответа: сначала стартовая строка и заголовки,
+    затем ровно одно тело сообщения (по Content-Length, chunked или до
+    закрытия соединения)."""
+
+    def __init__(self, stream):
+        self.buffer = ReceiveBuffer(stream)
+        self.close_delimited = False
+
+    def read_line(self) -> memoryview:
+        line = self.buffer.readline(http_client.const.MAX_LINE_SIZE)
+        if len(line) > http_client.const.MAX_LINE_SIZE:
+            raise http_client.errors.IncompleteResponseError(
+                "слишком длинная строка"
+            )
+        return line
+
+    def read_head(self) -> tuple:
+        block = self.buffer.readuntil(
+            HEAD_END, http_client.const.MAX_HEAD_SIZE
+        )
+        if not block:
+            raise http_client.errors.ConnectionDroppedError()
+        if len(block) > http_client.const.MAX_HEAD_SIZE:
+            raise http_client.errors.IncompleteResponseError(
+                "слишком длинный заголовок"
+            )
+        if block[-len(HEAD_END):] == HEAD_END:
+            block = block[:-len(HEAD_END)]
+        return parse_head(block)
+
+    def iter_body(self, headers: Headers, chunk_size: int):
+        """Генератор частей тела, размер каждой не превышает chunk_size.
+        Каждая часть - новый bytearray, заполненный прямо из сокета."""
+        if is_chunked(headers):
+            yield from self.iter_chunked(chunk_size)
+            return
+        length = content_length(headers)
+        if length is not None:
+            yield from self.iter_exactly(length, chunk_size)
+        else:
+            self.close_delimited = True
+            yield from self.iter_until_close(chunk_size)
+
+    def read_exactly(self, length: int) -> bytearray:
+        data = self.buffer.read(length)
+        if len(data) < length:
+            raise http_client.errors.IncompleteResponseError(
+                f"не хватает {length - len(data)} байт тела"
+            )
+        return data
+
+    def iter_exactly(self, length: int, chunk_size: int):
+        while length > 0:
+            data = self.read_exactly(min(length, chunk_size))
+            length -= len(data)
+            yield data
+
+    def iter_chunked(self, chunk_size: int):
+        while True:
+            size = parse_chunk_size(bytes(self.read_line()))
+            if size == 0:
+                break
+            yield from self.iter_exactly(size, chunk_size)
+            self.read_line()
+        while bytes(self.read_line()).rstrip(b"\r\n"):
+            pass
+
+    def iter_until_close(self, chunk_size: int):
+        while True:
+            chunk = bytearray(chunk_size)
+            received = self.buffer.readinto(chunk)
+            if not received:
+                break
+            del chunk[received:]
+            yield chunk
+
+    def read_body(self, headers: Headers) -> bytes:
+        """Тело целиком. При известной длине читается одним блоком прямо
+        в итоговый bytearray."""
+        if not is_chunked(headers):
+            length = content_length(headers)
+            if length is not None:
+                return self.read_exactly(length)
+        return b"".join(
+            self.iter_body(headers, http_client.const.BODY_CHUNK_SIZE)
+        )
+
+
+class BodyStream(io.RawIOBase):
+    """Небуферизованный поток поверх итератора частей тела."""
+
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self._pending = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            chunk = next(self._chunks, b"")
+            if not chunk:
+                return 0
+            self._pending = memoryview(chunk)
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
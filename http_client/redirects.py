@@ -0,0 +1,104 @@
+import collections
+import threading
+import http_client.const
+import http_client.errors
+from http_client.urls import origin, resolve_url
+
+
+def is_redirect(response) -> bool:
+    return (
+        response.status_code in http_client.const.REDIRECT_CODES
+        and "location" in response.headers
+    )
+
+
+def resolve_location(current, location: str):
+    """Адрес перехода: Location может быть абсолютным, без схемы или
+    относительным - тогда он разрешается относительно текущего адреса."""
+    url = resolve_url(current, location)
+    if url.scheme not in ("http", "https") or not url.host:
+        raise http_client.errors.UrlParsingError(location)
+    return url
+
+
+def redirect_method(code: int, method: str) -> str:
+    """Метод запроса после перехода: 303 превращает всё, кроме HEAD, в GET,
+    301 и 302 - только POST (как это делают браузеры), 307 и 308 метод и
+    тело сохраняют."""
+    if code == 303 and method != "HEAD":
+        return "GET"
+    if code in (301, 302) and method == "POST":
+        return "GET"
+    return method
+
+
+def rewrite_request(request, code: int):
+    """Готовит запрос к переходу по ответу с кодом code: при смене метода
+    (redirect_method) убирает тело, а если тело нужно отправить ещё раз,
+    но это невозможно, - RedirectError."""
+    method = redirect_method(code, request.method)
+    if method != request.method:
+        request.method = method
+        request.drop_body()
+    elif not request.can_replay:
+        raise http_client.errors.RedirectError(
+            "тело запроса нельзя отправить повторно"
+        )
+
+
+def retarget(request, url):
+    """Направляет запрос по новому адресу. Authorization на другой хост
+    (схему, порт) не передаётся."""
+    headers = request.headers
+    if origin(url) != origin(request.url) and "Authorization" in headers:
+        del headers["Authorization"]
+    request.url = url
+    headers["Host"] = url.host
+
+
+class RedirectMemo:
+    """Запомненные постоянные перенаправления (301 и 308) по хосту и пути.
+    Повторный запрос по такому адресу сразу уходит на новый, не тратя
+    обмен на известный переход. 301 применяется только к GET и HEAD,
+    поскольку остальные методы он переписывает. Хранится не более
+    max_entries последних переходов."""
+
+    def __init__(
+        self, max_entries: int = http_client.const.REDIRECT_MEMO_SIZE
+    ):
+        self.max_entries = max_entries
+        self._targets = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(url) -> tuple:
+        return url.scheme, url.host, url.port, url.raw_path_qs
+
+    def remember(self, url, code: int, target):
+        with self._lock:
+            self._targets[self.key(url)] = (code, target)
+            self._targets.move_to_end(self.key(url))
+            while len(self._targets) > self.max_entries:
+                self._targets.popitem(last=False)
+
+    def lookup(self, method: str, url):
+        """Новый адрес или None."""
+        with self._lock:
+            known = self._targets.get(self.key(url))
+        if known is None:
+            return None
+        code, target = known
+        if code == 301 and method not in ("GET", "HEAD"):
+            return None
+        return target
+
+    def forget(self, url):
+        with self._lock:
+            self._targets.pop(self.key(url), None)
+
+    def clear(self):
+        with self._lock:
+            self._targets.clear()
+
+
+default_redirects = RedirectMemo()
@@ -0,0 +1,204 @@
+import errno
+import logging
+import selectors
+import socket
+import threading
+import time
+import http_client.const
+import http_client.errors
+
+logger = logging.getLogger(__name__)
+IN_PROGRESS = (errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EAGAIN)
+
+
+def interleave(addresses: list) -> list:
+    """Чередует семейства адресов (RFC 8305), начиная с первого."""
+    families = {}
+    for address in addresses:
+        families.setdefault(address[0], []).append(address)
+    result = []
+    groups = list(families.values())
+    while any(groups):
+        for group in groups:
+            if group:
+                result.append(group.pop(0))
+    return result
+
+
+def parse_resolve_spec(spec: str) -> tuple:
+    """Разбор переопределения в формате curl: host:port:addr[,addr...]."""
+    try:
+        host, port, addresses = spec.split(":", 2)
+        port = int(port)
+    except ValueError:
+        raise http_client.errors.ResolveSpecError(spec)
+    result = []
+    for address in addresses.split(","):
+        address = address.strip().strip("[]")
+        try:
+            family = socket.AF_INET6 if ":" in address else socket.AF_INET
+            socket.inet_pton(family, address)
+        except OSError:
+            raise http_client.errors.ResolveSpecError(spec)
+        result.append((family, (address, port)))
+    return host.lower(), port, result
+
+
+class Resolver:
+    """Разрешение имён с кэшем на ttl секунд и подключением по схеме
+    happy eyeballs: попытки подключиться к очередному адресу запускаются
+    с интервалом delay, не дожидаясь ответа от предыдущих, а при ошибке
+    сразу переходят к следующему адресу."""
+
+    def __init__(
+        self,
+        ttl: float = http_client.const.DNS_TTL,
+        delay: float = http_client.const.HAPPY_EYEBALLS_DELAY,
+    ):
+        self.ttl = ttl
+        self.delay = delay
+        self.overrides = {}
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def add_override(self, spec: str):
+        host, port, addresses = parse_resolve_spec(spec)
+        self.overrides[(host, port)] = addresses
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def invalidate(self, host: str, port: int):
+        with self._lock:
+            self._cache.pop((host.lower(), port), None)
+
+    def resolve(self, host: str, port: int) -> list:
+        """Список пар (семейство, адрес сокета)."""
+        key = (host.lower(), port)
+        if key in self.overrides:
+            return self.overrides[key]
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached and cached[0] > time.monotonic():
+                return cached[1]
+        try:
+            infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        except socket.gaierror:
+            raise http_client.errors.ConnectingError(host, port)
+        addresses = interleave([(info[0], info[4]) for info in infos])
+        with self._lock:
+            self._cache[key] = (time.monotonic() + self.ttl, addresses)
+        return addresses
+
+    def connect(self, host: str, port: int, timeout: float) -> tuple:
+        """Возвращает подключённый блокирующий сокет и момент окончания
+        разрешения имени."""
+        addresses = self.resolve(host, port)
+        resolved = time.monotonic()
+        try:
+            sock = self.race(addresses, timeout)
+        except OSError:
+            self.invalidate(host, port)
+            raise
+        sock.settimeout(timeout)
+        return sock, resolved
+
+    def race(self, addresses: list, timeout: float) -> socket.socket:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        pending = list(addresses)
+        attempts = {}
+        error = OSError("no addresses to connect to")
+        with selectors.DefaultSelector() as selector:
+            try:
+                while pending or attempts:
+                    if pending:
+                        family, address = pending.pop(0)
+                        sock = socket.socket(family, socket.SOCK_STREAM)
+                        sock.setblocking(False)
+                        code = sock.connect_ex(address)
+                        if code == 0:
+                            sock.setblocking(True)
+                            return sock
+                        if code not in IN_PROGRESS:
+                            error = OSError(code, f"{address}: connect failed")
+                            sock.close()
+                            continue
+                        selector.register(sock, selectors.EVENT_WRITE)
+                        attempts[sock] = address
+                    wait = self.delay if pending else None
+                    if deadline is not None:
+                        left = deadline - time.monotonic()
+                        if left <= 0:
+                            raise socket.timeout("timed out")
+                        wait = left if wait is None else min(wait, left)
+                    for key, _ in selector.select(wait):
+                        sock = key.fileobj
+                        selector.unregister(sock)
+                        address = attempts.pop(sock)
+                        code = sock.getsockopt(
+                            socket.SOL_SOCKET, socket.SO_ERROR
+                        )
+                        if code == 0:
+                            sock.setblocking(True)
+                            return sock
+                        logger.debug(f"Connection to {address} failed")
+                        error = OSError(code, f"{address}: connect failed")
+                        sock.close()
+            finally:
+                for sock in attempts:
+                    sock.close()
+        raise error
+
+    async def connect_async(self, host: str, port: int) -> tuple:
+        """Асинхронный вариант connect: подключённый неблокирующий сокет
+        для asyncio.open_connection(sock=...) и момент окончания
+        разрешения имени."""
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        addresses = await loop.run_in_executor(None, self.resolve, host, port)
+        resolved = time.monotonic()
+
+        async def attempt(family, address):
+            sock = socket.socket(family, socket.SOCK_STREAM)
+            sock.setblocking(False)
+            try:
+                await loop.sock_connect(sock, address)
+            except BaseException:
+                sock.close()
+                raise
+            return sock
+
+        pending = list(addresses)
+        running = set()
+        winner, error = None, OSError("no addresses to connect to")
+        try:
+            while winner is None and (pending or running):
+                if pending:
+                    family, address = pending.pop(0)
+                    running.add(
+                        asyncio.ensure_future(attempt(family, address))
+                    )
+                done, running = await asyncio.wait(
+                    running,
+                    timeout=self.delay if pending else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                    elif winner is None:
+                        winner = task.result()
+                    else:
+                        task.result().close()
+        finally:
+            for task in running:
+                task.cancel()
+        if winner is None:
+            self.invalidate(host, port)
+            raise error
+        return winner, resolved
+
+
+default_resolver = Resolver()
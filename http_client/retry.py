@@ -0,0 +1,148 @@
+import logging
+import random
+import socket
+import time
+import http_client.const
+import http_client.errors
+from http_client.scheduler import parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+# socket.timeout до Python 3.10 - не TimeoutError.
+RETRY_ERRORS = (
+    ConnectionError,
+    TimeoutError,
+    socket.timeout,
+    http_client.errors.ConnectingError,
+    http_client.errors.ConnectionDroppedError,
+    http_client.errors.IncompleteResponseError,
+)
+
+
+def as_rules(rules) -> dict:
+    """Правила повторов: словарь "код или тип исключения -> наибольшее
+    число повторов (None - до общего предела)" или просто перечень."""
+    if isinstance(rules, dict):
+        return dict(rules)
+    return {rule: None for rule in rules}
+
+
+class RetryState:
+    """Ход повторов одного запроса."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.retries = 0
+        self.counts = {}
+        self.retry_time = 0.0
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+
+class RetryPolicy:
+    """Повтор запроса при ошибках соединения и ответах с кодами из
+    statuses. Пауза перед n-м повтором случайна в пределах
+    [0, min(max_backoff, backoff * 2 ** n)] ("full jitter"), а
+    Retry-After сервера, если он есть, её заменяет. Повтор не начинается,
+    если с первой попытки прошло бы больше deadline секунд.
+
+    statuses и exceptions - перечни или словари с пределом повторов для
+    каждого кода и типа исключения. Повторяются только методы из methods
+    (по умолчанию идемпотентные GET, HEAD и OPTIONS) и запросы, тело
+    которых можно отправить ещё раз."""
+
+    def __init__(
+        self,
+        total: int = http_client.const.RETRY_TOTAL,
+        backoff: float = http_client.const.RETRY_BACKOFF,
+        max_backoff: float = http_client.const.RETRY_MAX_BACKOFF,
+        deadline: float = None,
+        statuses=http_client.const.RETRY_STATUSES,
+        exceptions=RETRY_ERRORS,
+        methods=http_client.const.RETRY_METHODS,
+        respect_retry_after: bool = True,
+    ):
+        self.total = total
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.deadline = deadline
+        self.statuses = as_rules(statuses)
+        self.exceptions = as_rules(exceptions)
+        self.methods = {method.upper() for method in methods}
+        self.respect_retry_after = respect_retry_after
+
+    def can_replay(self, request) -> bool:
+        return request.method in self.methods and request.can_replay
+
+    def rule_for_error(self, error: BaseException):
+        for kind in type(error).__mro__:
+            if kind in self.exceptions:
+                return kind
+        return None
+
+    def pause(self, state: RetryState, response=None) -> float:
+        limit = min(self.max_backoff, self.backoff * 2 ** state.retries)
+        delay = random.uniform(0, limit)
+        if response is not None and self.respect_retry_after:
+            retry_after = parse_retry_after(
+                response.headers.get("retry-after")
+            )
+            if retry_after is not None:
+                delay = min(retry_after, self.max_backoff)
+        return delay
+
+    def next_pause(self, state: RetryState, request, rule, response=None):
+        """Пауза перед повтором или None, если повторять нельзя."""
+        if state.retries >= self.total or not self.can_replay(request):
+            return None
+        rules = self.exceptions if response is None else self.statuses
+        limit = rules[rule]
+        if limit is not None and state.counts.get(rule, 0) >= limit:
+            return None
+        delay = self.pause(state, response)
+        if self.deadline is not None and (
+            state.elapsed + delay > self.deadline
+        ):
+            return None
+        return delay
+
+    def wait(self, state: RetryState, rule, delay: float):
+        logger.info(f"Retrying after {rule} in {delay:.3f} s")
+        time.sleep(delay)
+        state.retries += 1
+        state.counts[rule] = state.counts.get(rule, 0) + 1
+
+    def run(self, request, send):
+        """Выполняет send() с повторами и возвращает ответ с заполненными
+        retries и retry_time. Перед повтором тело-файл открывается
+        заново."""
+        state = RetryState()
+        while True:
+            attempt = time.monotonic()
+            try:
+                response = send()
+            except Exception as e:
+                rule = self.rule_for_error(e)
+                delay = None
+                if rule is not None:
+                    delay = self.next_pause(state, request, rule)
+                if delay is None:
+                    raise
+                state.retry_time += time.monotonic() - attempt + delay
+                self.wait(state, rule, delay)
+                request.reopen_body()
+                continue
+            rule = response.status_code
+            delay = None
+            if rule in self.statuses:
+                delay = self.next_pause(state, request, rule, response)
+            if delay is None:
+                response.retries = state.retries
+                response.retry_time = state.retry_time
+                return response
+            response.close()
+            state.retry_time += time.monotonic() - attempt + delay
+            self.wait(state, rule, delay)
+            request.reopen_body()
@@ -0,0 +1,302 @@
+import collections
+import concurrent.futures
+import logging
+import threading
+import time
+import http_client.const
+
+logger = logging.getLogger(__name__)
+INFINITY = float("inf")
+
+
+def parse_retry_after(value: str):
+    """Задержка из Retry-After в секундах (число или HTTP-дата) или
+    None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    import email.utils
+
+    try:
+        moment = email.utils.parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+    return max(moment - time.time(), 0.0)
+
+
+class TokenBucket:
+    """rate запросов в секунду с запасом не больше burst."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.tokens = min(
+            self.burst, self.tokens + (now - self.updated) * self.rate
+        )
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Время до появления токена; 0 - токен есть."""
+        self.refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+
+class HostState:
+    __slots__ = ("bucket", "in_flight", "blocked_until", "backoff")
+
+    def __init__(self, bucket: TokenBucket = None):
+        self.bucket = bucket
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.backoff = 0.0
+
+
+class SchedulerStats:
+    def __init__(self):
+        self.acquired = 0
+        self.throttled = 0
+        self.waited = 0.0
+
+    def __str__(self):
+        return (
+            f"scheduler: {self.acquired} requests, throttled: "
+            f"{self.throttled}, waited: {self.waited:.3f} s"
+        )
+
+
+class HostScheduler:
+    """Ограничения на хост (пару host, port): не больше rate запросов в
+    секунду с запасом burst (token bucket) и не больше max_in_flight
+    одновременных обменов. Ответы 429 и 503 приостанавливают запросы к
+    хосту на время из Retry-After, а без него - на растущую вдвое
+    задержку; успешный ответ её сбрасывает.
+
+    Слот занимается на обмен целиком, до освобождения соединения. Слот,
+    занятый заранее (FairDispatcher), покрывает только первый обмен
+    потока с хостом. Повторный захват в потоке, уже держащем слот хоста
+    (перенаправления, повторы), не занимает второй слот, но берёт токен
+    и ждёт окончания паузы после 429 и 503."""
+
+    def __init__(
+        self,
+        rate: float = None,
+        burst: int = 1,
+        max_in_flight: int = None,
+        max_backoff: float = http_client.const.SCHEDULER_MAX_BACKOFF,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.max_in_flight = max_in_flight
+        self.max_backoff = max_backoff
+        self.stats = SchedulerStats()
+        self._hosts = {}
+        self._cond = threading.Condition()
+        self._local = threading.local()
+
+    @staticmethod
+    def key(url) -> tuple:
+        return (url.host or "").lower(), url.port
+
+    def _state(self, key: tuple) -> HostState:
+        state = self._hosts.get(key)
+        if state is None:
+            bucket = None
+            if self.rate:
+                bucket = TokenBucket(self.rate, self.burst)
+            state = self._hosts[key] = HostState(bucket)
+        return state
+
+    def _delay(self, state: HostState, now: float, slot=True) -> float:
+        if slot and self.max_in_flight:
+            if state.in_flight >= self.max_in_flight:
+                return INFINITY
+        delay = max(state.blocked_until - now, 0.0)
+        if state.bucket is not None:
+            delay = max(delay, state.bucket.delay(now))
+        return delay
+
+    def _take(self, state: HostState, slot=True):
+        if slot:
+            state.in_flight += 1
+        if state.bucket is not None:
+            state.bucket.take()
+        self.stats.acquired += 1
+
+    def _held(self) -> dict:
+        held = getattr(self._local, "held", None)
+        if held is None:
+            held = self._local.held = {}
+            self._local.adopted = set()
+        return held
+
+    def delay(self, key: tuple) -> float:
+        """Сколько ждать до возможности запроса к хосту (INFINITY - пока
+        не освободится слот)."""
+        with self._cond:
+            return self._delay(self._state(key), time.monotonic())
+
+    def try_acquire(self, key: tuple) -> float:
+        """Занимает слот без ожидания и возвращает 0 или время, через
+        которое стоит попробовать снова. Занятый так слот передаётся
+        потоку, выполняющему запрос, через adopt."""
+        with self._cond:
+            state = self._state(key)
+            delay = self._delay(state, time.monotonic())
+            if not delay:
+                self._take(state)
+            return delay
+
+    def adopt(self, key: tuple):
+        self._held()[key] = 1
+        self._local.adopted.add(key)
+
+    def acquire(self, url) -> tuple:
+        """Ждёт слот для хоста url и возвращает ключ для release."""
+        key = self.key(url)
+        held = self._held()
+        if key in self._local.adopted:
+            self._local.adopted.discard(key)
+            held[key] += 1
+            return key
+        slot = key not in held
+        started = time.monotonic()
+        with self._cond:
+            state = self._state(key)
+            while True:
+                delay = self._delay(state, time.monotonic(), slot)
+                if not delay:
+                    break
+                self._cond.wait(None if delay == INFINITY else delay)
+            self._take(state, slot)
+            self.stats.waited += time.monotonic() - started
+        held[key] = held.get(key, 0) + 1
+        return key
+
+    def release(self, key: tuple):
+        held = self._held()
+        held[key] -= 1
+        if held[key]:
+            return
+        del held[key]
+        self._local.adopted.discard(key)
+        with self._cond:
+            self._state(key).in_flight -= 1
+            self._cond.notify_all()
+
+    def observe(self, key: tuple, response):
+        """Учитывает ответ: 429 и 503 откладывают запросы к хосту."""
+        with self._cond:
+            state = self._state(key)
+            if response.status_code not in http_client.const.THROTTLE_CODES:
+                state.backoff = 0.0
+                return
+            delay = parse_retry_after(response.headers.get("retry-after"))
+            if delay is None:
+                state.backoff = min(
+                    state.backoff * 2 or http_client.const.SCHEDULER_BACKOFF,
+                    self.max_backoff,
+                )
+                delay = state.backoff
+            delay = min(delay, self.max_backoff)
+            state.blocked_until = max(
+                state.blocked_until, time.monotonic() + delay
+            )
+            self.stats.throttled += 1
+        logger.info(
+            f"{key[0]} answered {response.status_code}, "
+            f"pausing for {delay:.3f} s"
+        )
+
+
+class FairDispatcher:
+    """Очереди заданий по хостам поверх пула потоков. Задание уходит в
+    пул, только когда планировщик готов принять запрос к его хосту, а
+    хосты обходятся по кругу. Поэтому ограниченный или медленный хост не
+    занимает потоки, нужные остальным."""
+
+    def __init__(
+        self,
+        scheduler: HostScheduler,
+        executor: concurrent.futures.Executor,
+        concurrency: int,
+    ):
+        self.scheduler = scheduler
+        self.executor = executor
+        self._free = concurrency
+        self._queues = collections.OrderedDict()
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def submit(self, key: tuple, fn, *args) -> concurrent.futures.Future:
+        future = concurrent.futures.Future()
+        with self._cond:
+            self._queues.setdefault(key, collections.deque()).append(
+                (future, fn, args)
+            )
+            self._cond.notify()
+        return future
+
+    def close(self):
+        """Дожидается передачи в пул всех заданий."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+    def _next(self) -> tuple:
+        """Следующее задание (ключ, задание) и None, либо None и время
+        ожидания."""
+        delay = INFINITY
+        for key in list(self._queues):
+            wait = self.scheduler.try_acquire(key)
+            if wait:
+                delay = min(delay, wait)
+                continue
+            queue = self._queues.pop(key)
+            job = queue.popleft()
+            if queue:
+                self._queues[key] = queue
+            return (key, job), None
+        return None, delay
+
+    def _loop(self):
+        with self._cond:
+            while self._queues or not self._closed:
+                picked, delay = None, INFINITY
+                if self._free and self._queues:
+                    picked, delay = self._next()
+                if picked is None:
+                    self._cond.wait(
+                        min(delay, http_client.const.SCHEDULER_POLL_INTERVAL)
+                    )
+                    continue
+                self._free -= 1
+                self.executor.submit(self._run, *picked)
+
+    def _run(self, key: tuple, job: tuple):
+        future, fn, args = job
+        self.scheduler.adopt(key)
+        try:
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(fn(*args))
+                except BaseException as e:
+                    future.set_exception(e)
+        finally:
+            self.scheduler.release(key)
+            with self._cond:
+                self._free += 1
+                self._cond.notify()
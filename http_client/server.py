@@ -0,0 +1,171 @@
+import asyncio
+import http.server
+import ssl
+import threading
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def handle_route(self):
+        self.server.requests.append((self.command, self.path, self.headers))
+        if self.headers.get("Transfer-Encoding") == "chunked":
+            self.request_body = self.read_chunked()
+        else:
+            length = int(self.headers.get("Content-Length", 0))
+            self.request_body = self.rfile.read(length) if length else b""
+        route = self.server.routes.get(
+            self.path.split("?")[0], self.server.default_route
+        )
+        if route is None:
+            self.send_body(404, b"not found")
+        else:
+            route(self)
+
+    def read_chunked(self) -> bytes:
+        body = bytearray()
+        size = int(self.rfile.readline(), 16)
+        while size:
+            body += self.rfile.read(size)
+            self.rfile.readline()
+            size = int(self.rfile.readline(), 16)
+        self.rfile.readline()
+        return bytes(body)
+
+    def send_body(self, code: int, body: bytes, headers: dict = None):
+        self.send_response(code)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def send_ranged(self, data: bytes, headers: dict = None):
+        """Отдаёт data целиком или, при заголовке Range с одним
+        диапазоном bytes=first-last (или first-), его часть с кодом 206."""
+        headers = dict(headers or {}, **{"Accept-Ranges": "bytes"})
+        spec = self.headers.get("Range", "")
+        if not spec.startswith("bytes=") or "," in spec:
+            self.send_body(200, data, headers)
+            return
+        first, _, last = spec[len("bytes="):].partition("-")
+        first = int(first)
+        last = min(int(last), len(data) - 1) if last else len(data) - 1
+        if first >= len(data) or first > last:
+            headers["Content-Range"] = f"bytes */{len(data)}"
+            self.send_body(416, b"", headers)
+            return
+        headers["Content-Range"] = f"bytes {first}-{last}/{len(data)}"
+        self.send_body(206, data[first:last + 1], headers)
+
+    do_GET = do_POST = do_HEAD = do_OPTIONS = handle_route
+
+
+class LocalServer:
+    """Локальный HTTP сервер для тестов и нагрузочного режима. Маршруты -
+    функции от handler; default обслуживает все остальные пути. С certfile
+    (ключ и сертификат в одном PEM-файле) сервер работает по HTTPS."""
+
+    def __init__(
+        self,
+        routes: dict = None,
+        default=None,
+        port: int = 0,
+        certfile: str = None,
+    ):
+        self.httpd = http.server.ThreadingHTTPServer(
+            ("127.0.0.1", port), Handler
+        )
+        self.scheme = "https" if certfile else "http"
+        if certfile:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(certfile)
+            self.httpd.socket = context.wrap_socket(
+                self.httpd.socket, server_side=True
+            )
+        self.httpd.daemon_threads = True
+        self.httpd.routes = routes or {}
+        self.httpd.default_route = default
+        self.httpd.connections = 0
+        self.httpd.requests = []
+        self.thread = threading.Thread(
+            target=self.httpd.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            daemon=True,
+        )
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"{self.scheme}://{host}:{port}"
+
+    @property
+    def connections(self) -> int:
+        return self.httpd.connections
+
+    @property
+    def requests(self) -> list:
+        return self.httpd.requests
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class AsyncLocalServer:
+    """HTTP сервер на asyncio с задержкой ответа в delay секунд."""
+
+    def __init__(self, body: bytes = b"ok", delay: float = 0):
+        self.body = body
+        self.delay = delay
+        self.connections = 0
+        self.requests = 0
+        self.server = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                self.requests += 1
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        await reader.readexactly(int(line.split(b":")[1]))
+                await asyncio.sleep(self.delay)
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n%s"
+                    % (len(self.body), self.body)
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def __aenter__(self):
+        self.server = await asyncio.start_server(
+            self.handle, "127.0.0.1", 0
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.server.close()
+        await self.server.wait_closed()
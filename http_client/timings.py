@@ -0,0 +1,78 @@
+import time
+
+
+class Timings:
+    """Отметки времени (time.monotonic) фаз одного запроса. Для
+    переиспользованного соединения фазы dns, connect и tls нулевые.
+    Перенаправления, предшествовавшие ответу, хранятся в redirects."""
+
+    EVENTS = (
+        "start",
+        "dns_done",
+        "connect_done",
+        "tls_done",
+        "request_sent",
+        "first_byte",
+        "done",
+    )
+
+    def __init__(self):
+        self.marks = {"start": time.monotonic()}
+        self.reused = False
+        self.redirects = []
+
+    def mark(self, event: str, moment: float = None):
+        self.marks[event] = time.monotonic() if moment is None else moment
+
+    def elapsed(self, event: str) -> float:
+        """Время от начала запроса до события. Пропущенное событие
+        приравнивается к предыдущему."""
+        moment = self.marks["start"]
+        for name in self.EVENTS:
+            moment = self.marks.get(name, moment)
+            if name == event:
+                return moment - self.marks["start"]
+        raise KeyError(event)
+
+    @property
+    def phases(self) -> dict:
+        """Длительность каждой фазы в секундах."""
+        result, previous = {}, 0.0
+        names = ("dns", "connect", "tls", "send", "wait", "receive")
+        for name, event in zip(names, self.EVENTS[1:]):
+            moment = self.elapsed(event)
+            result[name] = moment - previous
+            previous = moment
+        return result
+
+    @property
+    def total(self) -> float:
+        return self.elapsed("done")
+
+    @property
+    def redirect_time(self) -> float:
+        return sum(hop.total for hop in self.redirects)
+
+    def as_dict(self) -> dict:
+        """Накопительные отметки в терминах curl -w."""
+        return {
+            "time_namelookup": self.elapsed("dns_done"),
+            "time_connect": self.elapsed("connect_done"),
+            "time_appconnect": self.elapsed("tls_done"),
+            "time_pretransfer": self.elapsed("request_sent"),
+            "time_starttransfer": self.elapsed("first_byte"),
+            "time_total": self.total,
+            "time_redirect": self.redirect_time,
+            "num_redirects": len(self.redirects),
+            "num_connects": 0 if self.reused else 1,
+        }
+
+    def format(self) -> str:
+        lines = []
+        for number, hop in enumerate(self.redirects, 1):
+            lines.append(f"redirect #{number}: {hop.total:.6f}s")
+        for name, value in self.as_dict().items():
+            if isinstance(value, float):
+                value = f"{value:.6f}s"
+            lines.append(f"{name:>20}: {value}")
+        return "\n".join(lines)
@@ -0,0 +1,85 @@
+import functools
+import logging
+import socket
+import sys
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class TLSContext:
+    """Общий для всех соединений SSLContext и кэш TLS-сессий по (host,
+    port). Повторное подключение к хосту предъявляет сохранённую сессию, и
+    сервер может возобновить её сокращённым рукопожатием без обмена
+    сертификатами.
+
+    verify=False отключает проверку сертификата и имени хоста; cafile -
+    файл с доверенными сертификатами вместо системного хранилища.
+
+    Модуль ssl и SSLContext с загрузкой доверенных сертификатов создаются
+    при первом HTTPS-соединении: запросы по HTTP их не ждут."""
+
+    def __init__(self, verify: bool = True, cafile: str = None):
+        self.verify = verify
+        self.cafile = cafile
+        self._context = None
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    @property
+    def context(self):
+        with self._lock:
+            if self._context is None:
+                import ssl
+
+                context = ssl.create_default_context(cafile=self.cafile)
+                if not self.verify:
+                    context.check_hostname = False
+                    context.verify_mode = ssl.CERT_NONE
+                self._context = context
+            return self._context
+
+    def session(self, host: str, port: int):
+        with self._lock:
+            return self._sessions.get((host.lower(), port))
+
+    def wrap_socket(
+        self, sock: socket.socket, host: str, port: int
+    ) -> socket.socket:
+        session = self.session(host, port)
+        ssl_sock = self.context.wrap_socket(
+            sock, server_hostname=host, session=session
+        )
+        if session is not None and not ssl_sock.session_reused:
+            logger.debug(f"TLS session for {host} was not resumed")
+        return ssl_sock
+
+    def save_session(self, sock: socket.socket, host: str, port: int):
+        """Запоминает сессию соединения. В TLS 1.3 билет приходит после
+        рукопожатия, поэтому вызывать стоит после чтения ответа."""
+        session = getattr(sock, "session", None)
+        if session is None or not (session.has_ticket or session.id):
+            return
+        with self._lock:
+            self._sessions[(host.lower(), port)] = session
+
+    def forget(self, host: str, port: int):
+        with self._lock:
+            self._sessions.pop((host.lower(), port), None)
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+
+
+@functools.lru_cache(maxsize=None)
+def get_tls_context(verify: bool = True, cafile: str = None) -> TLSContext:
+    """Один TLSContext на каждую конфигурацию проверки."""
+    return TLSContext(verify, cafile)
+
+
+def is_tls_socket(sock) -> bool:
+    """Проверка без импорта ssl: пока модуль не загружен, TLS-сокетов в
+    процессе нет."""
+    ssl = sys.modules.get("ssl")
+    return ssl is not None and isinstance(sock, ssl.SSLSocket)
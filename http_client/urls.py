@@ -0,0 +1,149 @@
+import urllib.parse
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+HOST_CHARS = frozenset("abcdefghijklmnopqrstuvwxyz0123456789.-")
+SAFE_CHARS = frozenset(
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
+    "-._~!$&'()*+,;=:@/?"
+)
+
+
+class SimpleURL:
+    """Облегчённый адрес для частого случая: http(s), ASCII-хост без
+    userinfo, путь и строка запроса из символов, которые yarl оставил бы
+    как есть. Повторяет используемую клиентом часть интерфейса yarl.URL, но
+    не требует импорта yarl (и idna), что заметно ускоряет запуск."""
+
+    __slots__ = (
+        "scheme",
+        "host",
+        "port",
+        "explicit_port",
+        "_path",
+        "raw_query_string",
+        "fragment",
+    )
+
+    def __init__(
+        self,
+        scheme: str,
+        host: str,
+        port: int,
+        raw_path: str,
+        raw_query_string: str = "",
+        fragment: str = "",
+        explicit_port: bool = False,
+    ):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.explicit_port = explicit_port
+        self._path = raw_path
+        self.raw_query_string = raw_query_string
+        self.fragment = fragment
+
+    @classmethod
+    def parse(cls, url: str):
+        """SimpleURL или None, если адрес требует полной обработки."""
+        scheme, sep, rest = url.partition("://")
+        scheme = scheme.lower()
+        if not sep or scheme not in DEFAULT_PORTS:
+            return None
+        rest, _, fragment = rest.partition("#")
+        split = min(
+            (i for i in (rest.find("/"), rest.find("?")) if i >= 0),
+            default=len(rest),
+        )
+        netloc, rest = rest[:split], rest[split:]
+        path, _, query = rest.partition("?")
+        host, colon, port = netloc.partition(":")
+        host = host.lower()
+        if (
+            not host
+            or not HOST_CHARS.issuperset(host)
+            or colon and not (port.isdigit() and 0 < int(port) < 65536)
+            or not SAFE_CHARS.issuperset(rest)
+            or not SAFE_CHARS.issuperset(fragment)
+            or "/." in path
+        ):
+            return None
+        return cls(
+            scheme,
+            host,
+            int(port) if colon else DEFAULT_PORTS[scheme],
+            path or ("/" if query or fragment else ""),
+            query,
+            fragment,
+            bool(colon) and int(port) != DEFAULT_PORTS[scheme],
+        )
+
+    @property
+    def raw_path(self) -> str:
+        return self._path or "/"
+
+    @property
+    def raw_path_qs(self) -> str:
+        if not self.raw_query_string:
+            return self.raw_path
+        return f"{self.raw_path}?{self.raw_query_string}"
+
+    def with_path(self, path: str):
+        """Новый путь; строка запроса и фрагмент, как и в yarl,
+        сбрасываются."""
+        port = f":{self.port}" if self.explicit_port else ""
+        return parse_url(f"{self.scheme}://{self.host}{port}{path}")
+
+    def with_fragment(self, fragment):
+        return SimpleURL(
+            self.scheme,
+            self.host,
+            self.port,
+            self._path,
+            self.raw_query_string,
+            fragment or "",
+            self.explicit_port,
+        )
+
+    def __str__(self) -> str:
+        port = f":{self.port}" if self.explicit_port else ""
+        query = f"?{self.raw_query_string}" if self.raw_query_string else ""
+        fragment = f"#{self.fragment}" if self.fragment else ""
+        return (
+            f"{self.scheme}://{self.host}{port}{self._path}{query}{fragment}"
+        )
+
+    def __repr__(self) -> str:
+        return f"SimpleURL('{self}')"
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, SimpleURL):
+            return NotImplemented
+        return str(self) == str(other)
+
+    def __hash__(self) -> int:
+        return hash(str(self))
+
+
+def parse_url(url: str):
+    """Адрес запроса: SimpleURL, если его хватает, иначе yarl.URL.
+    yarl загружается только для адресов с IDN, IPv6, userinfo,
+    процент-кодированием или символами, которые нужно экранировать."""
+    if not isinstance(url, str):
+        return url
+    result = SimpleURL.parse(url)
+    if result is not None:
+        return result
+    from yarl import URL
+
+    return URL(url)
+
+
+def resolve_url(current, location: str):
+    """Разрешает location (абсолютный, без схемы или относительный адрес)
+    относительно current."""
+    return parse_url(urllib.parse.urljoin(str(current), location))
+
+
+def origin(url) -> tuple:
+    """Схема, хост и порт - одинаковые для SimpleURL и yarl.URL."""
+    return url.scheme, url.host, url.port
@@ -0,0 +1,86 @@
+import asyncio
+import unittest
+import http_client.errors as errors
+from http_client.async_client import AsyncClient
+from http_client.server import AsyncLocalServer, LocalServer
+
+
+class TestAsyncClient(unittest.IsolatedAsyncioTestCase):
+    async def test_gather(self):
+        async with AsyncLocalServer(b"hello") as server, AsyncClient(
+            timeout=5, limit_per_host=4
+        ) as client:
+            responses = await asyncio.gather(
+                *(client.request("GET", server.url + "/") for _ in range(20))
+            )
+            self.assertEqual(
+                [r.message_body for r in responses], [b"hello"] * 20
+            )
+            self.assertLessEqual(server.connections, 4)
+            self.assertEqual(server.requests, 20)
+
+    async def test_timings(self):
+        reported = []
+        async with AsyncLocalServer() as server, AsyncClient(
+            on_timings=reported.append
+        ) as client:
+            first = await client.request("GET", server.url)
+            second = await client.request("GET", server.url)
+        self.assertEqual(reported, [first, second])
+        self.assertFalse(first.timings.reused)
+        self.assertTrue(second.timings.reused)
+        self.assertGreater(first.timings.total, 0)
+
+    async def test_post(self):
+        async with AsyncLocalServer() as server, AsyncClient() as client:
+            response = await client.request("POST", server.url, data=b"x")
+            self.assertEqual(response.status_code, 200)
+
+    async def test_timeout(self):
+        async with AsyncLocalServer(delay=1) as server, AsyncClient(
+            timeout=0.1
+        ) as client:
+            with self.assertRaises(asyncio.TimeoutError):
+                await client.request("GET", server.url)
+
+    async def test_wrong_url(self):
+        async with AsyncClient() as client:
+            with self.assertRaises(errors.UrlParsingError):
+                await client.request("GET", "www.vk.com/im")
+
+    async def test_redirect(self):
+        routes = {
+            "/": lambda h: h.send_body(200, b"index"),
+            "/redirect": lambda h: h.send_body(
+                302, b"", {"Location": f"{server.url}/"}
+            ),
+        }
+        with LocalServer(routes) as server:
+            async with AsyncClient(redirect=True, timeout=5) as client:
+                response = await client.request(
+                    "GET", server.url + "/redirect"
+                )
+            self.assertEqual(response.message_body, b"index")
+            self.assertEqual(server.connections, 1)
+
+    async def test_redirect_rules(self):
+        with LocalServer(default=lambda h: h.send_body(200, b"")) as other:
+            routes = {
+                "/away": lambda h: h.send_body(
+                    307, b"", {"Location": other.url + "/x"}
+                ),
+            }
+            with LocalServer(routes) as server:
+                async with AsyncClient(redirect=True, timeout=5) as client:
+                    await client.request(
+                        "GET",
+                        server.url + "/away",
+                        [["Authorization", "secret"]],
+                    )
+                    with self.assertRaises(errors.RedirectError):
+                        await client.request(
+                            "POST", server.url + "/away", data=iter([b"x"])
+                        )
+            self.assertIn("Authorization", server.requests[0][2])
+        self.assertEqual(len(other.requests), 1)
+        self.assertNotIn("Authorization", other.requests[0][2])
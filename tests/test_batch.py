@@ -0,0 +1,141 @@
+import os
+import tempfile
+import time
+import unittest
+from http_client.batch import (
+    BatchRunner,
+    ProcessBatchRunner,
+    parse_spec,
+    read_specs,
+    shard_of,
+)
+from http_client.resolver import default_resolver
+from http_client.server import LocalServer
+
+
+class TestBatchSpecs(unittest.TestCase):
+    def test_parse_spec(self):
+        cases = [
+            ("http://a/", {"url": "http://a/", "method": "GET"}),
+            ("head http://a/", {"url": "http://a/", "method": "HEAD"}),
+            ('{"url": "http://a/", "data": "x"}', {"method": "POST"}),
+            (
+                '{"url": "http://a/", "headers": [["A", "b"]]}',
+                {"headers": [["A", "b"]], "data": ""},
+            ),
+        ]
+        for line, expected in cases:
+            with self.subTest(line):
+                spec = parse_spec(line)
+                self.assertEqual(spec, {**spec, **expected})
+
+    def test_skipping_comments(self):
+        lines = ["http://a/\n", "\n", "  # comment\n", "http://b/"]
+        self.assertEqual(list(read_specs(lines)), ["http://a/", "http://b/"])
+
+
+class TestBatchRunner(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.routes = {
+            "/": lambda h: h.send_body(200, b"index"),
+            "/slow": lambda h: (time.sleep(0.2), h.send_body(200, b"slow")),
+        }
+
+    def run_batch(self, lines: list, **kwargs) -> tuple:
+        records = []
+        runner = BatchRunner(timeout=5, **kwargs)
+        summary = runner.run(lines, records.append)
+        runner.close()
+        return records, summary
+
+    def test_ordered_results(self):
+        with LocalServer(self.routes) as server:
+            lines = [server.url + "/slow"] + [server.url + "/"] * 9
+            records, summary = self.run_batch(lines, concurrency=4)
+            self.assertEqual([r["index"] for r in records], list(range(10)))
+            self.assertEqual(summary.total, 10)
+            self.assertEqual(summary.statuses[200], 10)
+            self.assertLessEqual(server.connections, 4)
+
+    def test_unordered_results(self):
+        with LocalServer(self.routes) as server:
+            lines = [server.url + "/slow"] + [server.url + "/"] * 3
+            records, _ = self.run_batch(lines, concurrency=2, ordered=False)
+            self.assertEqual(records[-1]["index"], 0)
+            self.assertEqual(records[-1]["length"], 4)
+
+    def test_errors_are_recorded(self):
+        lines = [
+            "not a url",
+            "GET http://a/ extra",
+            "{broken",
+            '{"method": "GET"}',
+            '{"url": 5}',
+            '{"url": "http://a/", "headers": "x"}',
+            '{"url": "http://a/", "headers": [["A"]]}',
+        ]
+        records, summary = self.run_batch(lines)
+        self.assertEqual(summary.errors, len(lines))
+        self.assertTrue(all(r["error"] for r in records))
+
+
+class TestProcessBatchRunner(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        routes = {
+            "/": lambda h: h.send_body(
+                200, str(h.server.server_address[1]).encode()
+            )
+        }
+        self.servers = [LocalServer(routes).__enter__() for _ in range(3)]
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        for server in self.servers:
+            server.__exit__(None, None, None)
+        self.directory.cleanup()
+
+    def test_sharding_by_host(self):
+        for url in ("http://a.example/x", "http://a.example/y"):
+            self.assertEqual(shard_of(url, 4)[1:], ("a.example", 0))
+        spec, host, _ = shard_of("{broken", 4)
+        self.assertEqual((spec, host), ("{broken", ""))
+
+    def test_records_bodies_and_stats(self):
+        lines = [
+            server.url + "/" for _ in range(4) for server in self.servers
+        ] + ["not a url"]
+        records = []
+        runner = ProcessBatchRunner(
+            2, concurrency=2, timeout=5, body_dir=self.directory.name
+        )
+        summary = runner.run(lines, records.append)
+        self.assertEqual([r["index"] for r in records], list(range(13)))
+        self.assertEqual((summary.total, summary.errors), (13, 1))
+        self.assertEqual(summary.statuses[200], 12)
+        for record, line in zip(records, lines):
+            if record["error"]:
+                self.assertIsNone(record["body_file"])
+                continue
+            port = line[:-1].rsplit(":", 1)[1]
+            with open(record["body_file"], "rb") as file:
+                self.assertEqual(file.read(), port.encode())
+            self.assertEqual(
+                os.path.dirname(record["body_file"]), self.directory.name
+            )
+        self.assertEqual(len(runner.workers), 2)
+        totals = sum(s.total for _, s in runner.workers.values())
+        self.assertEqual(totals, 13)
+        self.assertEqual(len(runner.report().splitlines()), 2)
+        for server in self.servers:
+            self.assertLessEqual(server.connections, 2)
+
+    def test_resolve_overrides_reach_workers(self):
+        port = self.servers[0].httpd.server_address[1]
+        default_resolver.add_override(f"fake.test:{port}:127.0.0.1")
+        self.addCleanup(default_resolver.overrides.clear)
+        records = []
+        runner = ProcessBatchRunner(2, timeout=5)
+        runner.run([f"http://fake.test:{port}/"] * 2, records.append)
+        self.assertEqual([r["status"] for r in records], [200, 200])
@@ -0,0 +1,71 @@
+import random
+import unittest
+from http_client.bench import Benchmark
+from http_client.histogram import Histogram
+from http_client.server import LocalServer
+
+
+class TestHistogram(unittest.TestCase):
+    def test_percentiles_precision(self):
+        histogram = Histogram(significant_digits=2)
+        values = sorted(random.randint(1, 10 ** 7) for _ in range(10000))
+        for value in values:
+            histogram.record(value)
+        for percent in (50, 90, 99, 100):
+            with self.subTest(percent):
+                expected = values[int(percent / 100 * len(values)) - 1]
+                actual = histogram.percentile(percent)
+                self.assertLessEqual(abs(actual - expected) / expected, 0.01)
+        self.assertEqual(histogram.max, values[-1])
+        self.assertEqual(histogram.min, values[0])
+
+    def test_constant_memory(self):
+        histogram = Histogram(highest_value=10 ** 6)
+        size = len(histogram.counts)
+        for value in range(0, 2 * 10 ** 6, 7):
+            histogram.record(value)
+        self.assertEqual(len(histogram.counts), size)
+        self.assertEqual(histogram.max, 10 ** 6)
+
+    def test_merge(self):
+        first, second = Histogram(), Histogram()
+        first.record(10)
+        second.record(1000, count=3)
+        first.merge(second)
+        self.assertEqual(first.total, 4)
+        self.assertEqual(first.percentile(50), 1000)
+        self.assertEqual(first.min, 10)
+
+
+class TestBenchmark(unittest.TestCase):
+    def cmd_args(self, url: str) -> tuple:
+        return (url, "GET", "", None, False, [], False, "", 5, False, None)
+
+    def test_fixed_number_of_requests(self):
+        with LocalServer(default=lambda h: h.send_body(200, b"OK")) as server:
+            report = Benchmark(
+                self.cmd_args(server.url + "/"), requests=50, concurrency=4
+            ).run()
+            self.assertLessEqual(server.connections, 4)
+        self.assertEqual(report.requests, 50)
+        self.assertEqual(report.statuses[200], 50)
+        self.assertEqual(report.received, 100)
+        self.assertIn("p99", str(report))
+
+    def test_rate_and_duration(self):
+        with LocalServer(default=lambda h: h.send_body(404, b"")) as server:
+            report = Benchmark(
+                self.cmd_args(server.url + "/"),
+                duration=0.5,
+                concurrency=2,
+                rate=40,
+            ).run()
+        self.assertAlmostEqual(report.requests, 20, delta=3)
+        self.assertEqual(set(report.statuses), {404})
+
+    def test_errors_are_counted(self):
+        with LocalServer() as server:
+            url = server.url
+        report = Benchmark(self.cmd_args(url), requests=5).run()
+        self.assertEqual(report.requests, 5)
+        self.assertEqual(report.errors["ConnectionRefusedError"], 5)
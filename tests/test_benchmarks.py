@@ -0,0 +1,658 @@
+import asyncio
+import collections
+import gzip
+import io
+import os
+import re
+import socket
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import timeit
+import unittest
+from http_client.async_client import AsyncClient
+from http_client.batch import ProcessBatchRunner
+from http_client.cache import ResponseCache
+from http_client.client import Client
+from http_client.download import SegmentedDownload
+from http_client.models import Request
+from http_client.reader import ResponseReader
+from http_client.server import AsyncLocalServer, LocalServer
+from http_client.pool import ConnectionPool
+from http_client.tls import TLSContext
+from yarl import URL
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+benchmark = unittest.skipUnless(
+    os.environ.get("HTTP_CLIENT_BENCHMARKS"),
+    "set HTTP_CLIENT_BENCHMARKS=1 to run benchmarks",
+)
+
+MEASURE_RSS = """
+import atexit, resource, runpy, sys
+def report():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        rss //= 1024
+    sys.stderr.write(f"\\nmaxrss_kb={rss}\\n")
+atexit.register(report)
+sys.argv = ["http_client"] + sys.argv[1:]
+runpy.run_module("http_client", run_name="__main__")
+"""
+
+
+def send_generated_body(handler, size: int):
+    block = os.urandom(64 * 1024)
+    handler.send_response(200)
+    handler.send_header("Content-Length", str(size))
+    handler.end_headers()
+    while size > 0:
+        handler.wfile.write(block[:size])
+        size -= len(block)
+
+
+@benchmark
+@unittest.skipIf(resource is None, "resource module is unavailable")
+class TestStreamingDownloadMemory(unittest.TestCase):
+    BODY_SIZE = 128 * 1024 * 1024
+    MAX_RSS_GROWTH_KB = 32 * 1024
+
+    def download(self, url: str, output: str) -> int:
+        result = subprocess.run(
+            [sys.executable, "-c", MEASURE_RSS, "-o", output, url],
+            stderr=subprocess.PIPE,
+            check=True,
+            cwd=os.path.dirname(os.path.dirname(__file__)),
+        )
+        last_line = result.stderr.decode().strip().splitlines()[-1]
+        return int(last_line.split("=")[1])
+
+    def test_peak_rss_is_bounded(self):
+        routes = {
+            "/small": lambda h: send_generated_body(h, 1024),
+            "/large": lambda h: send_generated_body(h, self.BODY_SIZE),
+        }
+        with LocalServer(routes) as server, tempfile.TemporaryDirectory() as d:
+            output = os.path.join(d, "output")
+            baseline = self.download(server.url + "/small", output)
+            peak = self.download(server.url + "/large", output)
+            self.assertEqual(os.path.getsize(output), self.BODY_SIZE)
+        self.assertLess(peak - baseline, self.MAX_RSS_GROWTH_KB)
+
+
+@benchmark
+class TestReceiveThroughput(unittest.TestCase):
+    BODY_SIZE = 64 * 1024 * 1024
+    ROUNDS = 3
+
+    @staticmethod
+    def receive_with_recv_loop(sock: socket.socket) -> bytes:
+        """Прежний способ приёма: recv по 1 КиБ в BytesIO."""
+        raw_response = io.BytesIO()
+        head_end, length = -1, None
+        while length is None or raw_response.tell() < head_end + length:
+            data = sock.recv(1024)
+            if not data:
+                break
+            raw_response.write(data)
+            if length is None:
+                head_end = raw_response.getvalue().find(b"\r\n\r\n") + 4
+                if head_end > 3:
+                    length = TestReceiveThroughput.BODY_SIZE
+        return raw_response.getvalue()[head_end:]
+
+    @staticmethod
+    def receive_with_reader(sock: socket.socket) -> bytes:
+        reader = ResponseReader(sock)
+        reader.read_head()
+        return reader.read_exactly(TestReceiveThroughput.BODY_SIZE)
+
+    def measure(self, server: LocalServer, receive) -> float:
+        best = float("inf")
+        host, port = server.httpd.server_address
+        for _ in range(self.ROUNDS):
+            with socket.create_connection((host, port)) as sock:
+                sock.sendall(b"GET /large HTTP/1.1\r\nHost: x\r\n\r\n")
+                start = time.perf_counter()
+                body = receive(sock)
+                best = min(best, time.perf_counter() - start)
+            self.assertEqual(len(body), self.BODY_SIZE)
+        return self.BODY_SIZE / best
+
+    def test_recv_into_is_faster(self):
+        routes = {"/large": lambda h: send_generated_body(h, self.BODY_SIZE)}
+        with LocalServer(routes) as server:
+            legacy = self.measure(server, self.receive_with_recv_loop)
+            current = self.measure(server, self.receive_with_reader)
+        report = (
+            f"recv loop: {legacy / 2 ** 20:.0f} MiB/s, "
+            f"recv_into: {current / 2 ** 20:.0f} MiB/s"
+        )
+        self.assertGreater(current, legacy, report)
+
+
+@benchmark
+class TestAsyncClientScaling(unittest.TestCase):
+    REQUESTS = 64
+    DELAY = 0.01
+
+    async def requests_per_second(self, concurrency: int) -> float:
+        async with AsyncLocalServer(delay=self.DELAY) as server:
+            async with AsyncClient(limit_per_host=concurrency) as client:
+                start = time.perf_counter()
+                await asyncio.gather(
+                    *(
+                        client.request("GET", server.url)
+                        for _ in range(self.REQUESTS)
+                    )
+                )
+                return self.REQUESTS / (time.perf_counter() - start)
+
+    def test_throughput_scales_with_concurrency(self):
+        results = {
+            concurrency: asyncio.run(self.requests_per_second(concurrency))
+            for concurrency in (1, 4, 16)
+        }
+        report = ", ".join(
+            f"{c}: {rps:.0f} req/s" for c, rps in results.items()
+        )
+        self.assertGreater(results[4], results[1] * 2, report)
+        self.assertGreater(results[16], results[4] * 2, report)
+
+
+@benchmark
+class TestTLSHandshake(unittest.TestCase):
+    CERTFILE = os.path.join(os.path.dirname(__file__), "localhost.pem")
+    CONNECTIONS = 30
+
+    def handshake_fresh(self, port: int) -> ssl.SSLSocket:
+        """Прежний способ: новый SSLContext и полное рукопожатие на каждое
+        соединение."""
+        context = ssl.create_default_context(cafile=self.CERTFILE)
+        sock = socket.create_connection(("127.0.0.1", port))
+        return context.wrap_socket(sock, server_hostname="localhost")
+
+    def measure(self, port: int, handshake, after=None) -> float:
+        total = 0.0
+        for _ in range(self.CONNECTIONS):
+            start = time.perf_counter()
+            sock = handshake(port)
+            total += time.perf_counter() - start
+            with sock:
+                sock.sendall(b"GET / HTTP/1.1\r\nHost: localhost\r\n\r\n")
+                sock.recv(1024)
+                if after is not None:
+                    after(sock, port)
+        return total / self.CONNECTIONS
+
+    def test_resumed_handshake_is_faster(self):
+        tls = TLSContext(cafile=self.CERTFILE)
+        resumed = []
+
+        def handshake_shared(port: int) -> ssl.SSLSocket:
+            sock = socket.create_connection(("127.0.0.1", port))
+            return tls.wrap_socket(sock, "localhost", port)
+
+        def after_exchange(sock: ssl.SSLSocket, port: int):
+            resumed.append(sock.session_reused)
+            tls.save_session(sock, "localhost", port)
+
+        server = LocalServer(
+            default=lambda h: h.send_body(200, b"OK"), certfile=self.CERTFILE
+        )
+        with server:
+            port = server.httpd.server_address[1]
+            legacy = self.measure(port, self.handshake_fresh)
+            current = self.measure(port, handshake_shared, after_exchange)
+        report = (
+            f"new context + full handshake: {legacy * 1000:.2f} ms, "
+            f"shared context + resumption: {current * 1000:.2f} ms"
+        )
+        self.assertEqual(resumed.count(False), 1)
+        self.assertLess(current, legacy, report)
+
+
+@benchmark
+class TestHeaderParsing(unittest.TestCase):
+    HEADER_SETS = {
+        "json api": (
+            b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+            b"Content-Length: 2\r\nDate: Sat, 18 Oct 2026 10:00:00 GMT\r\n"
+            b"Connection: keep-alive\r\n\r\n{}"
+        ),
+        "static file": (
+            b"HTTP/1.1 200 OK\r\nServer: nginx/1.25.3\r\n"
+            b"Date: Sat, 18 Oct 2026 10:00:00 GMT\r\n"
+            b"Content-Type: image/png\r\nContent-Length: 2\r\n"
+            b"Last-Modified: Mon, 06 Jan 2025 12:00:00 GMT\r\n"
+            b"Connection: keep-alive\r\nETag: \"677bc6d0-3c4a\"\r\n"
+            b"Expires: Sun, 18 Oct 2026 10:00:00 GMT\r\n"
+            b"Cache-Control: max-age=86400\r\nAccept-Ranges: bytes\r\n"
+            b"\r\nok"
+        ),
+        "html page": (
+            b"HTTP/1.1 200 OK\r\nServer: cloudflare\r\n"
+            b"Date: Sat, 18 Oct 2026 10:00:00 GMT\r\n"
+            b"Content-Type: text/html; charset=utf-8\r\n"
+            b"Content-Length: 2\r\nConnection: keep-alive\r\n"
+            b"Vary: Accept-Encoding\r\n"
+            b"Cache-Control: private, max-age=0, must-revalidate\r\n"
+            b"Set-Cookie: sessionid=8f14e45fceea167a; Path=/; HttpOnly\r\n"
+            b"Set-Cookie: csrftoken=c9f0f895fb98ab91; Path=/; Secure\r\n"
+            b"Set-Cookie: __cf_bm=45c48cce2e2d7fbd; Path=/; "
+            b"Expires=Sat, 18 Oct 2026 10:30:00 GMT; Domain=.example.com\r\n"
+            b"Strict-Transport-Security: max-age=31536000\r\n"
+            b"X-Frame-Options: SAMEORIGIN\r\n"
+            b"X-Content-Type-Options: nosniff\r\n"
+            b"Referrer-Policy: strict-origin-when-cross-origin\r\n"
+            b"Content-Security-Policy: default-src 'self'; img-src *\r\n"
+            b"CF-Cache-Status: DYNAMIC\r\nCF-RAY: 8d2c3b1a9f1e2d3c-AMS\r\n"
+            b"Alt-Svc: h3=\":443\"; ma=86400\r\n\r\nok"
+        ),
+    }
+
+    LOOKUPS = ("transfer-encoding", "content-length", "connection")
+    NUMBER = 2000
+
+    @classmethod
+    def read_line_by_line(cls, reader: ResponseReader):
+        """Прежний разбор: стартовая строка - регулярным выражением, затем
+        по строке на заголовок с отдельным decode, split и lower."""
+        re.search(
+            r"(?P<proto>HTTP/1\.[01]) (?P<code>\d{3})(?P<phrase>[ \w]*)",
+            bytes(reader.read_line()).rstrip(b"\r\n").decode(),
+        ).groupdict()
+        headers = {}
+        line = str(reader.read_line(), "ISO-8859-1").rstrip("\r\n")
+        while line:
+            name, value = line.split(":", 1)
+            headers[name.lower()] = value
+            line = str(reader.read_line(), "ISO-8859-1").rstrip("\r\n")
+        for name in cls.LOOKUPS:
+            headers.get(name)
+
+    @classmethod
+    def read_block(cls, reader: ResponseReader):
+        headers = reader.read_head()[3]
+        for name in cls.LOOKUPS:
+            headers.get(name)
+
+    def measure(self, read_head, message: bytes) -> float:
+        runs = timeit.repeat(
+            lambda: read_head(ResponseReader(io.BytesIO(message))),
+            number=self.NUMBER,
+            repeat=5,
+        )
+        return min(runs) / self.NUMBER
+
+    def test_parsing_is_faster(self):
+        lines, totals = [], [0.0, 0.0]
+        for name, message in self.HEADER_SETS.items():
+            legacy = self.measure(self.read_line_by_line, message)
+            current = self.measure(self.read_block, message)
+            totals[0] += legacy
+            totals[1] += current
+            lines.append(
+                f"{name}: {legacy * 10 ** 6:.1f} -> "
+                f"{current * 10 ** 6:.1f} us"
+            )
+        report = ", ".join(lines)
+        self.assertLess(totals[1], totals[0], report)
+
+
+@benchmark
+class TestRequestSerialization(unittest.TestCase):
+    NUMBER = 5000
+
+    @staticmethod
+    def build_head(request: Request) -> bytes:
+        """Прежняя сборка: стартовая строка и каждый заголовок через
+        f-строку и отдельное кодирование при каждой отправке."""
+        result = bytearray(
+            f"{request.method} {request.url.raw_path_qs} HTTP/1.1\r\n",
+            "ISO-8859-1",
+        )
+        for header, value in request.headers.items():
+            result += bytes(f"{header}: {value}\r\n", "ISO-8859-1")
+        result += b"\r\n"
+        return bytes(result)
+
+    def test_cached_head_is_faster(self):
+        request = Request(
+            "POST",
+            URL("http://example.com/api/items?page=1"),
+            [["Authorization", "Bearer 0123456789abcdef"], ["X-Trace", "1"]],
+            b"{}",
+            "sessionid=8f14e45fceea167a",
+        )
+        self.assertEqual(request.head, self.build_head(request))
+        legacy = min(
+            timeit.repeat(
+                lambda: self.build_head(request), number=self.NUMBER, repeat=5
+            )
+        )
+        current = min(
+            timeit.repeat(
+                lambda: request.head, number=self.NUMBER, repeat=5
+            )
+        )
+        report = (
+            f"request head: {legacy / self.NUMBER * 10 ** 6:.2f} -> "
+            f"{current / self.NUMBER * 10 ** 6:.2f} us"
+        )
+        self.assertLess(current, legacy, report)
+
+
+class DelayedRelay:
+    """TCP-ретранслятор, задерживающий данные в каждом направлении на
+    delay секунд без ограничения пропускной способности: так на
+    localhost имитируется канал с большим временем кругового обхода."""
+
+    def __init__(self, upstream: tuple, delay: float):
+        self.upstream = upstream
+        self.delay = delay
+        self.listener = socket.create_server(("127.0.0.1", 0))
+        self.port = self.listener.getsockname()[1]
+        threading.Thread(target=self.accept, daemon=True).start()
+
+    def accept(self):
+        while True:
+            try:
+                client, _ = self.listener.accept()
+            except OSError:
+                return
+            server = socket.create_connection(self.upstream)
+            for sock in (client, server):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.pipe(client, server)
+            self.pipe(server, client)
+
+    def pipe(self, source: socket.socket, target: socket.socket):
+        queue = collections.deque()
+        ready = threading.Condition()
+
+        def receive():
+            while True:
+                try:
+                    data = source.recv(65536)
+                except OSError:
+                    data = b""
+                with ready:
+                    queue.append((time.monotonic() + self.delay, data))
+                    ready.notify()
+                if not data:
+                    return
+
+        def send():
+            while True:
+                with ready:
+                    ready.wait_for(lambda: queue)
+                    due, data = queue.popleft()
+                time.sleep(max(due - time.monotonic(), 0))
+                if not data:
+                    target.close()
+                    return
+                try:
+                    target.sendall(data)
+                except OSError:
+                    return
+
+        threading.Thread(target=receive, daemon=True).start()
+        threading.Thread(target=send, daemon=True).start()
+
+    def close(self):
+        self.listener.close()
+
+
+@benchmark
+class TestPipelining(unittest.TestCase):
+    REQUESTS = 100
+    DELAY = 0.002
+
+    def test_pipelining_is_faster(self):
+        paths = [f"/item/{i}" for i in range(self.REQUESTS)]
+        server = LocalServer(default=lambda h: h.send_body(200, b"OK"))
+        with server, ConnectionPool() as pool:
+            relay = DelayedRelay(server.httpd.server_address, self.DELAY)
+            client = Client(
+                f"http://127.0.0.1:{relay.port}/",
+                "GET",
+                "",
+                None,
+                False,
+                [],
+                False,
+                "",
+                5,
+                False,
+                None,
+                pool=pool,
+            )
+            start = time.perf_counter()
+            for path in paths:
+                client.request.url = client.request.url.with_path(path)
+                client.send_request()
+            sequential = time.perf_counter() - start
+            start = time.perf_counter()
+            responses = client.send_pipelined(paths, depth=16)
+            pipelined = time.perf_counter() - start
+            relay.close()
+        report = (
+            f"{self.REQUESTS} requests over {self.DELAY * 2000:.0f} ms "
+            f"RTT: sequential {sequential:.3f} s, "
+            f"pipelined {pipelined:.3f} s"
+        )
+        self.assertEqual(len(responses), self.REQUESTS)
+        self.assertEqual(server.connections, 1)
+        self.assertLess(pipelined, sequential / 2, report)
+
+
+@benchmark
+class TestResponseCacheHits(unittest.TestCase):
+    REQUESTS = 200
+
+    def test_cache_hits_are_faster(self):
+        body = os.urandom(256 * 1024)
+
+        def route(handler):
+            handler.send_body(200, body, {"Cache-Control": "max-age=60"})
+
+        server = LocalServer(default=route)
+        with tempfile.TemporaryDirectory() as directory:
+            with server, ConnectionPool() as pool:
+                timings = []
+                for cache in (None, ResponseCache(directory)):
+                    client = Client(
+                        server.url + "/",
+                        "GET",
+                        "",
+                        None,
+                        False,
+                        [],
+                        False,
+                        "",
+                        5,
+                        False,
+                        None,
+                        pool=pool,
+                        cache=cache,
+                    )
+                    start = time.perf_counter()
+                    for _ in range(self.REQUESTS):
+                        response = client.send_request()
+                        self.assertEqual(len(response.message_body), len(body))
+                    timings.append(time.perf_counter() - start)
+        report = (
+            f"{self.REQUESTS} x 256 KiB: network {timings[0]:.3f} s, "
+            f"disk cache {timings[1]:.3f} s"
+        )
+        self.assertEqual(cache.stats.hits, self.REQUESTS - 1)
+        self.assertLess(timings[1], timings[0] / 2, report)
+
+
+class ThrottledWriter:
+    """Ограничивает скорость записи в одно соединение: после каждых
+    block байт - пауза delay секунд."""
+
+    def __init__(self, wfile, block: int, delay: float):
+        self.wfile = wfile
+        self.block = block
+        self.delay = delay
+
+    def write(self, data: bytes):
+        view = memoryview(data)
+        for start in range(0, len(view), self.block):
+            self.wfile.write(view[start:start + self.block])
+            time.sleep(self.delay)
+
+    def flush(self):
+        self.wfile.flush()
+
+
+@benchmark
+class TestSegmentedDownload(unittest.TestCase):
+    SIZE = 8 * 1024 * 1024
+
+    def test_segments_are_faster(self):
+        data = os.urandom(self.SIZE)
+
+        def route(handler):
+            handler.wfile = ThrottledWriter(handler.wfile, 256 * 1024, 0.01)
+            handler.send_ranged(data)
+
+        results = {}
+        with LocalServer(default=route) as server:
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "file.bin")
+                for segments in (1, 4):
+                    download = SegmentedDownload(
+                        server.url + "/", path, segments, 5
+                    )
+                    start = time.perf_counter()
+                    download.run()
+                    results[segments] = time.perf_counter() - start
+                    with open(path, "rb") as file:
+                        self.assertEqual(file.read(), data)
+        report = (
+            f"8 MiB at ~25 MiB/s per connection: one stream "
+            f"{results[1]:.3f} s, 4 segments {results[4]:.3f} s"
+        )
+        self.assertLess(results[4], results[1] / 2, report)
+
+
+LAZY_MODULES = (
+    "yarl",
+    "ssl",
+    "asyncio",
+    "concurrent.futures",
+    "http.server",
+    "email.utils",
+    "http_client.cache",
+    "http_client.batch",
+)
+IMPORT_SCRIPT = (
+    "import sys, http_client.__main__\n"
+    "print(','.join(m for m in {modules!r} if m in sys.modules))"
+)
+
+
+def measure_import() -> tuple:
+    """Время импорта точки входа по -X importtime (мс) и загруженные при
+    этом модули из LAZY_MODULES."""
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            IMPORT_SCRIPT.format(modules=LAZY_MODULES),
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        check=True,
+    )
+    for line in result.stderr.decode().splitlines():
+        if line.endswith("| http_client.__main__"):
+            cumulative = int(line.split("|")[1]) / 1000
+            return cumulative, result.stdout.decode().strip()
+    raise AssertionError("http_client.__main__ is missing in importtime")
+
+
+class TestLazyImports(unittest.TestCase):
+    """Тяжёлые модули должны загружаться только в тех режимах, где они
+    нужны."""
+
+    def test_entry_point_skips_heavy_modules(self):
+        self.assertEqual(measure_import()[1], "")
+
+
+@benchmark
+class TestStartupTime(unittest.TestCase):
+    MAX_IMPORT_MS = 100
+
+    def test_entry_point_imports_quickly(self):
+        import_ms = min(measure_import()[0] for _ in range(5))
+        report = f"import http_client.__main__: {import_ms:.1f} ms"
+        self.assertLess(import_ms, self.MAX_IMPORT_MS, report)
+
+
+@benchmark
+@unittest.skipIf((os.cpu_count() or 1) < 4, "needs at least 4 CPU cores")
+class TestProcessFanOut(unittest.TestCase):
+    """Раскодирование gzip-ответов из множества мелких чанков упирается в
+    одно ядро; процессы, разделённые по хостам, масштабируют его."""
+
+    HOSTS = 4
+    REQUESTS = 200
+
+    @staticmethod
+    def send_chunked_gzip(handler, body: bytes):
+        handler.send_response(200)
+        handler.send_header("Content-Encoding", "gzip")
+        handler.send_header("Transfer-Encoding", "chunked")
+        handler.end_headers()
+        for start in range(0, len(body), 256):
+            chunk = body[start:start + 256]
+            handler.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+        handler.wfile.write(b"0\r\n\r\n")
+
+    def run_batch(self, processes: int, lines: list) -> float:
+        runner = ProcessBatchRunner(processes, concurrency=2, timeout=30)
+        start = time.perf_counter()
+        summary = runner.run(lines, lambda record: None)
+        elapsed = time.perf_counter() - start
+        self.assertEqual(summary.statuses[200], len(lines))
+        return elapsed
+
+    def test_processes_are_faster(self):
+        body = gzip.compress(os.urandom(64) * 16 * 1024, compresslevel=1)
+        servers = [
+            LocalServer(default=lambda h: self.send_chunked_gzip(h, body))
+            for _ in range(self.HOSTS)
+        ]
+        for server in servers:
+            server.__enter__()
+        try:
+            lines = [
+                f"{server.url}/{i}"
+                for i in range(self.REQUESTS // self.HOSTS)
+                for server in servers
+            ]
+            single = self.run_batch(1, lines)
+            parallel = self.run_batch(self.HOSTS, lines)
+        finally:
+            for server in servers:
+                server.__exit__(None, None, None)
+        report = (
+            f"{self.REQUESTS} chunked gzip responses from {self.HOSTS} "
+            f"hosts: 1 process {single:.3f} s, {self.HOSTS} processes "
+            f"{parallel:.3f} s"
+        )
+        self.assertLess(parallel, single / 1.5, report)
@@ -0,0 +1,143 @@
+import gzip
+import tempfile
+import unittest
+from http_client.cache import ResponseCache, freshness_lifetime
+from http_client.client import Client
+from http_client.headers import Headers
+from http_client.pool import ConnectionPool
+from http_client.server import LocalServer
+
+
+class TestFreshness(unittest.TestCase):
+    def test_lifetime(self):
+        cases = {
+            "max-age": ({"Cache-Control": "public, max-age=60"}, 60),
+            "no-cache": ({"Cache-Control": "no-cache, max-age=60"}, 0),
+            "expires": (
+                {
+                    "Date": "Sat, 18 Oct 2026 10:00:00 GMT",
+                    "Expires": "Sat, 18 Oct 2026 10:05:00 GMT",
+                },
+                300,
+            ),
+            "bad expires": ({"Expires": "0"}, 0),
+            "nothing": ({}, 0),
+        }
+        for name, (headers, expected) in cases.items():
+            with self.subTest(name):
+                self.assertEqual(
+                    freshness_lifetime(Headers(headers)), expected
+                )
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.routes = {
+            "/fresh": lambda h: h.send_body(
+                200, b"fresh", {"Cache-Control": "max-age=60"}
+            ),
+            "/etag": self.send_etag,
+            "/no-store": lambda h: h.send_body(
+                200, b"secret", {"Cache-Control": "no-store"}
+            ),
+            "/gzip": lambda h: h.send_body(
+                200,
+                gzip.compress(b"compressed" * 100),
+                {"Cache-Control": "max-age=60", "Content-Encoding": "gzip"},
+            ),
+        }
+        self.server = LocalServer(self.routes).__enter__()
+        self.pool = ConnectionPool()
+
+    def tearDown(self) -> None:
+        self.pool.close()
+        self.server.__exit__(None, None, None)
+
+    @staticmethod
+    def send_etag(handler):
+        if handler.headers.get("If-None-Match") == '"v1"':
+            handler.send_response(304)
+            handler.send_header("ETag", '"v1"')
+            handler.send_header("Content-Length", "0")
+            handler.end_headers()
+            return
+        handler.send_body(
+            200, b"tagged", {"ETag": '"v1"', "Cache-Control": "no-cache"}
+        )
+
+    def fetch(self, cache, path, method="GET", stream=False):
+        client = Client(
+            self.server.url + path,
+            method,
+            "",
+            None,
+            False,
+            [],
+            False,
+            "",
+            5,
+            False,
+            None,
+            pool=self.pool,
+            cache=cache,
+        )
+        return client.send_request(stream)
+
+    def test_fresh_response_is_served_from_memory(self):
+        cache = ResponseCache()
+        first = self.fetch(cache, "/fresh")
+        second = self.fetch(cache, "/fresh")
+        self.assertFalse(first.from_cache)
+        self.assertTrue(second.from_cache)
+        self.assertEqual(second.message_body, b"fresh")
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual((cache.stats.hits, cache.stats.misses), (1, 1))
+
+    def test_revalidation_with_etag(self):
+        cache = ResponseCache()
+        self.fetch(cache, "/etag")
+        response = self.fetch(cache, "/etag")
+        self.assertTrue(response.from_cache)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.message_body, b"tagged")
+        self.assertEqual(cache.stats.revalidated, 1)
+        self.assertEqual(self.server.requests[1][2]["If-None-Match"], '"v1"')
+
+    def test_no_store_and_unsafe_methods(self):
+        cache = ResponseCache()
+        self.fetch(cache, "/no-store")
+        self.assertFalse(self.fetch(cache, "/no-store").from_cache)
+        self.fetch(cache, "/fresh")
+        self.fetch(cache, "/fresh", method="POST")
+        self.assertFalse(self.fetch(cache, "/fresh").from_cache)
+        self.assertEqual(cache.stats.hits, 0)
+
+    def test_disk_store_survives_restart(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ResponseCache(directory)
+            response = self.fetch(cache, "/gzip", stream=True)
+            self.assertEqual(cache.stats.stored, 0)
+            body = b"".join(response.iter_body())
+            self.assertEqual(body, b"compressed" * 100)
+            self.assertEqual(cache.stats.stored, 1)
+
+            cache = ResponseCache(directory)
+            response = self.fetch(cache, "/gzip")
+            self.assertTrue(response.from_cache)
+            self.assertIsInstance(response._message_body, memoryview)
+            self.assertEqual(response.message_body, b"compressed" * 100)
+            self.assertEqual(len(self.server.requests), 1)
+
+    def test_interrupted_body_is_not_stored(self):
+        cache = ResponseCache()
+        response = self.fetch(cache, "/fresh", stream=True)
+        response.close()
+        self.assertFalse(self.fetch(cache, "/fresh").from_cache)
+
+    def test_lru_eviction(self):
+        cache = ResponseCache(max_entries=1)
+        self.fetch(cache, "/fresh")
+        self.fetch(cache, "/gzip")
+        self.assertFalse(self.fetch(cache, "/fresh").from_cache)
+        self.assertEqual(len(self.server.requests), 3)
@@ -1,11 +1,19 @@
 import unittest
 import unittest.mock as mock
 from http_client.client import Client
-from http_client.models import Request, Response
+from http_client.cookies import CookieJar
+from http_client.headers import Headers
+from http_client.models import PreparedRequest, Request, Response
 import http_client.errors as errors
 import warnings
 import io
+import os
+import socket
+import tempfile
+import threading
 from yarl import URL
+from http_client.pool import ConnectionPool
+from http_client.server import LocalServer
 
 
 class TestResponseMethods(unittest.TestCase):
@@ -39,8 +47,8 @@ class TestResponseMethods(unittest.TestCase):
                     if header == "":
                         continue
                     name, value = header.split(":")
-                    expected[name.lower()] = value
-                self.assertDictEqual(actual, expected)
+                    expected[name.strip()] = value.strip()
+                self.assertEqual(actual, expected)
 
     def test_getting_status(self):
         cases = ["HTTP/1.1 100 OK", "HTTP/1.0 404", "HTTP/1.1 500 oooK"]
@@ -57,6 +65,8 @@ class TestResponseMethods(unittest.TestCase):
             b"Content-Length: 3\r\n\r\n123",
             b"Empty: body\r\n\r\n",
             b"Content-Length: 3\r\nsecond:header\r\n\r\n123",
+            b"Content-Length: 2\r\nContent-Length: 2\r\n\r\n12",
+            b"Content-Length: 2, 2\r\n\r\n12",
         ]
         for test_case in cases:
             with self.subTest(case=test_case):
@@ -67,6 +77,52 @@ class TestResponseMethods(unittest.TestCase):
                 expected_body = test_case[test_case.find(b"\r\n\r\n") + 4:]
                 self.assertEqual(actual_body, expected_body)
 
+    def test_parsing_chunked_body(self):
+        starting_line = (
+            b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n"
+        )
+        cases = [
+            (b"3\r\n123\r\n0\r\n\r\n", b"123"),
+            (b"2;ext=1\r\nab\r\n1\r\nc\r\n0\r\nTrailer: x\r\n\r\n", b"abc"),
+            (b"0\r\n\r\n", b""),
+        ]
+        for test_case, expected_body in cases:
+            with self.subTest(case=test_case):
+                response_message = io.BytesIO(starting_line + test_case)
+                actual_body = Response.from_bytes(
+                    response_message
+                ).message_body
+                self.assertEqual(actual_body, expected_body)
+
+    def test_truncated_body(self):
+        cases = [
+            b"HTTP/1.1 200 OK\r\nContent-Length: 10\r\n\r\n123",
+            b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n5\r\n1",
+            b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\nzz\r\n",
+            b"HTTP/1.1 200 OK\r\nContent-Length: abc\r\n\r\n123",
+            b"HTTP/1.1 200 OK\r\nContent-Length: -1\r\n\r\n123",
+            b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n"
+            b"Content-Length: 3\r\n\r\n123",
+        ]
+        for test_case in cases:
+            with self.subTest(case=test_case), self.assertRaises(
+                errors.IncompleteResponseError
+            ):
+                Response.from_bytes(io.BytesIO(test_case))
+
+    def test_parsing_byte_by_byte(self):
+        class Trickle(io.BytesIO):
+            def readinto(self, buffer):
+                return super().readinto(buffer[:1])
+
+        message = (
+            b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n"
+            b"Server: test\r\n\r\n4\r\nbody\r\n0\r\n\r\n"
+        )
+        response = Response.from_bytes(Trickle(message))
+        self.assertEqual(response.headers["server"], "test")
+        self.assertEqual(response.message_body, b"body")
+
 
 class TestRequestMethods(unittest.TestCase):
     def test_adding_wrong_headers(self):
@@ -111,6 +167,40 @@ class TestRequestMethods(unittest.TestCase):
                 expected = f"{method} {path} HTTP/1.1\r\n".encode()
                 self.assertTrue(actual.startswith(expected))
 
+    def test_prepared_head_is_cached(self):
+        request = Request("POST", URL("http://vk.com/a"), [], b"data", "")
+        head = request.head
+        self.assertIs(request.head, head)
+        self.assertEqual(bytes(request), head + b"data")
+
+        request.url = URL("http://vk.com/b?q=1")
+        self.assertTrue(request.head.startswith(b"POST /b?q=1 HTTP/1.1\r\n"))
+        self.assertEqual(request.head[-2:], b"\r\n")
+        self.assertEqual(
+            request.head.split(b"\r\n", 1)[1], head.split(b"\r\n", 1)[1]
+        )
+
+        request.headers["Host"] = "m.vk.com"
+        self.assertIn(b"\r\nHost: m.vk.com\r\n", request.head)
+
+    def test_scatter_send(self):
+        prepared = PreparedRequest(
+            "PUT", URL("http://x/"), Headers({"Host": "x"})
+        )
+        body = os.urandom(1024 * 1024)
+        left, right = socket.socketpair()
+        with left, right:
+            sender = threading.Thread(
+                target=prepared.send, args=(left, body)
+            )
+            sender.start()
+            expected = prepared.head + body
+            received = bytearray()
+            while len(received) < len(expected):
+                received += right.recv(65536)
+            sender.join()
+        self.assertEqual(bytes(received), expected)
+
 
 class TestClientEfficiency(unittest.TestCase):
     def setUp(self) -> None:
@@ -140,17 +230,19 @@ class TestClientEfficiency(unittest.TestCase):
             ).request.message_body
             self.assertEqual(actual_user_data, b"test")
 
-        with open("test_file.txt", "bw") as test_file:
-            test_file.write(b"test")
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "test_file.txt")
+            with open(path, "bw") as test_file:
+                test_file.write(b"test")
 
-        with mock.patch(
-            "http_client.client.Client.extract_input_data",
-            return_value=open("test_file.txt", "br"),
-        ), self.subTest("Return value - FileIO"):
-            actual_user_data = Client(
-                *self.default_args.values()
-            ).request.message_body
-            self.assertEqual(actual_user_data, b"test")
+            with open(path, "br") as test_file, mock.patch(
+                "http_client.client.Client.extract_input_data",
+                return_value=test_file,
+            ), self.subTest("Return value - FileIO"):
+                actual_user_data = Client(
+                    *self.default_args.values()
+                ).request.message_body
+                self.assertEqual(actual_user_data, b"test")
 
     def test_http_methods(self):
         cases = [
@@ -283,5 +375,302 @@ class TestClientNetworkInteraction(unittest.TestCase):
                 self.assertEqual(actual_phrase, "OK")
 
 
+class LocalServerTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.default_args = {
+            "url": "",
+            "method": "GET",
+            "data": "",
+            "upload": "",
+            "include": False,
+            "headers": [],
+            "verbose": False,
+            "agent": "",
+            "timeout": 5,
+            "redirect": False,
+            "cookies": None,
+        }
+        self.routes = {
+            "/": lambda h: h.send_body(200, b"index"),
+            "/close": lambda h: h.send_body(
+                200, b"bye", {"Connection": "close"}
+            ),
+            "/redirect": lambda h: h.send_body(
+                302, b"", {"Location": f"{self.server.url}/"}
+            ),
+            "/chunked": self.send_chunked,
+        }
+
+    @staticmethod
+    def send_chunked(handler):
+        handler.send_response(200)
+        handler.send_header("Transfer-Encoding", "chunked")
+        handler.end_headers()
+        handler.wfile.write(b"5\r\nhello\r\n6\r\n world\r\n0\r\n\r\n")
+
+    def send(self, pool: ConnectionPool, url: str, stream=False, **kwargs):
+        self.default_args.update(url=url, **kwargs)
+        client = Client(*self.default_args.values(), pool=pool)
+        return client.send_request(stream)
+
+
+class TestConnectionPool(LocalServerTestCase):
+    def test_reusing_connection(self):
+        with LocalServer(self.routes) as self.server, ConnectionPool() as pool:
+            for _ in range(3):
+                response = self.send(pool, self.server.url + "/")
+                self.assertEqual(response.message_body, b"index")
+            self.assertEqual(self.server.connections, 1)
+            self.assertEqual(self.server.requests[0][2]["Connection"],
+                             "keep-alive")
+
+    def test_head_request_on_pooled_connection(self):
+        with LocalServer(self.routes) as self.server, ConnectionPool() as pool:
+            response = self.send(pool, self.server.url + "/", method="HEAD")
+            self.assertEqual(response.message_body, b"")
+            response = self.send(pool, self.server.url + "/", method="GET")
+            self.assertEqual(response.message_body, b"index")
+            self.assertEqual(self.server.connections, 1)
+
+    def test_closed_by_server(self):
+        with LocalServer(self.routes) as self.server, ConnectionPool() as pool:
+            self.send(pool, self.server.url + "/close")
+            response = self.send(pool, self.server.url + "/")
+            self.assertEqual(response.message_body, b"index")
+            self.assertEqual(self.server.connections, 2)
+
+    def test_dropped_idle_connection(self):
+        with LocalServer(self.routes) as self.server, ConnectionPool() as pool:
+            self.send(pool, self.server.url + "/")
+            host, port = self.server.httpd.server_address
+            key = ("http", host, port)
+            pool._idle[key][0].sock.shutdown(2)
+            response = self.send(pool, self.server.url + "/")
+            self.assertEqual(response.message_body, b"index")
+
+    def test_idle_limit_and_expiry(self):
+        with LocalServer(self.routes) as self.server:
+            host, port = self.server.httpd.server_address
+            pool = ConnectionPool(max_idle_per_host=1, idle_timeout=0)
+            first = pool.acquire("http", host, port, 5)
+            second = pool.acquire("http", host, port, 5)
+            pool.release(first)
+            pool.release(second)
+            self.assertEqual(pool.idle_count("http", host, port), 1)
+            self.assertTrue(first.closed)
+            third = pool.acquire("http", host, port, 5)
+            self.assertIsNot(third, second)
+            self.assertTrue(second.closed)
+            third.close()
+            pool.close()
+
+    def test_chunked_response_keeps_connection(self):
+        with LocalServer(self.routes) as self.server, ConnectionPool() as pool:
+            for _ in range(2):
+                response = self.send(pool, self.server.url + "/chunked")
+                self.assertEqual(response.message_body, b"hello world")
+            self.assertEqual(self.server.connections, 1)
+
+    def test_redirect_same_host(self):
+        with LocalServer(self.routes) as self.server, ConnectionPool() as pool:
+            response = self.send(
+                pool, self.server.url + "/redirect", redirect=True
+            )
+            self.assertEqual(response.message_body, b"index")
+            self.assertEqual(self.server.connections, 1)
+
+
+class TestPipelining(LocalServerTestCase):
+    @staticmethod
+    def echo_path(handler):
+        handler.send_body(200, handler.path.encode())
+
+    def pipeline(self, pool, paths, method="GET", depth=4, **kwargs):
+        self.default_args.update(url=self.server.url + "/", method=method)
+        client = Client(*self.default_args.values(), pool=pool, **kwargs)
+        return client.send_pipelined(paths, depth)
+
+    def test_responses_in_order_on_one_connection(self):
+        paths = [f"/item/{i}" for i in range(20)] + ["/chunked"]
+        server = LocalServer(self.routes, self.echo_path)
+        with server as self.server, ConnectionPool() as pool:
+            responses = self.pipeline(pool, paths)
+            self.assertEqual(self.server.connections, 1)
+            port = self.server.httpd.server_address[1]
+            self.assertEqual(pool.idle_count("http", "127.0.0.1", port), 1)
+        bodies = [response.message_body for response in responses]
+        self.assertEqual(bodies[:-1], [path.encode() for path in paths[:-1]])
+        self.assertEqual(bodies[-1], b"hello world")
+
+    def test_replay_after_close(self):
+        paths = ["/a", "/b", "/close", "/c", "/d", "/close", "/e"]
+        server = LocalServer(self.routes, self.echo_path)
+        with server as self.server, ConnectionPool() as pool:
+            responses = self.pipeline(pool, paths, depth=8)
+            self.assertEqual(self.server.connections, 3)
+        self.assertEqual(
+            [response.message_body for response in responses],
+            [b"/a", b"/b", b"bye", b"/c", b"/d", b"bye", b"/e"],
+        )
+
+    def test_timings_and_cookies(self):
+        self.routes["/login"] = lambda h: h.send_body(
+            200, b"ok", {"Set-Cookie": "sid=1"}
+        )
+        jar, finished = CookieJar(), []
+        with LocalServer(self.routes) as self.server, ConnectionPool() as pool:
+            responses = self.pipeline(
+                pool,
+                ["/login", "/", "/"],
+                cookie_jar=jar,
+                on_timings=finished.append,
+            )
+            self.pipeline(pool, ["/"], cookie_jar=jar)
+            cookies = [h.get("Cookie") for _, _, h in self.server.requests]
+        self.assertEqual(finished, responses)
+        self.assertEqual(cookies, [None, None, None, "sid=1"])
+        self.assertFalse(responses[0].timings.reused)
+        for response in responses:
+            marks = response.timings.marks
+            self.assertLessEqual(marks["request_sent"], marks["first_byte"])
+            self.assertLessEqual(marks["first_byte"], marks["done"])
+        self.assertTrue(responses[2].timings.reused)
+
+    def test_only_idempotent_methods(self):
+        with LocalServer(self.routes) as self.server, ConnectionPool() as pool:
+            with self.assertRaises(errors.PipeliningError):
+                self.pipeline(pool, ["/"], method="POST")
+            with self.assertRaises(errors.UrlParsingError):
+                self.pipeline(pool, ["http://example.com/"])
+
+
+class TestStreamingResponse(LocalServerTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.body = bytes(range(256)) * 1000
+        self.routes["/big"] = lambda h: h.send_body(200, self.body)
+
+    def test_iter_body(self):
+        with LocalServer(self.routes) as self.server, ConnectionPool() as pool:
+            response = self.send(pool, self.server.url + "/big", stream=True)
+            self.assertTrue(response.is_streaming)
+            chunks = list(response.iter_body(1000))
+            self.assertEqual(b"".join(chunks), self.body)
+            self.assertTrue(all(len(chunk) <= 1000 for chunk in chunks))
+            response = self.send(pool, self.server.url + "/", stream=True)
+            self.assertEqual(response.message_body, b"index")
+            self.assertEqual(self.server.connections, 1)
+
+    def test_raw(self):
+        with LocalServer(self.routes) as self.server, ConnectionPool() as pool:
+            response = self.send(pool, self.server.url + "/big", stream=True)
+            self.assertEqual(response.raw.read(), self.body)
+
+    def test_closing_unread_body(self):
+        with LocalServer(self.routes) as self.server, ConnectionPool() as pool:
+            response = self.send(pool, self.server.url + "/big", stream=True)
+            next(response.iter_body(10))
+            response.close()
+            response = self.send(pool, self.server.url + "/", stream=True)
+            self.assertEqual(response.message_body, b"index")
+            self.assertEqual(self.server.connections, 2)
+
+
+class TestStreamingUpload(LocalServerTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.routes["/echo"] = lambda h: h.send_body(200, h.request_body)
+        self.upload = tempfile.NamedTemporaryFile(delete=False)
+        self.upload.write(bytes(range(256)) * 4096)
+        self.upload.close()
+
+    def tearDown(self) -> None:
+        os.unlink(self.upload.name)
+
+    def test_file_is_not_read_into_memory(self):
+        with open(self.upload.name, "br") as file:
+            request = Request("POST", URL("http://x/"), [], file, "")
+            self.assertIs(request.body, file)
+            self.assertEqual(
+                request.headers["Content-Length"], str(256 * 4096)
+            )
+            self.assertEqual(file.tell(), 0)
+
+    def test_upload_file(self):
+        with LocalServer(self.routes) as self.server, ConnectionPool() as pool:
+            with mock.patch(
+                "socket.socket.sendfile",
+                autospec=True,
+                side_effect=socket.socket.sendfile,
+            ) as sendfile:
+                response = self.send(
+                    pool,
+                    self.server.url + "/echo",
+                    method="POST",
+                    upload=self.upload.name,
+                )
+            sendfile.assert_called_once()
+            with open(self.upload.name, "br") as file:
+                self.assertEqual(response.message_body, file.read())
+
+    def test_upload_iterator(self):
+        chunks = (bytes([i]) * 1000 for i in range(10))
+        request = Request("POST", URL("http://x/echo"), [], chunks, "")
+        self.assertEqual(request.headers["Transfer-Encoding"], "chunked")
+        self.assertNotIn("Content-Length", request.headers)
+        self.assertFalse(request.can_replay)
+        with LocalServer(self.routes) as self.server, ConnectionPool() as pool:
+            self.default_args.update(url=self.server.url + "/echo")
+            client = Client(*self.default_args.values(), pool=pool)
+            request.url = client.request.url
+            client.request = request
+            response = client.send_request()
+            expected = b"".join(bytes([i]) * 1000 for i in range(10))
+            self.assertEqual(response.message_body, expected)
+
+
+class TestTimings(LocalServerTestCase):
+    def test_phases_of_new_and_reused_connection(self):
+        with LocalServer(self.routes) as self.server, ConnectionPool() as pool:
+            first = self.send(pool, self.server.url + "/").timings
+            second = self.send(pool, self.server.url + "/").timings
+        self.assertFalse(first.reused)
+        self.assertTrue(second.reused)
+        self.assertEqual(second.phases["connect"], 0)
+        for timings in (first, second):
+            previous = 0
+            for event in timings.EVENTS[1:]:
+                self.assertGreaterEqual(timings.elapsed(event), previous)
+                previous = timings.elapsed(event)
+            self.assertAlmostEqual(
+                sum(timings.phases.values()), timings.total
+            )
+
+    def test_streaming_response_is_timed_when_drained(self):
+        with LocalServer(self.routes) as self.server, ConnectionPool() as pool:
+            response = self.send(pool, self.server.url + "/", stream=True)
+            self.assertNotIn("done", response.timings.marks)
+            response.read()
+            self.assertIn("done", response.timings.marks)
+
+    def test_redirect_hops_and_hook(self):
+        reported = []
+        with LocalServer(self.routes) as self.server, ConnectionPool() as pool:
+            self.default_args.update(
+                url=self.server.url + "/redirect", redirect=True
+            )
+            client = Client(
+                *self.default_args.values(),
+                pool=pool,
+                on_timings=reported.append,
+            )
+            response = client.send_request()
+        self.assertEqual(reported, [response])
+        self.assertEqual(len(response.timings.redirects), 1)
+        self.assertEqual(response.timings.as_dict()["num_redirects"], 1)
+        self.assertIn("time_total", response.timings.format())
+
+
 if __name__ == "__main__":
     unittest.main()
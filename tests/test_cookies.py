@@ -0,0 +1,156 @@
+import os
+import tempfile
+import time
+import unittest
+from http_client.batch import BatchRunner
+from http_client.client import Client
+from http_client.cookies import Cookie, CookieJar, parse_set_cookie
+from http_client.server import LocalServer
+from http_client.urls import parse_url
+
+
+class TestParseSetCookie(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.url = parse_url("https://www.example.com/docs/page")
+
+    def test_defaults(self):
+        cookie = parse_set_cookie("sid=abc; HttpOnly", self.url)
+        self.assertEqual(
+            (cookie.name, cookie.value, cookie.domain, cookie.path),
+            ("sid", "abc", "www.example.com", "/docs"),
+        )
+        self.assertTrue(cookie.host_only)
+        self.assertIsNone(cookie.expires)
+
+    def test_attributes(self):
+        cookie = parse_set_cookie(
+            "id=1; Domain=.Example.com; Path=/; Secure; "
+            "Expires=Wed, 21-Oct-2099 07:28:00 GMT",
+            self.url,
+        )
+        self.assertEqual((cookie.domain, cookie.path), ("example.com", "/"))
+        self.assertFalse(cookie.host_only)
+        self.assertTrue(cookie.secure)
+        self.assertGreater(cookie.expires, time.time())
+        cookie = parse_set_cookie(
+            "id=1; Max-Age=10; Expires=Wed, 21 Oct 2099 07:28:00 GMT",
+            self.url,
+            now=100,
+        )
+        self.assertEqual(cookie.expires, 110)
+
+    def test_rejected(self):
+        for value in ("novalue", "=x", "a=1; Domain=other.com"):
+            self.assertIsNone(parse_set_cookie(value, self.url))
+
+
+class TestCookieJar(unittest.TestCase):
+    def test_lookup(self):
+        jar = CookieJar()
+        jar.set(Cookie("a", "1", "example.com", host_only=False))
+        jar.set(Cookie("b", "2", "www.example.com", "/docs"))
+        jar.set(Cookie("c", "3", "example.com"))
+        jar.set(Cookie("d", "4", "www.example.com", secure=True))
+        self.assertEqual(
+            jar.header(parse_url("https://www.example.com/docs/x")),
+            "b=2; a=1; d=4",
+        )
+        self.assertEqual(
+            jar.header(parse_url("http://www.example.com/documents")), "a=1"
+        )
+        self.assertEqual(
+            jar.header(parse_url("http://example.com/")), "a=1; c=3"
+        )
+        self.assertEqual(jar.header(parse_url("http://ample.com/")), "")
+
+    def test_expiry(self):
+        jar = CookieJar()
+        url = parse_url("http://example.com/")
+        jar.set(Cookie("a", "1", "example.com", expires=time.time() + 60))
+        jar.set(Cookie("b", "2", "example.com"))
+        self.assertEqual(len(jar.cookies_for(url, now=time.time() + 120)), 1)
+        self.assertEqual(len(jar), 1)
+        jar.set(Cookie("b", "", "example.com", expires=0))
+        self.assertEqual(len(jar), 0)
+
+    def test_persistence(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "cookies.sqlite")
+            url = parse_url("http://example.com/")
+            jar = CookieJar(path)
+            jar.set(Cookie("a", "1", "example.com", expires=time.time() + 60))
+            jar.set(Cookie("b", "2", "example.com"))
+            jar.set(Cookie("c", "3", "example.com", expires=time.time() + 1))
+            jar.save()
+            self.assertEqual(CookieJar(path).header(url), "a=1; b=2; c=3")
+            jar.set(Cookie("a", "", "example.com", expires=0))
+            jar.save()
+            self.assertEqual(
+                CookieJar(path).cookies_for(url, now=time.time() + 2)[0].name,
+                "b",
+            )
+            self.assertEqual(len(CookieJar(path)), 2)
+
+
+class TestClientCookies(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        routes = {
+            "/login": self.send_login,
+            "/home": lambda h: h.send_body(200, b"home"),
+        }
+        self.server = LocalServer(routes).__enter__()
+
+    def tearDown(self) -> None:
+        self.server.__exit__(None, None, None)
+
+    @staticmethod
+    def send_login(handler):
+        handler.send_response(302)
+        handler.send_header("Location", "/home")
+        handler.send_header("Set-Cookie", "sid=42; Path=/")
+        handler.send_header("Set-Cookie", "theme=dark; Max-Age=3600")
+        handler.send_header("Content-Length", "0")
+        handler.end_headers()
+
+    def cookie_headers(self) -> list:
+        return [
+            headers.get("Cookie") for _, _, headers in self.server.requests
+        ]
+
+    def test_cookies_follow_redirect(self):
+        jar = CookieJar()
+        client = Client(
+            self.server.url + "/login",
+            "GET",
+            "",
+            None,
+            False,
+            [],
+            False,
+            "",
+            5,
+            True,
+            None,
+            cookie_jar=jar,
+        )
+        response = client.send_request()
+        client.close()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.cookie_headers(), [None, "sid=42; theme=dark"])
+
+    def test_batch_shares_jar(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "cookies.sqlite")
+            runner = BatchRunner(
+                concurrency=1, timeout=5, cookie_jar=CookieJar(path)
+            )
+            runner.run(
+                [self.server.url + "/login", self.server.url + "/home"],
+                lambda record: None,
+            )
+            runner.close()
+            runner.cookie_jar.save()
+            self.assertEqual(len(CookieJar(path)), 2)
+        self.assertEqual(self.cookie_headers(), [None, "sid=42; theme=dark"])
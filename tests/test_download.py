@@ -0,0 +1,199 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+import http_client.errors as errors
+from http_client.download import SegmentedDownload, split_ranges
+from http_client.models import Response
+from http_client.reader import parse_content_range
+from http_client.server import LocalServer
+
+DATA = os.urandom(3 * 1024 * 1024 + 17)
+
+
+class TestContentRange(unittest.TestCase):
+    def test_parsing(self):
+        cases = {
+            "bytes 0-99/1000": (0, 99, 1000),
+            "bytes 100-199/*": (100, 199, None),
+            "bytes */1000": (None, None, 1000),
+        }
+        for value, expected in cases.items():
+            with self.subTest(value):
+                self.assertEqual(parse_content_range(value), expected)
+        for value in ("bytes 10-5/100", "bytes 0-100/100", "items 0-1/2"):
+            with self.subTest(value), self.assertRaises(
+                errors.IncompleteResponseError
+            ):
+                parse_content_range(value)
+
+    def test_partial_response(self):
+        response = Response.from_bytes(
+            io.BytesIO(
+                b"HTTP/1.1 206 Partial Content\r\n"
+                b"Content-Range: bytes 2-4/10\r\nContent-Length: 3\r\n\r\nabc"
+            )
+        )
+        self.assertTrue(response.is_partial)
+        self.assertEqual(response.content_range, (2, 4, 10))
+        self.assertEqual(response.message_body, b"abc")
+
+    def test_split_ranges(self):
+        self.assertEqual(split_ranges(10, 3, 1), [(0, 3), (4, 6), (7, 9)])
+        self.assertEqual(split_ranges(10, 4, 6), [(0, 9)])
+
+
+class TestSegmentedDownload(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.routes = {
+            "/ranged": lambda h: h.send_ranged(DATA),
+            "/plain": lambda h: h.send_body(200, DATA),
+            "/wrong": self.send_wrong_range,
+        }
+        self.server = LocalServer(self.routes).__enter__()
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "file.bin")
+
+    def tearDown(self) -> None:
+        self.server.__exit__(None, None, None)
+        self.directory.cleanup()
+
+    @staticmethod
+    def send_wrong_range(handler):
+        if handler.command == "HEAD":
+            handler.send_ranged(DATA)
+        else:
+            handler.send_body(
+                206, DATA[:10], {"Content-Range": f"bytes 0-9/{len(DATA)}"}
+            )
+
+    def download(self, path: str, segments: int = 4) -> int:
+        return SegmentedDownload(
+            self.server.url + path, self.path, segments, 5, min_segment=1024
+        ).run()
+
+    def read(self) -> bytes:
+        with open(self.path, "rb") as file:
+            return file.read()
+
+    def test_ranges_are_fetched_separately(self):
+        self.assertEqual(self.download("/ranged"), len(DATA))
+        self.assertEqual(self.read(), DATA)
+        ranges = sorted(
+            headers["Range"]
+            for method, _, headers in self.server.requests
+            if method == "GET"
+        )
+        self.assertEqual(len(ranges), 4)
+        for headers in (request[2] for request in self.server.requests):
+            self.assertEqual(headers["Accept-Encoding"], "identity")
+
+    def test_fallback_without_ranges(self):
+        self.assertEqual(self.download("/plain"), len(DATA))
+        self.assertEqual(self.read(), DATA)
+        self.assertNotIn("Range", self.server.requests[-1][2])
+
+    def test_mismatched_range(self):
+        with self.assertRaises(errors.DownloadError):
+            self.download("/wrong")
+
+
+class CuttingWriter:
+    """Пропускает в соединение не больше limit байт, а затем просит
+    сервер закрыть его - имитация обрыва загрузки."""
+
+    def __init__(self, handler, limit: int):
+        self.handler = handler
+        self.wfile = handler.wfile
+        self.limit = limit
+
+    def write(self, data: bytes):
+        data = data[:self.limit]
+        self.limit -= len(data)
+        if not self.limit:
+            self.handler.close_connection = True
+        self.wfile.write(data)
+
+    def flush(self):
+        self.wfile.flush()
+
+
+class TestResumableDownload(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.etag = '"v1"'
+        self.cut_after = None
+        routes = {
+            "/file": self.send_file,
+            "/ignore": self.send_ignoring_ranges,
+        }
+        self.server = LocalServer(routes).__enter__()
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "file.bin")
+
+    def tearDown(self) -> None:
+        self.server.__exit__(None, None, None)
+        self.directory.cleanup()
+
+    def send_file(self, handler):
+        if handler.command == "GET" and self.cut_after is not None:
+            handler.wfile = CuttingWriter(handler, self.cut_after)
+            self.cut_after = None
+        handler.send_ranged(DATA, {"ETag": self.etag})
+
+    def send_ignoring_ranges(self, handler):
+        if handler.command == "HEAD":
+            handler.send_ranged(DATA, {"ETag": self.etag})
+        else:
+            handler.send_body(200, DATA, {"ETag": self.etag})
+
+    def download(self, path: str = "/file", segments: int = 1) -> int:
+        return SegmentedDownload(
+            self.server.url + path,
+            self.path,
+            segments,
+            5,
+            min_segment=1024,
+            resume=True,
+        ).run()
+
+    def interrupt(self) -> int:
+        """Обрывает загрузку и возвращает число сохранённых байт."""
+        self.cut_after = 1024 * 1024
+        with self.assertRaises(errors.APIError):
+            self.download()
+        self.assertFalse(os.path.exists(self.path))
+        with open(self.path + ".part.json") as file:
+            ranges = json.load(file)["ranges"]
+        return sum(done - first for first, _, done in ranges)
+
+    def last_get(self) -> dict:
+        return [r for r in self.server.requests if r[0] == "GET"][-1][2]
+
+    def read(self) -> bytes:
+        with open(self.path, "rb") as file:
+            return file.read()
+
+    def test_resume_after_interruption(self):
+        saved = self.interrupt()
+        self.assertGreater(saved, 0)
+        self.assertEqual(self.download(), len(DATA))
+        self.assertEqual(self.read(), DATA)
+        headers = self.last_get()
+        self.assertEqual(headers["Range"], f"bytes={saved}-{len(DATA) - 1}")
+        self.assertEqual(headers["If-Range"], '"v1"')
+        self.assertEqual(os.listdir(self.directory.name), ["file.bin"])
+
+    def test_changed_resource_starts_over(self):
+        self.interrupt()
+        self.etag = '"v2"'
+        self.assertEqual(self.download(), len(DATA))
+        self.assertEqual(self.read(), DATA)
+        self.assertEqual(self.last_get()["Range"], f"bytes=0-{len(DATA) - 1}")
+
+    def test_fallback_when_ranges_are_ignored(self):
+        self.assertEqual(self.download("/ignore", segments=3), len(DATA))
+        self.assertEqual(self.read(), DATA)
+        self.assertNotIn("Range", self.last_get())
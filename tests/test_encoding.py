@@ -0,0 +1,179 @@
+import gzip
+import io
+import unittest
+import unittest.mock as mock
+import zlib
+import http_client.errors as errors
+from http_client.client import Client
+from http_client.encoding import (
+    BrotliDecoder,
+    accept_encoding,
+    decode_chunks,
+    parse_content_encoding,
+)
+from http_client.models import Request, Response
+from http_client.server import LocalServer
+from yarl import URL
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+TEXT = b"The quick brown fox jumps over the lazy dog. " * 2000
+
+
+def split(data: bytes, size: int = 1000) -> list:
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def deflate(data: bytes, wbits: int = zlib.MAX_WBITS) -> bytes:
+    compressor = zlib.compressobj(wbits=wbits)
+    return compressor.compress(data) + compressor.flush()
+
+
+class FakeDecompressor:
+    """Раскрывает каждый байт входа в 1000 нулей; с limited - как
+    brotli >= 1.1 с output_buffer_limit."""
+
+    def __init__(self, limited: bool):
+        self.pending = b""
+        self.inputs = []
+        if limited:
+            self.can_accept_more_data = lambda: not self.pending
+
+    def process(self, data: bytes, output_buffer_limit: int = None):
+        self.inputs.append(len(data))
+        self.pending += bytes(1000 * len(data))
+        limit = output_buffer_limit or len(self.pending)
+        result, self.pending = self.pending[:limit], self.pending[limit:]
+        return result
+
+
+class TestDecoding(unittest.TestCase):
+    def decode(self, data: bytes, encodings: list, **kwargs) -> bytes:
+        return b"".join(decode_chunks(split(data), encodings, **kwargs))
+
+    def test_gzip_and_deflate(self):
+        cases = {
+            "gzip": gzip.compress(TEXT),
+            "multi-member gzip": gzip.compress(TEXT) + gzip.compress(TEXT),
+            "zlib deflate": deflate(TEXT),
+            "raw deflate": deflate(TEXT, -zlib.MAX_WBITS),
+        }
+        for name, data in cases.items():
+            with self.subTest(name):
+                encoding = name.split()[-1]
+                expected = TEXT * 2 if "multi" in name else TEXT
+                self.assertEqual(self.decode(data, [encoding]), expected)
+
+    def test_chained_encodings(self):
+        data = gzip.compress(deflate(TEXT))
+        encodings = parse_content_encoding("deflate, identity, GZIP")
+        self.assertEqual(encodings, ["deflate", "gzip"])
+        self.assertEqual(self.decode(data, encodings), TEXT)
+
+    def test_output_is_bounded_by_chunk_size(self):
+        data = gzip.compress(bytes(4 * 1024 * 1024))
+        pieces = list(decode_chunks([data], ["gzip"], chunk_size=64 * 1024))
+        self.assertEqual(sum(map(len, pieces)), 4 * 1024 * 1024)
+        self.assertLessEqual(max(map(len, pieces)), 64 * 1024)
+
+    def test_decompression_bomb(self):
+        bomb = gzip.compress(bytes(64 * 1024 * 1024))
+        with self.assertRaises(errors.DecompressionBombError):
+            self.decode(bomb, ["gzip"])
+        with self.assertRaises(errors.DecompressionBombError):
+            self.decode(gzip.compress(TEXT), ["gzip"], max_size=1000)
+
+    @unittest.skipIf(brotli is None, "brotli is not installed")
+    def test_brotli_bomb(self):
+        bomb = brotli.compress(bytes(64 * 1024 * 1024))
+        with self.assertRaises(errors.DecompressionBombError):
+            self.decode(bomb, ["br"])
+
+    def test_brotli_output_is_bounded(self):
+        for limited in (True, False):
+            fake = FakeDecompressor(limited)
+            with self.subTest(limited=limited), mock.patch(
+                "http_client.encoding.brotli"
+            ) as module:
+                module.Decompressor.return_value = fake
+                decoder = BrotliDecoder("br")
+                pieces = list(decoder.feed(bytes(10000), 64 * 1024))
+                self.assertEqual(sum(map(len, pieces)), 10000 * 1000)
+                if limited:
+                    self.assertLessEqual(max(map(len, pieces)), 64 * 1024)
+                else:
+                    self.assertLessEqual(max(fake.inputs), 1024)
+
+    def test_corrupted_body(self):
+        data = gzip.compress(TEXT)
+        for body in (data[:-8], b"not gzip" + data):
+            with self.subTest(body[:8]), self.assertRaises(
+                errors.ContentDecodingError
+            ):
+                self.decode(body, ["gzip"])
+        self.assertEqual(self.decode(b"", ["gzip"]), b"")
+
+    def test_request_advertises_encodings(self):
+        request = Request("GET", URL("http://example.com/"), [], b"", "")
+        self.assertEqual(request.headers["Accept-Encoding"], accept_encoding())
+        self.assertIn("gzip, deflate", accept_encoding())
+
+
+class TestCompressedResponse(unittest.TestCase):
+    RAW = (
+        b"HTTP/1.1 200 OK\r\nContent-Encoding: gzip\r\n"
+        b"Content-Length: %d\r\n\r\n%s"
+    )
+
+    def test_buffered_response(self):
+        body = gzip.compress(TEXT)
+        response = Response.from_bytes(
+            io.BytesIO(self.RAW % (len(body), body))
+        )
+        self.assertEqual(response.message_body, TEXT)
+        self.assertEqual(response.content_length, len(body))
+
+        raw = Response.from_bytes(io.BytesIO(self.RAW % (len(body), body)))
+        raw.decode_content = False
+        self.assertEqual(raw.message_body, body)
+
+    def test_unknown_encoding_is_kept(self):
+        raw = b"HTTP/1.1 200 OK\r\nContent-Encoding: x-custom\r\n\r\nabc"
+        response = Response.from_bytes(io.BytesIO(raw))
+        self.assertEqual(response.message_body, b"abc")
+
+    def test_streaming_from_server(self):
+        def send_gzip(handler):
+            encodings = handler.headers.get("Accept-Encoding", "")
+            handler.send_body(
+                200,
+                gzip.compress(TEXT),
+                {"Content-Encoding": "gzip", "X-Accepted": encodings},
+            )
+
+        with LocalServer({"/": send_gzip}) as server:
+            for decode in (True, False):
+                with self.subTest(decode=decode):
+                    client = Client(
+                        server.url + "/",
+                        "GET",
+                        "",
+                        None,
+                        False,
+                        [],
+                        False,
+                        "",
+                        5,
+                        False,
+                        None,
+                        decode=decode,
+                    )
+                    response = client.send_request(stream=True)
+                    body = b"".join(response.iter_body(4096))
+                    client.close()
+                    self.assertIn("gzip", response.headers["x-accepted"])
+                    expected = TEXT if decode else gzip.compress(TEXT)
+                    self.assertEqual(body, expected)
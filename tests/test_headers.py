@@ -0,0 +1,98 @@
+import io
+import unittest
+import http_client.errors as errors
+from http_client.headers import Headers
+from http_client.models import Request, Response
+from http_client.reader import parse_head
+from yarl import URL
+
+
+class TestHeaders(unittest.TestCase):
+    def test_case_insensitive_lookup(self):
+        headers = Headers([("Content-Type", "text/html")])
+        for name in ("content-type", "CONTENT-TYPE", "Content-Type"):
+            self.assertIn(name, headers)
+            self.assertEqual(headers[name], "text/html")
+        self.assertIsNone(headers.get("content-length"))
+        with self.assertRaises(KeyError):
+            headers["content-length"]
+
+    def test_repeated_headers(self):
+        headers = Headers(
+            [
+                ("Set-Cookie", "a=1; Expires=Wed, 21 Oct 2026 07:28:00 GMT"),
+                ("Vary", "Accept"),
+                ("set-cookie", "b=2"),
+                ("Vary", "Accept-Encoding"),
+            ]
+        )
+        self.assertEqual(
+            headers.get_all("Set-Cookie"),
+            ["a=1; Expires=Wed, 21 Oct 2026 07:28:00 GMT", "b=2"],
+        )
+        self.assertEqual(headers["vary"], "Accept, Accept-Encoding")
+        self.assertEqual(len(headers), 4)
+        self.assertEqual(list(headers), ["Set-Cookie", "Vary"])
+
+    def test_replacing_and_deleting(self):
+        headers = Headers({"Host": "a", "Accept": "*/*"})
+        headers.add("host", "b")
+        headers["HOST"] = "c"
+        self.assertEqual(headers.items(), [("HOST", "c"), ("Accept", "*/*")])
+        del headers["accept"]
+        self.assertEqual(headers, {"host": "c"})
+        with self.assertRaises(KeyError):
+            del headers["accept"]
+
+    def test_compact_bytes_storage(self):
+        headers = Headers([("Host", "a"), ("Content-Length", 10)])
+        self.assertFalse(hasattr(headers, "__dict__"))
+        self.assertEqual(
+            headers.fields, [(b"Host", b"a"), (b"Content-Length", b"10")]
+        )
+        self.assertEqual(headers["content-length"], "10")
+
+    def test_wire_format_is_cached(self):
+        headers = Headers([("Host", "a"), ("Accept", "*/*")])
+        wire = headers.wire
+        self.assertEqual(wire, b"Host: a\r\nAccept: */*\r\n")
+        self.assertIs(headers.wire, wire)
+        headers["host"] = "b"
+        self.assertEqual(bytes(headers), b"host: b\r\nAccept: */*\r\n")
+
+    def test_request_uses_headers(self):
+        request = Request(
+            "GET", URL("http://example.com/"), [("host", "other")], b"", ""
+        )
+        self.assertIsInstance(request.headers, Headers)
+        self.assertEqual(request.headers.get_all("Host"), ["other"])
+        self.assertTrue(request.head.startswith(b"GET / HTTP/1.1\r\nhost:"))
+        self.assertTrue(request.head.endswith(b"\r\n\r\n"))
+
+
+class TestParsingHead(unittest.TestCase):
+    def test_parsing_block(self):
+        proto, code, phrase, headers = parse_head(
+            b"HTTP/1.1 404 Not Found\r\nServer:  nginx \r\n"
+            b"X-Long: first\r\n second\r\nSet-Cookie: a=1\r\nSet-Cookie: b=2"
+        )
+        self.assertEqual((proto, code, phrase), ("HTTP/1.1", 404, "Not Found"))
+        self.assertEqual(headers["server"], "nginx")
+        self.assertEqual(headers["x-long"], "first second")
+        self.assertEqual(headers.get_all("set-cookie"), ["a=1", "b=2"])
+
+    def test_malformed_header_line(self):
+        with self.assertRaises(errors.IncompleteResponseError):
+            parse_head(b"HTTP/1.1 200 OK\r\nno colon here")
+
+    def test_response_keeps_all_cookies(self):
+        message = (
+            b"HTTP/1.1 200 OK\r\nSet-Cookie: a=1\r\nSet-Cookie: b=2\r\n"
+            b"Content-Length: 2\r\n\r\nok"
+        )
+        response = Response.from_bytes(io.BytesIO(message))
+        self.assertEqual(
+            response.headers.get_all("Set-Cookie"), ["a=1", "b=2"]
+        )
+        self.assertEqual(response.message_body, b"ok")
+        self.assertIn(b"Set-Cookie: a=1\r\nSet-Cookie: b=2", bytes(response))
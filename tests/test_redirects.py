@@ -0,0 +1,137 @@
+import unittest
+import http_client.errors as errors
+from http_client.client import Client
+from http_client.pool import ConnectionPool
+from http_client.redirects import (
+    RedirectMemo,
+    redirect_method,
+    resolve_location,
+)
+from http_client.server import LocalServer
+from yarl import URL
+
+
+def redirect(code: int, location: str):
+    return lambda h: h.send_body(code, b"moved", {"Location": location})
+
+
+class TestRedirectRules(unittest.TestCase):
+    def test_resolving_location(self):
+        current = URL("http://example.com/a/b?q=1")
+        cases = {
+            "c": "http://example.com/a/c",
+            "/c?x=1": "http://example.com/c?x=1",
+            "../d": "http://example.com/d",
+            "//cdn.example.com/e": "http://cdn.example.com/e",
+            "https://other.org/": "https://other.org/",
+        }
+        for location, expected in cases.items():
+            with self.subTest(location):
+                self.assertEqual(
+                    str(resolve_location(current, location)), expected
+                )
+        with self.assertRaises(errors.UrlParsingError):
+            resolve_location(current, "ftp://example.com/")
+
+    def test_method_rewrite(self):
+        cases = [
+            (301, "POST", "GET"),
+            (302, "POST", "GET"),
+            (302, "PUT", "PUT"),
+            (303, "POST", "GET"),
+            (303, "HEAD", "HEAD"),
+            (307, "POST", "POST"),
+            (308, "POST", "POST"),
+        ]
+        for code, method, expected in cases:
+            with self.subTest(code=code, method=method):
+                self.assertEqual(redirect_method(code, method), expected)
+
+
+class TestRedirectEngine(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.memo = RedirectMemo()
+        routes = {
+            "/start": redirect(302, "next"),
+            "/next": redirect(301, "/final?x=1"),
+            "/final": lambda h: h.send_body(200, b"final"),
+            "/loop-a": redirect(302, "/loop-b"),
+            "/loop-b": redirect(302, "/loop-a"),
+            "/see-other": redirect(303, "/echo"),
+            "/temporary": redirect(307, "/echo"),
+            "/echo": lambda h: h.send_body(
+                200, h.command.encode() + b" " + h.request_body
+            ),
+        }
+        self.server = LocalServer(routes, self.endless).__enter__()
+        self.pool = ConnectionPool()
+
+    def tearDown(self) -> None:
+        self.pool.close()
+        self.server.__exit__(None, None, None)
+
+    @staticmethod
+    def endless(handler):
+        hop = int(handler.path.rsplit("/", 1)[-1] or 0)
+        redirect(302, f"/endless/{hop + 1}")(handler)
+
+    def client(self, path: str, data: str = "", **kwargs) -> Client:
+        return Client(
+            self.server.url + path,
+            "POST" if data else "GET",
+            data,
+            None,
+            False,
+            kwargs.pop("headers", []),
+            False,
+            "",
+            5,
+            True,
+            None,
+            pool=self.pool,
+            redirects=self.memo,
+            **kwargs,
+        )
+
+    def paths(self) -> list:
+        return [path for _, path, _ in self.server.requests]
+
+    def test_relative_chain_on_one_connection(self):
+        response = self.client("/start").send_request()
+        self.assertEqual(response.message_body, b"final")
+        self.assertEqual(self.paths(), ["/start", "/next", "/final?x=1"])
+        self.assertEqual(len(response.timings.redirects), 2)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_loop_and_hop_limit(self):
+        with self.assertRaises(errors.RedirectError):
+            self.client("/loop-a").send_request()
+        self.assertEqual(self.paths(), ["/loop-a", "/loop-b"])
+        with self.assertRaises(errors.RedirectError):
+            self.client("/endless/0", max_redirects=3).send_request()
+        self.assertEqual(self.paths()[-1], "/endless/3")
+
+    def test_method_and_body_after_redirect(self):
+        response = self.client("/see-other", data="payload").send_request()
+        self.assertEqual(response.message_body, b"GET ")
+        self.assertNotIn("Content-Length", self.server.requests[-1][2])
+        response = self.client("/temporary", data="payload").send_request()
+        self.assertEqual(response.message_body, b"POST payload")
+
+    def test_permanent_redirect_is_remembered(self):
+        self.client("/next").send_request()
+        response = self.client("/next").send_request()
+        self.assertEqual(response.message_body, b"final")
+        self.assertEqual(self.paths(), ["/next", "/final?x=1", "/final?x=1"])
+
+    def test_authorization_is_not_sent_to_other_host(self):
+        with LocalServer(default=redirect(302, "/")) as other:
+            self.server.httpd.routes["/away"] = redirect(302, other.url + "/x")
+            client = self.client(
+                "/away", headers=[["Authorization", "Bearer secret"]]
+            )
+            with self.assertRaises(errors.RedirectError):
+                client.send_request()
+            self.assertIn("Authorization", self.server.requests[0][2])
+            self.assertNotIn("Authorization", other.requests[0][2])
@@ -0,0 +1,103 @@
+import asyncio
+import socket
+import unittest
+import unittest.mock as mock
+import http_client.errors as errors
+from http_client.resolver import Resolver, interleave, parse_resolve_spec
+from http_client.server import LocalServer
+
+
+class TestResolver(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.server = LocalServer().__enter__()
+        self.host, self.port = self.server.httpd.server_address
+
+    def tearDown(self) -> None:
+        self.server.__exit__(None, None, None)
+
+    def test_cache_and_ttl(self):
+        resolver = Resolver(ttl=60)
+        with mock.patch(
+            "socket.getaddrinfo", side_effect=socket.getaddrinfo
+        ) as getaddrinfo:
+            for _ in range(3):
+                resolver.resolve("localhost", 80)
+            self.assertEqual(getaddrinfo.call_count, 1)
+            resolver.ttl = 0
+            resolver.invalidate("localhost", 80)
+            resolver.resolve("localhost", 80)
+            resolver.resolve("localhost", 80)
+            self.assertEqual(getaddrinfo.call_count, 3)
+
+    def test_interleaving_families(self):
+        v4, v6 = socket.AF_INET, socket.AF_INET6
+        addresses = [(v6, "a"), (v6, "b"), (v4, "c"), (v4, "d"), (v6, "e")]
+        self.assertEqual(
+            [address for _, address in interleave(addresses)],
+            ["a", "c", "b", "d", "e"],
+        )
+
+    def test_parsing_overrides(self):
+        host, port, addresses = parse_resolve_spec(
+            "Example.com:443:[::1],1.2.3.4"
+        )
+        self.assertEqual((host, port), ("example.com", 443))
+        self.assertEqual(
+            addresses,
+            [
+                (socket.AF_INET6, ("::1", 443)),
+                (socket.AF_INET, ("1.2.3.4", 443)),
+            ],
+        )
+        for spec in ("example.com", "example.com:x:1.2.3.4", "a:1:not-ip"):
+            with self.subTest(spec), self.assertRaises(
+                errors.ResolveSpecError
+            ):
+                parse_resolve_spec(spec)
+
+    def test_falling_back_to_next_address(self):
+        resolver = Resolver()
+        resolver.add_override(
+            f"example.test:{self.port}:127.0.0.2,{self.host}"
+        )
+        sock, _ = resolver.connect("example.test", self.port, 5)
+        with sock:
+            self.assertEqual(sock.getpeername(), (self.host, self.port))
+            self.assertTrue(sock.getblocking())
+
+    def test_staggered_attempts(self):
+        resolver = Resolver(delay=0.05)
+        with socket.socket() as listener, socket.socket() as filler:
+            listener.bind(("127.0.0.1", 0))
+            listener.listen(0)
+            filler.connect(listener.getsockname())
+            addresses = [
+                (socket.AF_INET, listener.getsockname()),
+                (socket.AF_INET, (self.host, self.port)),
+            ]
+            with mock.patch.object(
+                resolver, "resolve", return_value=addresses
+            ):
+                sock, _ = resolver.connect("example.test", self.port, 5)
+        with sock:
+            self.assertEqual(sock.getpeername(), (self.host, self.port))
+
+    def test_all_addresses_fail(self):
+        resolver = Resolver()
+        resolver.add_override(f"example.test:{self.port}:127.0.0.2,127.0.0.3")
+        with self.assertRaises(ConnectionRefusedError):
+            resolver.connect("example.test", self.port, 5)
+
+    def test_async_connect(self):
+        resolver = Resolver()
+        resolver.add_override(
+            f"example.test:{self.port}:127.0.0.2,{self.host}"
+        )
+
+        async def connect():
+            sock, _ = await resolver.connect_async("example.test", self.port)
+            with sock:
+                return sock.getpeername()
+
+        self.assertEqual(asyncio.run(connect()), (self.host, self.port))
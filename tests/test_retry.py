@@ -0,0 +1,138 @@
+import os
+import socket
+import tempfile
+import time
+import unittest
+import http_client.errors as errors
+from http_client.client import Client
+from http_client.pool import ConnectionPool
+from http_client.retry import RetryPolicy
+from http_client.server import LocalServer
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.failures = 0
+        self.bodies = []
+        routes = {
+            "/flaky": self.send_flaky,
+            "/drop": self.send_drop,
+            "/busy": lambda h: h.send_body(
+                429, b"busy", {"Retry-After": "0"}
+            ),
+            "/silent": lambda h: time.sleep(0.5),
+        }
+        self.server = LocalServer(routes).__enter__()
+
+    def tearDown(self) -> None:
+        self.server.__exit__(None, None, None)
+
+    def send_flaky(self, handler):
+        self.bodies.append(handler.request_body)
+        if self.failures:
+            self.failures -= 1
+            handler.send_body(503, b"unavailable")
+            return
+        handler.send_body(200, b"ok")
+
+    def send_drop(self, handler):
+        if self.failures:
+            self.failures -= 1
+            handler.close_connection = True
+            return
+        handler.send_body(200, b"ok")
+
+    def fetch(self, path: str, policy: RetryPolicy, **kwargs):
+        client = Client(
+            self.server.url + path,
+            kwargs.get("method", "GET"),
+            kwargs.get("data", ""),
+            kwargs.get("upload"),
+            False,
+            [],
+            False,
+            "",
+            kwargs.get("timeout", 5),
+            False,
+            None,
+            pool=kwargs.get("pool"),
+            retry=policy,
+        )
+        try:
+            return client.send_request()
+        finally:
+            client.close()
+
+    def test_status_retries(self):
+        self.failures = 2
+        response = self.fetch("/flaky", RetryPolicy(backoff=0.01))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.retries, 2)
+        self.assertGreater(response.retry_time, 0)
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_connection_errors(self):
+        self.failures = 1
+        response = self.fetch("/drop", RetryPolicy(backoff=0.01))
+        self.assertEqual((response.status_code, response.retries), (200, 1))
+        self.failures = 5
+        with self.assertRaises(errors.ConnectionDroppedError):
+            self.fetch("/drop", RetryPolicy(total=2, backoff=0.01))
+
+    def test_limits(self):
+        self.failures = 5
+        response = self.fetch("/flaky", RetryPolicy(statuses={503: 1}))
+        self.assertEqual((response.status_code, response.retries), (503, 1))
+        response = self.fetch(
+            "/flaky", RetryPolicy(backoff=1, max_backoff=1, deadline=0.001)
+        )
+        self.assertEqual((response.status_code, response.retries), (503, 0))
+        response = self.fetch("/busy", RetryPolicy(total=2, backoff=10))
+        self.assertEqual((response.status_code, response.retries), (429, 2))
+
+    def test_timeouts_are_retried(self):
+        policy = RetryPolicy()
+        for error in (socket.timeout("timed out"), TimeoutError()):
+            self.assertIsNotNone(policy.rule_for_error(error))
+        self.assertIsNone(policy.rule_for_error(ValueError()))
+
+    def test_unsafe_methods_are_not_replayed(self):
+        self.failures = 1
+        response = self.fetch(
+            "/flaky", RetryPolicy(backoff=0.01), method="POST", data="x"
+        )
+        self.assertEqual((response.status_code, response.retries), (503, 0))
+
+    def test_upload_is_reopened(self):
+        self.failures = 2
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "upload.bin")
+            with open(path, "wb") as file:
+                file.write(b"payload" * 1000)
+            policy = RetryPolicy(backoff=0.01, methods=("POST",))
+            response = self.fetch(
+                "/flaky", policy, method="POST", upload=path
+            )
+        self.assertEqual((response.status_code, response.retries), (200, 2))
+        self.assertEqual(self.bodies, [b"payload" * 1000] * 3)
+
+    def test_failed_attempts_close_connections(self):
+        opened = []
+        with ConnectionPool() as pool:
+            acquire = pool.acquire
+
+            def tracking_acquire(*args):
+                opened.append(acquire(*args))
+                return opened[-1]
+
+            pool.acquire = tracking_acquire
+            with self.assertRaises(TimeoutError):
+                self.fetch(
+                    "/silent",
+                    RetryPolicy(total=3, backoff=0.01),
+                    timeout=0.2,
+                    pool=pool,
+                )
+        self.assertEqual(len(opened), 4)
+        self.assertTrue(all(conn.closed for conn in opened))
@@ -0,0 +1,194 @@
+import concurrent.futures
+import threading
+import time
+import unittest
+from http_client.batch import BatchRunner
+from http_client.client import Client
+from http_client.pool import ConnectionPool
+from http_client.retry import RetryPolicy
+from http_client.scheduler import (
+    HostScheduler,
+    TokenBucket,
+    parse_retry_after,
+)
+from http_client.server import LocalServer
+
+
+class TestLimits(unittest.TestCase):
+    def test_token_bucket(self):
+        bucket = TokenBucket(rate=10, burst=2)
+        now = bucket.updated
+        for _ in range(2):
+            self.assertEqual(bucket.delay(now), 0)
+            bucket.take()
+        self.assertAlmostEqual(bucket.delay(now), 0.1)
+        self.assertAlmostEqual(bucket.delay(now + 0.05), 0.05)
+        self.assertEqual(bucket.delay(now + 1), 0)
+        self.assertEqual(bucket.tokens, 2)
+
+    def test_retry_after(self):
+        self.assertEqual(parse_retry_after("120"), 120)
+        self.assertEqual(
+            parse_retry_after("Sat, 01 Jan 2000 00:00:00 GMT"), 0
+        )
+        self.assertGreater(
+            parse_retry_after("Fri, 01 Jan 2100 00:00:00 GMT"), 86400
+        )
+        for value in (None, "", "soon"):
+            self.assertIsNone(parse_retry_after(value))
+
+
+class TestHostScheduler(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.active = self.peak = 0
+        self.lock = threading.Lock()
+        self.throttle = 0
+        routes = {"/slow": self.send_slow, "/limited": self.send_limited}
+        self.server = LocalServer(routes).__enter__()
+        self.pool = ConnectionPool(max_idle_per_host=8)
+
+    def tearDown(self) -> None:
+        self.pool.close()
+        self.server.__exit__(None, None, None)
+
+    def send_slow(self, handler):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.05)
+        with self.lock:
+            self.active -= 1
+        handler.send_body(200, b"slow")
+
+    def send_limited(self, handler):
+        if self.throttle:
+            self.throttle -= 1
+            handler.send_body(429, b"later", {"Retry-After": "30"})
+            return
+        handler.send_body(200, b"ok")
+
+    def fetch(self, path: str, scheduler: HostScheduler):
+        client = Client(
+            self.server.url + path,
+            "GET",
+            "",
+            None,
+            False,
+            [],
+            False,
+            "",
+            5,
+            False,
+            None,
+            pool=self.pool,
+            scheduler=scheduler,
+        )
+        return client.send_request()
+
+    def test_max_in_flight(self):
+        scheduler = HostScheduler(max_in_flight=2)
+        with concurrent.futures.ThreadPoolExecutor(8) as executor:
+            futures = [
+                executor.submit(self.fetch, "/slow", scheduler)
+                for _ in range(8)
+            ]
+            for future in futures:
+                self.assertEqual(future.result().status_code, 200)
+        self.assertEqual(self.peak, 2)
+        self.assertEqual(scheduler.stats.acquired, 8)
+
+    def test_rate(self):
+        scheduler = HostScheduler(rate=20, burst=2)
+        started = time.monotonic()
+        for _ in range(6):
+            self.fetch("/limited", scheduler)
+        self.assertGreaterEqual(time.monotonic() - started, 0.19)
+
+    def test_retry_after_pauses_host(self):
+        scheduler = HostScheduler(max_backoff=0.3)
+        self.throttle = 1
+        self.assertEqual(self.fetch("/limited", scheduler).status_code, 429)
+        started = time.monotonic()
+        self.assertEqual(self.fetch("/limited", scheduler).status_code, 200)
+        self.assertGreaterEqual(time.monotonic() - started, 0.25)
+        self.assertEqual(scheduler.stats.throttled, 1)
+
+
+class TestDispatchedSlot(unittest.TestCase):
+    """Слот, занятый FairDispatcher, покрывает только первый обмен
+    задания: переходы и повторы идут через token bucket и паузы."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.arrivals = []
+        self.throttle = 0
+        self.server = LocalServer(default=self.respond).__enter__()
+
+    def tearDown(self) -> None:
+        self.server.__exit__(None, None, None)
+
+    def respond(self, handler):
+        self.arrivals.append(time.monotonic())
+        hop = handler.path.rsplit("/", 1)[-1]
+        if hop.isdigit() and int(hop):
+            location = f"/hop/{int(hop) - 1}"
+            handler.send_body(302, b"", {"Location": location})
+        elif self.throttle:
+            self.throttle -= 1
+            handler.send_body(429, b"later")
+        else:
+            handler.send_body(200, b"ok")
+
+    def run_one(self, path: str, **kwargs) -> dict:
+        records = []
+        runner = BatchRunner(concurrency=1, timeout=5, **kwargs)
+        runner.run([self.server.url + path], records.append)
+        runner.close()
+        return records[0]
+
+    def gaps(self) -> list:
+        return [b - a for a, b in zip(self.arrivals, self.arrivals[1:])]
+
+    def test_redirects_take_tokens(self):
+        record = self.run_one(
+            "/hop/4",
+            redirect=True,
+            scheduler=HostScheduler(rate=20, max_in_flight=1),
+        )
+        self.assertEqual(record["status"], 200)
+        self.assertEqual(len(self.arrivals), 5)
+        self.assertGreaterEqual(min(self.gaps()), 0.04)
+
+    def test_retries_wait_for_pause(self):
+        self.throttle = 3
+        record = self.run_one(
+            "/",
+            scheduler=HostScheduler(max_backoff=0.2),
+            retry=RetryPolicy(backoff=0.001),
+        )
+        self.assertEqual((record["status"], record["retries"]), (200, 3))
+        self.assertGreaterEqual(min(self.gaps()), 0.18)
+
+
+class TestFairDispatch(unittest.TestCase):
+    def test_slow_host_does_not_starve_others(self):
+        slow = LocalServer(
+            default=lambda h: (time.sleep(0.2), h.send_body(200, b"slow"))
+        )
+        fast = LocalServer(default=lambda h: h.send_body(200, b"fast"))
+        with slow, fast:
+            lines = [slow.url + "/"] * 4 + [fast.url + "/"] * 4
+            records = []
+            runner = BatchRunner(
+                concurrency=3,
+                ordered=False,
+                timeout=5,
+                scheduler=HostScheduler(max_in_flight=1),
+            )
+            summary = runner.run(lines, records.append)
+            runner.close()
+        self.assertEqual(summary.statuses[200], 8)
+        order = [record["index"] for record in records]
+        self.assertEqual(sorted(order[:4]), [4, 5, 6, 7])
+        self.assertEqual(order[4:], [0, 1, 2, 3])
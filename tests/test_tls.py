@@ -0,0 +1,77 @@
+import asyncio
+import os
+import ssl
+import unittest
+from http_client.async_client import AsyncClient
+from http_client.pool import Connection, ConnectionPool
+from http_client.server import LocalServer
+from http_client.tls import TLSContext, get_tls_context
+
+CERTFILE = os.path.join(os.path.dirname(__file__), "localhost.pem")
+
+
+class TestTLSContext(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        routes = {
+            "/": lambda h: h.send_body(200, b"index"),
+            "/close": lambda h: h.send_body(
+                200, b"bye", {"Connection": "close"}
+            ),
+        }
+        self.server = LocalServer(routes, certfile=CERTFILE).__enter__()
+        self.port = self.server.httpd.server_address[1]
+
+    def tearDown(self) -> None:
+        self.server.__exit__(None, None, None)
+
+    def fetch(self, pool: ConnectionPool, path: str = "/"):
+        conn = pool.acquire("https", "localhost", self.port, 5)
+        conn.sock.sendall(
+            f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode()
+        )
+        head = conn.reader.read_head()
+        body = conn.reader.read_body(head[3])
+        resumed = conn.sock.session_reused
+        if head[3].get("connection", "").strip() == "close":
+            conn.close()
+        else:
+            pool.release(conn)
+        return resumed, bytes(body)
+
+    def test_context_is_shared_per_configuration(self):
+        self.assertIs(get_tls_context(), get_tls_context())
+        self.assertIs(get_tls_context(False), get_tls_context(False))
+        self.assertIsNot(get_tls_context(), get_tls_context(False))
+        self.assertEqual(
+            get_tls_context(False).context.verify_mode, ssl.CERT_NONE
+        )
+
+    def test_verification(self):
+        with self.assertRaises(ssl.SSLCertVerificationError):
+            Connection.open(("https", "localhost", self.port), 5)
+        for tls in (TLSContext(cafile=CERTFILE), TLSContext(verify=False)):
+            with self.subTest(verify=tls.verify):
+                with ConnectionPool(tls=tls) as pool:
+                    self.assertEqual(self.fetch(pool)[1], b"index")
+
+    def test_session_is_resumed_on_reconnect(self):
+        tls = TLSContext(cafile=CERTFILE)
+        with ConnectionPool(tls=tls) as pool:
+            self.assertFalse(self.fetch(pool, "/close")[0])
+            self.assertIsNotNone(tls.session("localhost", self.port))
+            self.assertTrue(self.fetch(pool, "/close")[0])
+            tls.forget("localhost", self.port)
+            self.assertFalse(self.fetch(pool, "/close")[0])
+        self.assertEqual(self.server.connections, 3)
+
+    def test_async_client_uses_shared_context(self):
+        async def fetch():
+            tls = TLSContext(cafile=CERTFILE)
+            async with AsyncClient(timeout=5, tls=tls) as client:
+                url = f"https://localhost:{self.port}/"
+                return await client.request("GET", url)
+
+        response = asyncio.run(fetch())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.message_body, b"index")